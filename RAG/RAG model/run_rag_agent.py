@@ -1,6 +1,8 @@
 import os
+import sys
 import json
 from datetime import datetime
+from pathlib import Path
 
 # Try to import AI libraries (optional)
 try:
@@ -10,70 +12,26 @@ except ImportError:
     HAS_OLLAMA = False
 
 # ==============================================================================
-# LEARNING RESOURCES DATABASE
+# LEARNING RESOURCES CATALOG
 # ==============================================================================
-LEARNING_RESOURCES = {
-    "JavaScript Variables": {
-        "youtube": [
-            {"title": "JavaScript Variables - var, let, and const", "url": "https://www.youtube.com/watch?v=9WIJQDvt4Us", "channel": "Programming with Mosh"},
-            {"title": "JavaScript Variables Explained", "url": "https://www.youtube.com/watch?v=edlFjlzxkSI", "channel": "freeCodeCamp"}
-        ],
-        "articles": [
-            {"title": "MDN: JavaScript Variables", "url": "https://developer.mozilla.org/en-US/docs/Web/JavaScript/Guide/Grammar_and_types#declarations"},
-            {"title": "JavaScript.info - Variables", "url": "https://javascript.info/variables"}
-        ],
-        "explanation": "JavaScript has three ways to declare variables: var (function-scoped, older), let (block-scoped, can be reassigned), and const (block-scoped, cannot be reassigned). Use const by default, let when you need to reassign, and avoid var in modern code.",
-        "tip": "Practice declaring variables with const first, and only use let when you know the value will change."
-    },
-    "React Hooks": {
-        "youtube": [
-            {"title": "React Hooks Tutorial - useEffect", "url": "https://www.youtube.com/watch?v=0ZJgIjIuY7U", "channel": "Web Dev Simplified"},
-            {"title": "Complete React Hooks Guide", "url": "https://www.youtube.com/watch?v=TNhaISOUy6Q", "channel": "Codevolution"}
-        ],
-        "articles": [
-            {"title": "React Docs: useEffect", "url": "https://react.dev/reference/react/useEffect"},
-            {"title": "Complete Guide to useEffect", "url": "https://overreacted.io/a-complete-guide-to-useeffect/"}
-        ],
-        "explanation": "useEffect is a React Hook for handling side effects in functional components. Side effects include data fetching, subscriptions, manually changing the DOM, and timers. It runs after the component renders and can optionally clean up when the component unmounts.",
-        "tip": "Start by understanding the dependency array - empty [] runs once, [value] runs when value changes, and no array runs after every render."
-    },
-    "Data Structures": {
-        "youtube": [
-            {"title": "Data Structures Easy to Advanced", "url": "https://www.youtube.com/watch?v=RBSGKlAvoiM", "channel": "freeCodeCamp"},
-            {"title": "Big O Notation Full Course", "url": "https://www.youtube.com/watch?v=Mo4vesaut8g", "channel": "freeCodeCamp"}
-        ],
-        "articles": [
-            {"title": "Big O Cheat Sheet", "url": "https://www.bigocheatsheet.com/"},
-            {"title": "GeeksforGeeks: Binary Search Tree", "url": "https://www.geeksforgeeks.org/binary-search-tree-data-structure/"}
-        ],
-        "explanation": "Binary Search Trees (BST) have O(log n) time complexity for search in balanced trees because each comparison eliminates half of the remaining nodes. However, in worst-case unbalanced trees (like a linked list), it degrades to O(n). Self-balancing trees like AVL and Red-Black trees maintain O(log n).",
-        "tip": "Draw out a balanced BST and trace through a search operation to visualize why it's O(log n) - you're halving the search space at each step."
-    },
-    "CSS Flexbox": {
-        "youtube": [
-            {"title": "Flexbox CSS in 20 Minutes", "url": "https://www.youtube.com/watch?v=JJSoEo8JSnc", "channel": "Traversy Media"},
-            {"title": "Learn Flexbox in 15 Minutes", "url": "https://www.youtube.com/watch?v=fYq5PXgSsbE", "channel": "Web Dev Simplified"}
-        ],
-        "articles": [
-            {"title": "CSS Tricks: Complete Guide to Flexbox", "url": "https://css-tricks.com/snippets/css/a-guide-to-flexbox/"},
-            {"title": "MDN: Flexbox", "url": "https://developer.mozilla.org/en-US/docs/Learn/CSS/CSS_layout/Flexbox"}
-        ],
-        "explanation": "Flexbox is a CSS layout model that makes it easier to align and distribute space among items in a container. The flex-direction property sets the main axis (row, row-reverse, column, column-reverse), determining how flex items are placed in the container.",
-        "tip": "Use the Chrome DevTools flexbox inspector to visualize and experiment with different flex properties in real-time."
-    },
-    "Git Version Control": {
-        "youtube": [
-            {"title": "Git and GitHub for Beginners", "url": "https://www.youtube.com/watch?v=RGOj5yH7evk", "channel": "freeCodeCamp"},
-            {"title": "Git Branching Tutorial", "url": "https://www.youtube.com/watch?v=e2IbNHi4uCI", "channel": "The Net Ninja"}
-        ],
-        "articles": [
-            {"title": "Git Branching - Basic Branching", "url": "https://git-scm.com/book/en/v2/Git-Branching-Basic-Branching-and-Merging"},
-            {"title": "Atlassian Git Branching Tutorial", "url": "https://www.atlassian.com/git/tutorials/using-branches"}
-        ],
-        "explanation": "Git checkout -b branch-name creates a new branch and immediately switches to it in one command. It's shorthand for 'git branch branch-name' followed by 'git checkout branch-name'. This is the most common way to start working on a new feature.",
-        "tip": "Name your branches descriptively (feature/login-page, bugfix/header-alignment) to make it clear what each branch is for."
-    }
-}
+# Curated resources live in the app's resource catalog (seeded from
+# app/resources/learning_resources.json), shared with the API and searched
+# with a ranked, typo-tolerant index instead of exact topic-name lookups.
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.config import settings
+from app.services.resource_catalog import ResourceCatalog
+from app.services.vector_index import VectorIndex, catalog_documents
+
+CATALOG = ResourceCatalog(str(REPO_ROOT / settings.resource_catalog_path))
+
+# Chunks of the catalogued explanations and resources, embedded locally,
+# retrieved to ground the model's explanation of each missed question
+INDEX = VectorIndex(
+    str(REPO_ROOT / settings.rag_index_dir), settings.rag_embedding_model, settings.rag_embedding_dim
+)
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
 
 # ==============================================================================
 # QUIZ QUESTIONS DATABASE
@@ -239,6 +197,37 @@ def conduct_quiz():
 # ==============================================================================
 # STEP 2: GENERATE RECOMMENDATIONS
 # ==============================================================================
+def explain_with_model(answer, retrieved):
+    """
+    Asks the local model to explain a missed question using the retrieved chunks.
+    Returns None when Ollama is unavailable or nothing was retrieved.
+    """
+    if not HAS_OLLAMA or not retrieved:
+        return None
+    
+    context = "\n".join(
+        f"- {chunk['title']}" + (f" ({chunk['url']})" if chunk.get('url') else "") + f": {chunk['text']}"
+        for chunk in retrieved
+    )
+    prompt = f"""A student answered this quiz question incorrectly.
+
+Question: {answer['questionText']}
+Student's answer: {answer['studentAnswer']}
+Correct answer: {answer['correctAnswer']}
+
+Reference material:
+{context}
+
+Using only the reference material, explain in 3-4 sentences why the correct answer is right,
+and point the student to the most relevant resource by its URL."""
+    
+    try:
+        return ChatOllama(model=OLLAMA_MODEL, temperature=0.3).invoke(prompt).content
+    except Exception as e:
+        print(f"   ⚠️  Local model unavailable ({e})\n")
+        return None
+
+
 def generate_recommendations(quiz_data):
     """
     Generates learning recommendations based on incorrect answers using curated resources.
@@ -262,17 +251,27 @@ def generate_recommendations(quiz_data):
         print(f"📚 Topic {idx}: {topic}")
         print("   ✅ Generating recommendations...\n")
         
-        # Get curated resources for this topic
-        resources = LEARNING_RESOURCES.get(topic, {})
+        # Get the best-matching catalogued topic and its ranked resources
+        resources = CATALOG.topic_resources(topic)
         
         if not resources:
-            print(f"   ⚠️  No pre-loaded resources for '{topic}'\n")
+            print(f"   ⚠️  No catalogued resources for '{topic}'\n")
             continue
+        if resources['topic'] != topic:
+            print(f"   🔎 Closest catalogued topic: {resources['topic']}\n")
+        
+        # Retrieve the closest chunks for the missed question itself
+        retrieved = [
+            {field: chunk[field] for field in ("title", "url", "text", "score")}
+            for chunk in INDEX.search(f"{topic} {question} {ans.get('explanation', '')}", k=settings.rag_top_k)
+        ]
         
         rec = {
             "topic": topic,
             "question": question,
-            "resources": resources
+            "resources": resources,
+            "retrieved": retrieved,
+            "ai_explanation": explain_with_model(ans, retrieved)
         }
         
         recommendations.append(rec)
@@ -298,7 +297,7 @@ def generate_recommendations(quiz_data):
         print("║" + " 📹 YOUTUBE TUTORIALS ".center(68) + "║")
         print("╚" + "═" * 68 + "╝\n")
         
-        for video_idx, video in enumerate(topic_resources.get('youtube', []), 1):
+        for video_idx, video in enumerate(topic_resources.get('videos', []), 1):
             print(f"  [{video_idx}] {video['title']}")
             print(f"      👤 Channel: {video['channel']}")
             print(f"      🔗 {video['url']}\n")
@@ -319,6 +318,17 @@ def generate_recommendations(quiz_data):
         print("╚" + "═" * 68 + "╝")
         print(f"\n{explanation}\n")
         
+        # Model explanation grounded in the retrieved chunks
+        if rec['ai_explanation']:
+            print("╔" + "═" * 68 + "╗")
+            print("║" + " 🤖 AI TUTOR ".center(68) + "║")
+            print("╚" + "═" * 68 + "╝")
+            print(f"\n{rec['ai_explanation']}\n")
+            print("   Sources:")
+            for chunk in rec['retrieved']:
+                print(f"   - {chunk['title']}" + (f" 🔗 {chunk['url']}" if chunk['url'] else ""))
+            print()
+        
         # Study Tip Box
         tip = topic_resources.get('tip', 'Practice regularly')
         print("╔" + "═" * 68 + "╗")
@@ -517,7 +527,7 @@ def generate_html_report(quiz_data, recommendations):
             <div class="resource-section">
                 <h3>📹 YouTube Tutorials</h3>
 """
-        for video in topic_resources.get('youtube', []):
+        for video in topic_resources.get('videos', []):
             html_content += f"""
                 <div class="resource">
                     <a href="{video['url']}" target="_blank">{video['title']}</a>
@@ -581,6 +591,9 @@ def main():
     print("█" + " " * 68 + "█")
     print("█" * 70 + "\n")
     
+    CATALOG.load_curated()
+    INDEX.add_documents(catalog_documents(CATALOG.resources()))
+    
     # Step 1: Conduct Quiz
     quiz_results = conduct_quiz()
     
@@ -33,6 +33,10 @@ class BayesianKnowledgeTracing:
         
         return max(0.0, min(1.0, new_mastery))
     
+    def predict_correct(self, mastery: float) -> float:
+        """Probability that the next answer is correct at the given mastery"""
+        return mastery * (1 - self.params.p_slip) + (1 - mastery) * self.params.p_guess
+    
     def recommend_difficulty(self, mastery: float) -> str:
         """Return difficulty level as string (easy, medium, hard) based on mastery"""
         if mastery < 0.3:
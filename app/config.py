@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,6 +18,96 @@ class Settings(BaseSettings):
     ai_api_key: str = "ai-key-change-in-production"
     
     cors_origins: list = ["http://localhost:5000", "http://localhost:3000"]
+    
+    gemini_base_url: Optional[str] = None
+    http_max_connections: int = 50
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_enable_http2: bool = True
+    http_timeout_seconds: float = 60.0
+    
+    gemini_requests_per_minute: float = 300
+    gemini_tokens_per_minute: float = 1_000_000
+    # Per-tenant model calls per minute (0 = no per-tenant limit), with overrides by tenant id
+    tenant_generation_rpm: float = 0.0
+    tenant_generation_quotas: Dict[str, float] = {}
+    admission_max_wait_live_seconds: float = 10.0
+    admission_max_wait_prefetch_seconds: float = 2.0
+    admission_max_wait_recommendation_seconds: float = 5.0
+    
+    hedge_enabled: bool = False
+    hedge_quantile: float = 0.9
+    hedge_max_ratio: float = 0.1
+    hedge_min_samples: int = 20
+    hedge_default_delay_seconds: float = 4.0
+    
+    question_bank_enabled: bool = True
+    question_bank_path: str = "data/question_bank.db"
+    question_bank_fresh_ratio: float = 0.2
+    # Generate a WebSocket session's next question while the current one is
+    # answered. HTTP next-question never prefetches: many HTTP clients stop
+    # before asking again, which would leave a paid model call unused.
+    question_prefetch_enabled: bool = True
+    
+    # Curated learning resources, ranked for weak topics in learning-path recommendations
+    resource_catalog_enabled: bool = True
+    resource_catalog_path: str = "data/resource_catalog.db"
+    resource_catalog_results: int = 3
+    # Retrieval for recommendation prompts: catalogued resources are chunked and
+    # embedded with a local sentence-transformers model, or hashed TF-IDF vectors
+    # when rag_embedding_model is empty or cannot be loaded
+    rag_enabled: bool = True
+    rag_index_dir: str = "data/rag_index"
+    rag_embedding_model: str = ""
+    rag_embedding_dim: int = 512
+    rag_top_k: int = 4
+
+    websocket_max_message_bytes: int = 16384
+    
+    # Per-subject termination policies, e.g.
+    # {"Maths": {"strategy": "confidence", "max_questions": 20, "max_ability_se": 0.5}}
+    default_quiz_length: int = 15
+    termination_policies: Dict[str, Dict[str, Any]] = {}
+    
+    irt_model: str = "2pl"
+    irt_min_responses_per_item: int = 5
+    irt_min_items: int = 20
+    irt_calibration_interval_seconds: int = 3600
+    
+    fast_json_responses: bool = False
+    warmup_on_startup: bool = False
+    # Questions generated into the fallback pool per subject and difficulty at warmup
+    warmup_pool_questions: int = 2
+    
+    journal_enabled: bool = False
+    journal_dir: str = "data/journal"
+    journal_fsync_interval_ms: float = 5.0
+    journal_snapshot_interval_seconds: int = 600
+    
+    # Process-wide GIL switch interval set at startup; 0 keeps the interpreter
+    # default (5 ms). Analytics run on a worker thread that can hold the GIL
+    # for one interval before the event loop gets it back, so e.g. 0.5 bounds
+    # that delay, at some throughput cost for every thread in the process.
+    gil_switch_interval_ms: float = 0.0
+    
+    # Loop stalls at least this long are captured with the blocking stack;
+    # requests at least slow_request_ms long are logged for diagnostics
+    loop_stall_threshold_ms: float = 100.0
+    slow_request_ms: float = 1000.0
+    
+    # EXPERIMENTAL: number of storage shard processes; 0 keeps storage in the
+    # API process. Only the quiz flow and /api/powerbi/analytics work across
+    # shards; subject analytics, growth/history, recommendations, last quiz,
+    # user skills and export/import answer 501. Ignored unless
+    # storage_sharding_experimental is also set.
+    storage_shards: int = 0
+    storage_sharding_experimental: bool = False
+    # Tenant partitions besides "default", selected per request with the X-Tenant-ID header
+    tenant_ids: List[str] = []
+    
+    rollup_minute_retention_hours: int = 6
+    rollup_hour_retention_days: int = 30
+    rollup_compaction_interval_seconds: int = 300
 
 
 settings = Settings()
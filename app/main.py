@@ -1,20 +1,51 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, Depends, Header, Query, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from typing import List, Optional
-from datetime import datetime
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import json
+import logging
+import random
+import sys
 from pathlib import Path
 
+from pydantic import ValidationError
+
 from app.config import settings
+from app.auth import verify_admin_key
 from app.models import (
-    AnswerSubmission, AssessmentSession, 
+    AnswerSubmission, AnswerAndAdvanceResponse, AssessmentSession, ChannelAnswer,
     NextQuestionRequest, NextQuestionResponse, AssessmentComplete,
-    DifficultyLevel, SubjectInfo
+    DifficultyLevel, SubjectInfo, SessionMode, TerminationPolicyInfo,
+    BatchAnswerSubmission, BatchAnswerResult, BatchAnswerResponse
 )
 from app.bkt_model import bkt_model
 from app.services.question_generator import question_generator
-from app.services.storage import storage
+from app.services.admission import AdmissionRejected, Priority
+from app.services.prefetch import question_prefetcher
+from app.services.question_bank import DEFAULT_ITEM_DIFFICULTY, question_bank
+from app.services.question_validation import validate_question
+from app.services.resource_catalog import resource_catalog, validate_resource
+from app.services.vector_index import catalog_documents, rag_index
+from app.services.irt import irt_engine, estimate_ability_from_buckets
+from app.services.topic_scheduler import topic_scheduler
+from app.services.spaced_repetition import review_scheduler
+from app.services.tenancy import DEFAULT_TENANT, Tenant, TenantRegistry
+from app.services.termination import TerminationPolicy, policy_for
+from app.services.journal import EventJournal
+from app.services.serialization import dumps
+from app.services.storage import InMemoryStorage, storage
+from app.services.sharding import LocalStorage, ShardedStorage
+from app.services.analytics import analytics_executor, performance_summary, subject_analytics
+from app.services.diagnostics import (
+    SlowRequestMiddleware, loop_lag_monitor, profiler, slow_request_log, stall_detector
+)
+from app.services import bulk_io
+from app.services.pagination import encode_cursor, decode_cursor, downsample, stream_json_array
+from app.services.rollups import rollup_store, parse_timestamp
+from app.services.serialization import respond, build_model
 
 app = FastAPI(
     title=settings.app_name,
@@ -29,6 +60,189 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(SlowRequestMiddleware, log=slow_request_log)
+
+logger = logging.getLogger(__name__)
+
+# Quiz and analytics handlers go through `store`, which is the in-process
+# storage or, with experimental sharding enabled, a router over shard processes.
+if settings.storage_shards and not settings.storage_sharding_experimental:
+    logger.warning(
+        "storage_shards is ignored: sharded storage is experimental and disables most analytics "
+        "endpoints; set storage_sharding_experimental to enable it"
+    )
+elif settings.storage_shards:
+    logger.warning(
+        "Experimental sharded storage: subject analytics, growth/history, recommendations, "
+        "last quiz, user skills and export/import are unavailable (501)"
+    )
+store = (
+    ShardedStorage(settings.storage_shards)
+    if settings.storage_shards and settings.storage_sharding_experimental
+    else LocalStorage(storage)
+)
+
+if settings.journal_enabled and store.sharded:
+    logger.warning("The event journal does not support sharded storage; journaling is disabled")
+
+journal = EventJournal(
+    settings.journal_dir,
+    fsync_interval=settings.journal_fsync_interval_ms / 1000
+) if settings.journal_enabled and not store.sharded else None
+
+# Handlers work on the requesting tenant's partition. The default tenant is
+# the storage above; each configured tenant gets its own partition.
+tenants = TenantRegistry(Tenant(
+    DEFAULT_TENANT, storage, store, rollup_store, review_scheduler, analytics_executor, journal
+))
+if settings.tenant_ids and store.sharded:
+    logger.warning("Tenant partitions are not supported with sharded storage; only the default tenant is served")
+else:
+    for tenant_id in settings.tenant_ids:
+        if tenant_id != DEFAULT_TENANT:
+            tenants.add(Tenant.create(tenant_id))
+
+
+def current_tenant(x_tenant_id: Optional[str] = Header(None)) -> Tenant:
+    """The tenant named by the X-Tenant-ID header, or the default tenant"""
+    tenant = tenants.get(x_tenant_id)
+    if tenant is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown tenant"
+        )
+    return tenant
+
+
+async def _compact_rollups_periodically():
+    while True:
+        await asyncio.sleep(settings.rollup_compaction_interval_seconds)
+        try:
+            compacted = sum(tenant.rollups.compact() for tenant in tenants)
+            if compacted:
+                logger.info(f"Compacted {compacted} rollup buckets")
+        except Exception as e:
+            logger.error(f"Rollup compaction failed: {e}")
+
+
+def _calibrate_irt(subject: str) -> Dict[str, Any]:
+    # Bank items are shared, so every tenant's responses calibrate them
+    attempts_by_session = {
+        session_id: tenant.storage.get_attempts(session_id)
+        for tenant in tenants
+        for session_id in tenant.storage.get_subject_session_ids(subject)
+    }
+    return irt_engine.calibrate_subject(subject, attempts_by_session, question_bank)
+
+
+async def _calibrate_irt_periodically():
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(settings.irt_calibration_interval_seconds)
+        try:
+            await loop.run_in_executor(None, question_bank.flush_served)
+        except Exception as e:
+            logger.error(f"Question bank serve count flush failed: {e}")
+        subjects = {subject for tenant in tenants for subject in list(tenant.storage.sessions_by_subject)}
+        for subject in subjects:
+            try:
+                await loop.run_in_executor(None, _calibrate_irt, subject)
+            except Exception as e:
+                logger.error(f"IRT calibration failed for {subject}: {e}")
+
+
+async def _compact_journal_periodically(tenant: Tenant):
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(settings.journal_snapshot_interval_seconds)
+        try:
+            result = await loop.run_in_executor(None, tenant.journal.compact)
+            logger.info(f"Journal snapshot for tenant {tenant.tenant_id} at LSN {result['snapshot_lsn']}")
+        except Exception as e:
+            logger.error(f"Journal compaction failed for tenant {tenant.tenant_id}: {e}")
+
+
+# Interpreter switch interval to restore at shutdown, when startup changed it
+_default_switch_interval: Optional[float] = None
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    if settings.gil_switch_interval_ms:
+        global _default_switch_interval
+        _default_switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(settings.gil_switch_interval_ms / 1000)
+        logger.info(f"GIL switch interval set to {settings.gil_switch_interval_ms} ms")
+    loop_lag_monitor.start()
+    stall_detector.start()
+    if store.sharded:
+        await store.start()
+    for tenant in tenants:
+        if tenant.journal is not None:
+            # Recover before anything else touches storage
+            recovery = tenant.journal.recover(tenant.storage)
+            tenant.storage.attach_journal(tenant.journal)
+            logger.info(
+                f"Recovered storage for tenant {tenant.tenant_id} from journal: "
+                f"snapshot LSN {recovery['snapshot_lsn']}, "
+                f"{recovery['replayed_events']} events replayed in {recovery['seconds']}s"
+            )
+            asyncio.create_task(_compact_journal_periodically(tenant))
+    asyncio.create_task(_compact_rollups_periodically())
+    if settings.question_bank_enabled and settings.irt_calibration_interval_seconds > 0:
+        asyncio.create_task(_calibrate_irt_periodically())
+    if settings.resource_catalog_enabled:
+        loop = asyncio.get_event_loop()
+        added = await loop.run_in_executor(None, resource_catalog.load_curated)
+        logger.info(f"Resource catalog ready: {resource_catalog.stats()['resources']} resources ({added} newly curated)")
+        if settings.rag_enabled:
+            chunks = await loop.run_in_executor(None, _index_catalog)
+            logger.info(f"Retrieval index ready: {rag_index.stats()['chunks']} chunks ({chunks} new)")
+    if settings.warmup_on_startup:
+        # Runs after startup completes, so the server is already accepting traffic.
+        asyncio.create_task(question_generator.warmup())
+
+
+@app.on_event("shutdown")
+async def close_storage():
+    for tenant in tenants:
+        if tenant.journal is not None:
+            tenant.journal.close()
+        if tenant.store.sharded:
+            tenant.store.close()
+        tenant.analytics.close()
+    rag_index.close()
+    question_bank.flush_served()
+    stall_detector.stop()
+    if _default_switch_interval is not None:
+        sys.setswitchinterval(_default_switch_interval)
+
+
+def _index_catalog() -> int:
+    """Embed catalogued resources the retrieval index does not have yet"""
+    return rag_index.add_documents(catalog_documents(resource_catalog.resources()))
+
+
+def _retrieve_for_areas(areas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Retrieved chunks for the weak areas, best first, without repeats"""
+    chunks = {}
+    for area in areas:
+        query = f"{area['topic']} {area['subject']}"
+        for chunk in rag_index.search(query, k=settings.rag_top_k, subject=area["subject"]):
+            key = (chunk["doc_id"], chunk["chunk"])
+            if key not in chunks or chunks[key]["score"] < chunk["score"]:
+                chunks[key] = chunk
+    return sorted(chunks.values(), key=lambda chunk: -chunk["score"])
+
+
+def _require_local_storage(tenant: Tenant):
+    """Reject endpoints that read the whole in-process storage when it is sharded"""
+    if tenant.store.sharded:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Not available with sharded storage (experimental)"
+        )
+
 
 FRONTEND_BUILD_DIR = Path(__file__).parent.parent / "frontend" / "dist"
 
@@ -78,19 +292,40 @@ async def get_subjects():
 
 
 @app.post("/api/assessment/start", response_model=AssessmentSession, tags=["Assessment"])
-async def start_assessment(subject: str, user_id: Optional[str] = None):
-    """Start a new adaptive assessment session"""
+async def start_assessment(
+    subject: str,
+    user_id: Optional[str] = None,
+    mode: SessionMode = SessionMode.ADAPTIVE,
+    tenant: Tenant = Depends(current_tenant)
+):
+    """
+    Start a new adaptive assessment session.
+    
+    In review mode, topics come from the user's spaced-repetition due queue
+    while any are due, then from the normal topic schedule.
+    """
     if subject not in ["Maths", "Science", "Python"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid subject. Must be one of: Maths, Science, Python"
         )
     
+    if mode == SessionMode.REVIEW and not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Review sessions require a user_id"
+        )
+    
     if not user_id:
         user_id = f"user_{datetime.utcnow().timestamp()}"
     
-    session_id = storage.create_session(user_id, subject)
-    session_data = storage.get_session(session_id)
+    session_id = await tenant.store.create_session(user_id, subject, mode=mode.value)
+    # The policy is fixed at session start so configuration changes don't affect running quizzes
+    policy = policy_for(subject)
+    _, session_data = await tenant.store.batch(session_id, [
+        ("update_session", (session_id, {"termination": policy.to_dict()})),
+        ("get_session", (session_id,))
+    ])
     
     return AssessmentSession(
         session_id=session_data["session_id"],
@@ -98,15 +333,93 @@ async def start_assessment(subject: str, user_id: Optional[str] = None):
         subject=session_data["subject"],
         created_at=datetime.fromisoformat(session_data["start_time"]),
         is_active=True,
-        total_questions=15,
-        questions_answered=session_data["total_questions"]
+        total_questions=policy.max_questions,
+        questions_answered=session_data["total_questions"],
+        mode=SessionMode(session_data["mode"]),
+        termination=TerminationPolicyInfo(**policy.to_dict())
     )
 
 
 @app.post("/api/assessment/next-question", response_model=NextQuestionResponse, tags=["Assessment"])
-async def get_next_question(request: NextQuestionRequest):
+async def get_next_question(request: NextQuestionRequest, tenant: Tenant = Depends(current_tenant)):
     """Get the next adaptive question based on BKT model"""
-    session = storage.get_session(request.session_id)
+    return respond(build_model(NextQuestionResponse, **await _serve_next_question(tenant, request.session_id)))
+
+
+def _draw_fresh() -> bool:
+    """Whether the next question is generated rather than served from the bank"""
+    return not settings.question_bank_enabled or random.random() < settings.question_bank_fresh_ratio
+
+
+def _question_payload(session: Dict[str, Any], policy: TerminationPolicy,
+                      question_data: Dict[str, Any], topic: str) -> Dict[str, Any]:
+    """The fields of NextQuestionResponse for a question about to be answered"""
+    return {
+        "session_id": session["session_id"],
+        "question_number": session["total_questions"] + 1,
+        "total_questions": policy.max_questions,
+        "current_difficulty": DifficultyLevel(session["current_difficulty"]),
+        "mastery_level": session["mastery_level"],
+        "question": question_data["question"],
+        "option_a": question_data["option_a"],
+        "option_b": question_data["option_b"],
+        "option_c": question_data["option_c"],
+        "option_d": question_data["option_d"],
+        "topic": question_data.get("topic", topic),
+        "subject": session["subject"]
+    }
+
+
+def _prefetch_next_question(tenant: Tenant, session: Dict[str, Any], question_data: Dict[str, Any],
+                            topic: str, previous_questions: List[str]):
+    """
+    Plan the question after this one and start generating it while the student answers.
+    
+    The answer is predicted as its more likely outcome under BKT, which
+    gives the next difficulty and, from the topic schedule, the next topic.
+    """
+    session_id = session["session_id"]
+    mastery = session["mastery_level"]
+    is_correct = bkt_model.predict_correct(mastery) >= 0.5
+    difficulty = bkt_model.recommend_difficulty(bkt_model.update_mastery(mastery, is_correct))
+    next_topic = topic_scheduler.predict_topic(
+        session_id,
+        session["subject"],
+        question_data.get("topic", topic),
+        question_data.get("difficulty", session["current_difficulty"]),
+        is_correct,
+        difficulty
+    )
+    if next_topic is None:
+        return
+    
+    fresh = _draw_fresh()
+    generation = None
+    if fresh:
+        generation = question_generator.generate_question(
+            subject=session["subject"],
+            topic=next_topic,
+            difficulty=difficulty,
+            previous_questions=list(previous_questions) + [question_data["question"]],
+            priority=Priority.PREFETCH,
+            tenant=tenant.tenant_id
+        )
+    question_prefetcher.plan(session_id, difficulty, next_topic, fresh, generation)
+
+
+async def _serve_next_question(tenant: Tenant, session_id: str, prefetch: bool = False) -> Dict[str, Any]:
+    """
+    Choose and store the session's next question, returning the fields of NextQuestionResponse.
+    
+    With prefetch (WebSocket sessions), the question after this one is
+    planned and, if it will be generated, started in the background.
+    """
+    session, previous_questions, attempts, issued = await tenant.store.batch(session_id, [
+        ("get_session", (session_id,)),
+        ("get_question_history", (session_id,)),
+        ("get_attempts", (session_id,)),
+        ("get_issued_questions", (session_id,))
+    ])
     
     if not session:
         raise HTTPException(
@@ -120,58 +433,156 @@ async def get_next_question(request: NextQuestionRequest):
             detail="Session is not active"
         )
     
-    if session["total_questions"] >= 15:
+    policy = _session_policy(session)
+    if session["total_questions"] >= policy.max_questions:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Assessment complete. Maximum questions reached."
         )
     
+    if session.get("stop_reason"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Assessment complete. Stopped early: {session['stop_reason']}."
+        )
+    
     current_difficulty = session["current_difficulty"]
-    mastery_level = session["mastery_level"]
     
-    topic = await question_generator.generate_topic_for_subject(
-        session["subject"], 
-        current_difficulty
+    # Stored mastery only seeds a new schedule, so it is fetched once per session
+    stored_masteries = {}
+    if not topic_scheduler.has_schedule(session_id):
+        stored_masteries = await tenant.store.get_topic_masteries(
+            session["user_id"], session["subject"], topic_scheduler.topics(session["subject"])
+        )
+    
+    review_topic = None
+    if session.get("mode") == SessionMode.REVIEW.value:
+        review_topic = tenant.reviews.next_due_topic(session["user_id"], session["subject"])
+    topic = review_topic or topic_scheduler.next_topic(
+        session_id,
+        session["subject"],
+        current_difficulty,
+        mastery_lookup=stored_masteries.get
     )
     
-    previous_questions = storage.get_question_history(request.session_id)
+    # A question planned while the previous one was being answered
+    planned = question_prefetcher.pop(session_id)
     
+    # Bank lookups and inserts are SQLite calls, so they run off the event loop
+    loop = asyncio.get_event_loop()
     try:
-        question_data = await question_generator.generate_question(
-            subject=session["subject"],
-            topic=topic,
-            difficulty=current_difficulty,
-            previous_questions=previous_questions
-        )
-        
-        storage.add_question_to_history(request.session_id, question_data["question"])
-        storage.store_current_question(request.session_id, question_data)
+        question_data = None
+        # Serve from the bank when it has an unseen item; a fraction of requests
+        # still go to the model so the bank keeps growing.
+        fresh = planned.fresh if planned is not None else _draw_fresh()
+        if not fresh:
+            # With a calibration for the subject, serve the item on the scheduled
+            # topic and difficulty bucket with maximum information at the
+            # session's current ability estimate. Answered items and items
+            # issued but not yet answered are never served again.
+            responses = [
+                (a["item_id"], a.get("is_correct", False))
+                for a in attempts if a.get("item_id") is not None
+            ]
+            selection = None
+            if review_topic is None and irt_engine.is_calibrated(session["subject"]):
+                candidates = await loop.run_in_executor(
+                    None, question_bank.item_ids, session["subject"], current_difficulty, topic
+                )
+                seen = [item_id for item_id, _ in responses]
+                seen += [q["bank_id"] for q in issued if q.get("bank_id") is not None]
+                selection = irt_engine.select_item(
+                    session["subject"], responses, exclude=seen, candidates=candidates
+                )
+            if selection is not None:
+                question_data = await loop.run_in_executor(None, question_bank.get, selection[0])
+                if question_data is not None and question_data["question"] in previous_questions:
+                    question_data = None
+            if question_data is None:
+                question_data = await loop.run_in_executor(None, lambda: question_bank.pick(
+                    session["subject"],
+                    current_difficulty,
+                    exclude=previous_questions,
+                    topic=topic
+                ))
+        if question_data is None:
+            question_data = await question_prefetcher.take(planned, current_difficulty, topic)
+            if question_data is None:
+                question_data = await question_generator.generate_question(
+                    subject=session["subject"],
+                    topic=topic,
+                    difficulty=current_difficulty,
+                    previous_questions=previous_questions,
+                    tenant=tenant.tenant_id
+                )
+            if settings.question_bank_enabled:
+                bank_id = await loop.run_in_executor(None, question_bank.add, question_data)
+                if bank_id is not None:
+                    question_data["bank_id"] = bank_id
         
-        return NextQuestionResponse(
-            session_id=request.session_id,
-            question_number=session["total_questions"] + 1,
-            total_questions=15,
-            current_difficulty=DifficultyLevel(current_difficulty),
-            mastery_level=mastery_level,
-            question=question_data["question"],
-            option_a=question_data["option_a"],
-            option_b=question_data["option_b"],
-            option_c=question_data["option_c"],
-            option_d=question_data["option_d"],
-            topic=topic,
-            subject=session["subject"]
+        await tenant.store.batch(session_id, [
+            ("add_question_to_history", (session_id, question_data["question"])),
+            ("store_current_question", (session_id, question_data))
+        ])
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Question generation is busy, please retry shortly",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
         )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate question: {str(e)}"
         )
+    
+    if (prefetch and settings.question_prefetch_enabled and review_topic is None
+            and session["total_questions"] + 1 < policy.max_questions):
+        _prefetch_next_question(tenant, session, question_data, topic, previous_questions)
+    
+    return _question_payload(session, policy, question_data, topic)
 
 
-@app.post("/api/assessment/submit-answer", tags=["Assessment"])
-async def submit_answer(submission: AnswerSubmission):
-    """Submit an answer and get feedback with BKT update"""
-    session = storage.get_session(submission.session_id)
+def _session_policy(session: Dict[str, Any]) -> TerminationPolicy:
+    if session.get("termination"):
+        return TerminationPolicy.from_dict(session["termination"])
+    return policy_for(session["subject"])
+
+
+def _ability_se(session: Dict[str, Any], attempts: List[Dict[str, Any]]) -> float:
+    """Standard error of the session's ability estimate: IRT when calibrated, else difficulty buckets"""
+    estimate = None
+    if any(a.get("item_id") is not None for a in attempts):
+        estimate = irt_engine.estimate(session["subject"], [
+            (a["item_id"], a.get("is_correct", False)) for a in attempts if a.get("item_id") is not None
+        ])
+    if estimate is None:
+        estimate = estimate_ability_from_buckets(
+            (a.get("difficulty", "medium"), a.get("is_correct", False)) for a in attempts
+        )
+    return estimate[1]
+
+
+async def _apply_answer(
+    tenant: Tenant,
+    session_id: str,
+    selected_answer: str,
+    time_spent: Optional[int] = None,
+    topic_hint: Optional[str] = None,
+    client_timestamp: Optional[datetime] = None,
+    question: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Grade an answer and apply the BKT update.
+    
+    The answer is for the session's current question, or, given its text,
+    for any question issued to the session and not yet answered.
+    """
+    session, current_question = await tenant.store.batch(session_id, [
+        ("get_session", (session_id,)),
+        ("get_current_question", (session_id,)) if question is None
+        else ("get_issued_question", (session_id, question))
+    ])
     
     if not session:
         raise HTTPException(
@@ -185,30 +596,39 @@ async def submit_answer(submission: AnswerSubmission):
             detail="Session is not active"
         )
     
-    current_question = storage.get_current_question(submission.session_id)
-    
     if not current_question:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No question has been asked yet"
+            detail="No question has been asked yet" if question is None
+            else "Question was not issued to this session or is already answered"
         )
     
     correct_answer = current_question["correct_answer"]
     explanation = current_question.get("explanation", "")
-    topic = current_question.get("topic", submission.topic if submission.topic else "General")
+    topic = current_question.get("topic", topic_hint if topic_hint else "General")
     current_difficulty = current_question.get("difficulty", session["current_difficulty"])
     
-    is_correct = submission.selected_answer.upper() == correct_answer
+    is_correct = selected_answer.upper() == correct_answer
     
-    attempt_data = storage.add_attempt(submission.session_id, {
+    attempt = {
         "question": current_question["question"],
-        "selected_answer": submission.selected_answer.upper(),
+        "selected_answer": selected_answer.upper(),
         "correct_answer": correct_answer,
         "is_correct": is_correct,
-        "time_spent": submission.time_spent if submission.time_spent else 0,
+        "time_spent": time_spent if time_spent else 0,
         "topic": topic,
         "difficulty": current_difficulty
-    })
+    }
+    if current_question.get("bank_id") is not None:
+        attempt["item_id"] = current_question["bank_id"]
+    if client_timestamp:
+        attempt["client_timestamp"] = client_timestamp.isoformat()
+    
+    _, attempts = await tenant.store.batch(session_id, [
+        ("add_attempt", (session_id, attempt)),
+        ("get_attempts", (session_id,))
+    ])
+    topic_scheduler.record_answer(session_id, topic, current_difficulty, is_correct)
     
     current_mastery = session["mastery_level"]
     new_mastery = bkt_model.update_mastery(current_mastery, is_correct)
@@ -218,22 +638,30 @@ async def submit_answer(submission: AnswerSubmission):
     new_total = session["total_questions"] + 1
     new_correct = session["correct_answers"] + (1 if is_correct else 0)
     
-    storage.update_session(submission.session_id, {
-        "total_questions": new_total,
-        "correct_answers": new_correct,
-        "mastery_level": new_mastery,
-        "current_difficulty": new_difficulty
-    })
+    policy = _session_policy(session)
+    ability_se = None
+    if policy.strategy == "confidence" and policy.max_ability_se is not None:
+        ability_se = _ability_se(session, attempts)
+    stop_reason = policy.stop_reason(new_total, ability_se)
+    
+    await tenant.store.batch(session_id, [
+        ("update_session", (session_id, {
+            "total_questions": new_total,
+            "correct_answers": new_correct,
+            "mastery_level": new_mastery,
+            "current_difficulty": new_difficulty,
+            "stop_reason": stop_reason
+        })),
+        ("clear_current_question", (session_id, question))
+    ])
     
-    storage.update_user_skill(
+    await tenant.store.update_user_skill(
         session["user_id"],
         session["subject"],
         topic,
         new_mastery
     )
     
-    storage.current_questions.pop(submission.session_id, None)
-    
     return {
         "is_correct": is_correct,
         "correct_answer": correct_answer,
@@ -241,14 +669,132 @@ async def submit_answer(submission: AnswerSubmission):
         "new_mastery_level": round(new_mastery, 2),
         "new_difficulty": new_difficulty,
         "questions_answered": new_total,
-        "total_correct": new_correct
+        "total_correct": new_correct,
+        "assessment_complete": stop_reason is not None,
+        "stop_reason": stop_reason
     }
 
 
+@app.post("/api/assessment/submit-answer", tags=["Assessment"])
+async def submit_answer(submission: AnswerSubmission, tenant: Tenant = Depends(current_tenant)):
+    """Submit an answer and get feedback with BKT update"""
+    return respond(await _apply_answer(
+        tenant,
+        submission.session_id,
+        submission.selected_answer,
+        time_spent=submission.time_spent,
+        topic_hint=submission.topic
+    ))
+
+
+@app.post("/api/assessment/answer-and-advance", response_model=AnswerAndAdvanceResponse, tags=["Assessment"])
+async def answer_and_advance(submission: AnswerSubmission, tenant: Tenant = Depends(current_tenant)):
+    """
+    Submit an answer and get the next question in the same response.
+    
+    The answer is graded exactly like submit-answer, then, unless the
+    assessment is complete, the next question is served exactly like
+    next-question. The answer is applied even if serving the next question
+    fails; next_question is then null with the reason in
+    next_question_error, and next-question can be retried.
+    """
+    result = await _apply_answer(
+        tenant,
+        submission.session_id,
+        submission.selected_answer,
+        time_spent=submission.time_spent,
+        topic_hint=submission.topic
+    )
+    next_question = next_question_error = None
+    if not result["assessment_complete"]:
+        try:
+            next_question = build_model(NextQuestionResponse, **await _serve_next_question(tenant, submission.session_id))
+        except HTTPException as e:
+            next_question_error = e.detail
+    return respond(build_model(
+        AnswerAndAdvanceResponse,
+        **result,
+        next_question=next_question,
+        next_question_error=next_question_error
+    ))
+
+
+@app.post("/api/assessment/submit-answers", response_model=BatchAnswerResponse, tags=["Assessment"])
+async def submit_answers(batch: BatchAnswerSubmission, tenant: Tenant = Depends(current_tenant)):
+    """
+    Apply a batch of buffered answers in order, for one or many sessions.
+    
+    Each item is graded exactly like submit-answer, against the question
+    whose text it carries, so several answers buffered for one session are
+    each graded against their own question; items without question text
+    answer the current question. Each idempotency key is claimed in
+    storage before its answer is applied, so concurrent retries cannot
+    both apply it; a key that was already applied for that session is not
+    re-applied and its stored result is returned with status "duplicate",
+    so a retried batch is safe. Keys are kept for
+    PROCESSED_ANSWER_TTL_SECONDS after the session is completed.
+    """
+    results = []
+    counts = {"applied": 0, "duplicate": 0, "error": 0}
+    
+    for item in batch.answers:
+        claim, previous = await tenant.store.reserve_processed_answer(item.session_id, item.idempotency_key)
+        if claim == "applied":
+            status_name, result, error = "duplicate", previous, None
+        elif claim == "in_progress":
+            status_name, result, error = "error", None, "An answer with this idempotency key is being applied"
+        else:
+            try:
+                result = await _apply_answer(
+                    tenant,
+                    item.session_id,
+                    item.selected_answer,
+                    time_spent=item.time_spent,
+                    topic_hint=item.topic,
+                    client_timestamp=item.client_timestamp,
+                    question=item.question
+                )
+            except HTTPException as e:
+                await tenant.store.release_processed_answer(item.session_id, item.idempotency_key)
+                status_name, result, error = "error", None, e.detail
+            except Exception:
+                await tenant.store.release_processed_answer(item.session_id, item.idempotency_key)
+                raise
+            else:
+                await tenant.store.record_processed_answer(item.session_id, item.idempotency_key, result)
+                status_name, error = "applied", None
+        
+        counts[status_name] += 1
+        results.append(BatchAnswerResult(
+            idempotency_key=item.idempotency_key,
+            session_id=item.session_id,
+            status=status_name,
+            result=result,
+            error=error
+        ))
+    
+    return BatchAnswerResponse(
+        applied=counts["applied"],
+        duplicates=counts["duplicate"],
+        errors=counts["error"],
+        results=results
+    )
+
+
 @app.post("/api/assessment/complete", response_model=AssessmentComplete, tags=["Assessment"])
-async def complete_assessment(session_id: str):
+async def complete_assessment(session_id: str, tenant: Tenant = Depends(current_tenant)):
     """Complete an assessment and get learning path recommendations"""
-    session = storage.complete_session(session_id)
+    return respond(build_model(AssessmentComplete, **await _complete_session(tenant, session_id)))
+
+
+async def _complete_session(tenant: Tenant, session_id: str) -> Dict[str, Any]:
+    """Complete a session and summarise it, returning the fields of AssessmentComplete"""
+    session, attempts = await tenant.store.batch(session_id, [
+        ("complete_session", (session_id,)),
+        ("get_attempts", (session_id,))
+    ])
+    topic_scheduler.end_session(session_id)
+    question_prefetcher.drop(session_id)
     
     if not session:
         raise HTTPException(
@@ -256,8 +802,6 @@ async def complete_assessment(session_id: str):
             detail="Session not found"
         )
     
-    attempts = storage.get_attempts(session_id)
-    
     if len(attempts) == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -288,112 +832,613 @@ async def complete_assessment(session_id: str):
             elif topic_accuracy >= 80:
                 strong_topics.append(topic)
     
-    return AssessmentComplete(
-        session_id=session_id,
-        total_questions=total_questions,
-        correct_answers=correct_answers,
-        accuracy=round(accuracy, 2),
-        final_mastery_level=round(session["mastery_level"], 2),
-        time_taken=0,
-        weak_topics=weak_topics,
-        strong_topics=strong_topics,
-        recommended_resources=[]
-    )
+    return {
+        "session_id": session_id,
+        "total_questions": total_questions,
+        "correct_answers": correct_answers,
+        "accuracy": round(accuracy, 2),
+        "final_mastery_level": round(session["mastery_level"], 2),
+        "time_taken": 0,
+        "weak_topics": weak_topics,
+        "strong_topics": strong_topics,
+        "recommended_resources": []
+    }
+
+
+@app.websocket("/api/assessment/{session_id}/ws")
+async def assessment_channel(
+    websocket: WebSocket,
+    session_id: str,
+    binary: bool = True,
+    tenant_id: Optional[str] = Query(None, alias="tenant"),
+    x_tenant_id: Optional[str] = Header(None)
+):
+    """
+    Persistent assessment channel for one session.
+    
+    Each question is pushed as soon as the previous answer is graded, and
+    the one after it is already being generated while the student answers.
+    Client messages are JSON objects with a "type": "answer" (the fields of
+    ChannelAnswer), "next" (retry serving a question after an error),
+    "complete" or "ping". The server sends "session", "question", "result"
+    (with the session's per-topic mastery), "complete", "pong" and "error"
+    messages as compact JSON, in binary frames or, with binary=false, text
+    frames. The channel closes after the "complete" message.
+    
+    Messages are handled one at a time and the next is not read until the
+    replies to the previous one are sent, so a client that floods the
+    channel is held back by transport flow control instead of buffered
+    here. Session state lives in storage, so reconnecting with the same
+    session id resumes: the unanswered question is sent again, and an answer
+    resent with the same idempotency key is not applied twice. Browsers
+    cannot set headers on a WebSocket, so the tenant can also be given as
+    the tenant query parameter.
+    """
+    async def send(message: Dict[str, Any]):
+        data = dumps(message)
+        if binary:
+            await websocket.send_bytes(data)
+        else:
+            await websocket.send_text(data.decode("utf-8"))
+    
+    async def send_error(status_code: int, detail: Any):
+        await send({"type": "error", "status": status_code, "detail": detail})
+    
+    async def send_question():
+        try:
+            await send({"type": "question", **await _serve_next_question(tenant, session_id, prefetch=True)})
+        except HTTPException as e:
+            await send_error(e.status_code, e.detail)
+    
+    async def finish():
+        await send({"type": "complete", **await _complete_session(tenant, session_id)})
+        await websocket.close()
+    
+    await websocket.accept()
+    tenant = tenants.get(tenant_id or x_tenant_id)
+    if tenant is None:
+        await send_error(status.HTTP_404_NOT_FOUND, "Unknown tenant")
+        await websocket.close(code=4404)
+        return
+    session, current_question = await tenant.store.batch(session_id, [
+        ("get_session", (session_id,)),
+        ("get_current_question", (session_id,))
+    ])
+    if not session:
+        await send_error(status.HTTP_404_NOT_FOUND, "Session not found")
+        await websocket.close(code=4404)
+        return
+    
+    policy = _session_policy(session)
+    try:
+        await send({
+            "type": "session",
+            "session_id": session_id,
+            "subject": session["subject"],
+            "mode": session.get("mode", SessionMode.ADAPTIVE.value),
+            "status": session["status"],
+            "questions_answered": session["total_questions"],
+            "total_questions": policy.max_questions,
+            "mastery_level": session["mastery_level"],
+            "current_difficulty": session["current_difficulty"]
+        })
+        if session["status"] != "active":
+            await websocket.close()
+            return
+        if session.get("stop_reason") or session["total_questions"] >= policy.max_questions:
+            await finish()
+            return
+        if current_question:
+            await send({"type": "question", **_question_payload(
+                session, policy, current_question, current_question.get("topic", "General")
+            )})
+        else:
+            await send_question()
+        
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            data = message.get("bytes") or (message.get("text") or "").encode("utf-8")
+            if len(data) > settings.websocket_max_message_bytes:
+                await send_error(413, "Message too large")
+                await websocket.close(code=1009)
+                return
+            try:
+                request = json.loads(data)
+                kind = request.pop("type")
+            except (ValueError, TypeError, KeyError, AttributeError):
+                await send_error(status.HTTP_400_BAD_REQUEST, "Messages must be JSON objects with a type")
+                continue
+            
+            if kind == "ping":
+                await send({"type": "pong"})
+            elif kind == "next":
+                await send_question()
+            elif kind == "complete":
+                try:
+                    await finish()
+                    return
+                except HTTPException as e:
+                    await send_error(e.status_code, e.detail)
+            elif kind == "answer":
+                try:
+                    answer = ChannelAnswer(**request)
+                except ValidationError as e:
+                    await send_error(status.HTTP_422_UNPROCESSABLE_ENTITY, e.errors(include_url=False))
+                    continue
+                result = None
+                if answer.idempotency_key:
+                    result = await tenant.store.get_processed_answer(session_id, answer.idempotency_key)
+                if result is not None:
+                    await send({"type": "result", "duplicate": True, **result})
+                    continue
+                try:
+                    result = await _apply_answer(
+                        tenant,
+                        session_id,
+                        answer.selected_answer,
+                        time_spent=answer.time_spent,
+                        topic_hint=answer.topic
+                    )
+                except HTTPException as e:
+                    await send_error(e.status_code, e.detail)
+                    continue
+                if answer.idempotency_key:
+                    await tenant.store.record_processed_answer(session_id, answer.idempotency_key, result)
+                await send({
+                    "type": "result",
+                    "duplicate": False,
+                    **result,
+                    "topic_mastery": topic_scheduler.topic_mastery(session_id)
+                })
+                if result["assessment_complete"]:
+                    await finish()
+                    return
+                await send_question()
+            else:
+                await send_error(status.HTTP_400_BAD_REQUEST, f"Unknown message type: {kind}")
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/api/review/due", tags=["Review"])
+async def get_due_reviews(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    tenant: Tenant = Depends(current_tenant)
+):
+    """Topics due for spaced-repetition review for a user, most overdue first"""
+    due = tenant.reviews.due_cards(user_id, limit=limit)
+    return {"user_id": user_id, "due_count": len(due), "due": due}
+
+
+@app.get("/api/admin/review/due-counts", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def get_due_review_counts(tenant: Tenant = Depends(current_tenant)):
+    """Number of topics due for review for every user with at least one due, for notifications"""
+    return tenant.reviews.due_counts()
 
 
 @app.get("/api/powerbi/analytics", tags=["Analytics"])
-async def get_powerbi_analytics():
+async def get_powerbi_analytics(include_user_skills: bool = True, tenant: Tenant = Depends(current_tenant)):
     """Get comprehensive analytics data for Power BI dashboard"""
-    analytics = storage.get_analytics_data()
-    return analytics
+    if tenant.store.sharded:
+        analytics = await tenant.store.get_analytics_data(include_user_skills=include_user_skills)
+    else:
+        analytics = await tenant.analytics.run(InMemoryStorage.get_analytics_data, include_user_skills)
+    return respond(analytics)
+
+
+@app.get("/api/powerbi/analytics/user-skills", tags=["Analytics"])
+async def stream_user_skills(tenant: Tenant = Depends(current_tenant)):
+    """Stream every user skill entry as a JSON array"""
+    _require_local_storage(tenant)
+    user_skills = tenant.storage.user_skills
+    skill_keys = list(user_skills.keys())
+    skills = (user_skills[key] for key in skill_keys if key in user_skills)
+    return StreamingResponse(stream_json_array(skills), media_type="application/json")
+
+
+@app.get("/api/admin/generation/metrics", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def get_generation_metrics():
+    """Get model-call metrics: HTTP transport, admission control, question pool, bank and prefetch"""
+    return {
+        **question_generator.metrics(),
+        "question_bank": question_bank.stats(),
+        "prefetch": question_prefetcher.stats()
+    }
+
+
+def _require_journal(tenant: Tenant) -> EventJournal:
+    if tenant.journal is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event journal is not enabled"
+        )
+    return tenant.journal
+
+
+@app.get("/api/admin/analytics/stats", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def get_analytics_stats(tenant: Tenant = Depends(current_tenant)):
+    """Analytics cache and snapshot counters for the tenant, and event-loop lag"""
+    return {**tenant.analytics.stats(), "loop_lag": loop_lag_monitor.stats()}
+
+
+@app.get("/api/admin/tenants", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def get_tenants():
+    """Configured tenants with their partition sizes and analytics counters, and generation quotas"""
+    return {
+        "tenants": {tenant.tenant_id: tenant.stats() for tenant in tenants},
+        "generation_quotas": question_generator.tenant_quotas.stats()
+    }
+
+
+@app.get("/api/admin/diagnostics", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def get_diagnostics():
+    """Event-loop lag, recent loop stalls with their blocking stacks, and recent slow requests"""
+    return {
+        "loop_lag": loop_lag_monitor.stats(),
+        "stalls": stall_detector.recent(),
+        "slow_requests": slow_request_log.recent(),
+        "profiler": profiler.stats()
+    }
+
+
+@app.post("/api/admin/diagnostics/profiler/start", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def start_profiler(
+    interval_ms: float = Query(5.0, ge=1.0, le=1000.0),
+    max_seconds: float = Query(300.0, gt=0, le=3600.0)
+):
+    """Start sampling every thread's stack; the profiler stops itself after max_seconds"""
+    try:
+        profiler.start(interval_ms / 1000, max_seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return profiler.stats()
+
+
+@app.post("/api/admin/diagnostics/profiler/stop", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def stop_profiler():
+    """Stop the profiler and return collapsed stacks for flamegraph.pl or speedscope"""
+    try:
+        collapsed = profiler.stop()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(collapsed)
+
+
+@app.get("/api/admin/journal/stats", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def get_journal_stats(tenant: Tenant = Depends(current_tenant)):
+    """Journal position, group-commit batching and files on disk"""
+    return _require_journal(tenant).stats()
+
+
+@app.post("/api/admin/journal/compact", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def compact_journal(tenant: Tenant = Depends(current_tenant)):
+    """Write a snapshot now and drop the journal segments it covers"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _require_journal(tenant).compact)
+
+
+@app.get("/api/admin/journal/events", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def stream_journal_events(
+    from_lsn: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1),
+    tenant: Tenant = Depends(current_tenant)
+):
+    """
+    Stream journal events as JSONL ({"lsn", "kind", "data"} per line) from an LSN.
+    
+    Consumers resume from the last LSN they processed plus one. Events
+    already folded into a snapshot are no longer available.
+    """
+    events = _require_journal(tenant).read_events(from_lsn)
+    
+    def lines():
+        for count, (lsn, kind, payload) in enumerate(events):
+            if limit is not None and count >= limit:
+                break
+            yield dumps({"lsn": lsn, "kind": kind, "data": payload}) + b"\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/api/admin/irt/calibrate", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def calibrate_irt(subject: str, tenant: Tenant = Depends(current_tenant)):
+    """Recalibrate IRT item parameters for a subject from every tenant's stored attempts"""
+    _require_local_storage(tenant)
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _calibrate_irt, subject)
+
+
+@app.post("/api/admin/question-bank", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def add_bank_questions(questions: List[Dict[str, Any]]):
+    """
+    Load curated questions into the question bank.
+    
+    Each item is validated (and safely repaired) like a generated question
+    and must carry subject and difficulty. Invalid items are reported, not stored.
+    """
+    accepted = []
+    rejected = []
+    for index, item in enumerate(questions):
+        result = validate_question(item)
+        if not result.ok or item.get("difficulty") not in DEFAULT_ITEM_DIFFICULTY or not item.get("subject"):
+            rejected.append({"index": index, "invalid_fields": result.invalid_fields or ["subject/difficulty"]})
+            continue
+        accepted.append({**result.data, "subject": item["subject"], "difficulty": item["difficulty"]})
+    added = question_bank.add_many(accepted)
+    return {"added": added, "duplicates": len(accepted) - added, "rejected": rejected}
+
+
+@app.post("/api/admin/resources", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def add_catalog_resources(resources: List[Dict[str, Any]]):
+    """
+    Load learning resources into the resource catalog.
+    
+    Each item needs subject, topic, kind (video or article), title and an
+    http(s) url, and may carry channel, explanation and tip. Invalid items
+    are reported, not stored.
+    """
+    accepted = []
+    rejected = []
+    for index, item in enumerate(resources):
+        error = validate_resource(item)
+        if error:
+            rejected.append({"index": index, "error": error})
+            continue
+        accepted.append(item)
+    loop = asyncio.get_event_loop()
+    added = await loop.run_in_executor(None, resource_catalog.add_many, accepted, "admin")
+    if added and settings.resource_catalog_enabled and settings.rag_enabled:
+        await loop.run_in_executor(None, _index_catalog)
+    return {"added": added, "duplicates": len(accepted) - added, "rejected": rejected}
+
+
+@app.get("/api/admin/export/{kind}", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def export_data(
+    kind: str,
+    format: str = "jsonl",
+    chunk_size: int = bulk_io.DEFAULT_CHUNK_SIZE,
+    tenant: Tenant = Depends(current_tenant)
+):
+    """Stream the tenant's sessions, attempts or skills as JSONL or a columnar format"""
+    _require_local_storage(tenant)
+    if kind not in bulk_io.EXPORT_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid export kind. Must be one of: {', '.join(bulk_io.EXPORT_COLUMNS)}"
+        )
+    
+    if format == "jsonl":
+        chunks = bulk_io.export_jsonl(tenant.storage, kind, chunk_size)
+        media_type = "application/x-ndjson"
+    elif format == "columnar":
+        chunks = bulk_io.export_columnar(tenant.storage, kind, chunk_size)
+        media_type = bulk_io.columnar_media_type()
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid format. Must be one of: jsonl, columnar"
+        )
+    
+    return StreamingResponse(chunks, media_type=media_type)
+
+
+@app.post("/api/admin/import/{kind}", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def import_data(
+    kind: str,
+    request: Request,
+    batch_size: int = Query(bulk_io.DEFAULT_CHUNK_SIZE, ge=1, le=bulk_io.MAX_IMPORT_BATCH_SIZE),
+    tenant: Tenant = Depends(current_tenant)
+):
+    """
+    Bulk-load sessions or attempts into the tenant from a JSONL request body, replaying BKT for attempts.
+    
+    Rows are applied on the event loop, since storage is not shared with
+    other threads for writes; the import yields to other requests after
+    every received chunk, so one BKT replay batch is the longest it holds
+    the loop.
+    """
+    _require_local_storage(tenant)
+    if kind not in ("sessions", "attempts"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid import kind. Must be one of: sessions, attempts"
+        )
+    
+    importer = bulk_io.BulkImporter(tenant.storage, batch_size=batch_size)
+    decoder = bulk_io.JSONLDecoder()
+    try:
+        async for chunk in request.stream():
+            for row in decoder.feed(chunk):
+                importer.add(kind, row)
+            await asyncio.sleep(0)
+        for row in decoder.finish():
+            importer.add(kind, row)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid JSONL body: {str(e)}"
+        )
+    importer.flush()
+    
+    return importer.summary()
 
 
 @app.get("/api/analytics/subject/{subject}", tags=["Analytics"])
-async def get_subject_analytics(subject: str):
+async def get_subject_analytics(
+    subject: str,
+    max_points: Optional[int] = Query(None, ge=3),
+    downsample_method: str = "lttb",
+    tenant: Tenant = Depends(current_tenant)
+):
     """Get analytics data for a specific subject"""
+    _require_local_storage(tenant)
     if subject not in ["Maths", "Science", "Python"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid subject"
         )
     
-    subject_sessions = [s for s in storage.sessions.values() if s["subject"] == subject]
+    try:
+        analytics = await tenant.analytics.run(subject_analytics, subject, max_points, downsample_method)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    if not subject_sessions:
-        return {
-            "subject": subject,
-            "mastery_estimate": 0.0,
-            "growth_data": [],
-            "question_history": [],
-            "total_questions": 0,
-            "correct_answers": 0,
-            "accuracy": 0.0
-        }
+    return respond(analytics)
+
+
+def _subject_attempts_page(data: InMemoryStorage, subject: str, cursor: Optional[str], limit: int):
+    """
+    Walk a subject's attempts from a cursor, in the same order as get_subject_analytics.
     
-    growth_data = []
-    all_attempts = []
-    total_correct = 0
-    total_questions = 0
+    The cursor records the position (session index, attempt index) along
+    with the running totals, so a page costs O(limit) regardless of how
+    many attempts came before it.
+    """
+    if subject not in ["Maths", "Science", "Python"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid subject"
+        )
+    try:
+        state = decode_cursor(cursor)
+        session_pos = int(state.get("s", 0))
+        attempt_pos = int(state.get("a", 0))
+        total_questions = int(state.get("n", 0))
+        total_correct = int(state.get("c", 0))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    for session in subject_sessions:
-        session_attempts = storage.get_attempts(session["session_id"])
-        
-        for idx, attempt in enumerate(session_attempts, 1):
+    session_ids = data.get_subject_session_ids(subject)
+    page = []
+    while session_pos < len(session_ids) and len(page) < limit:
+        session_attempts = data.get_attempts(session_ids[session_pos])
+        while attempt_pos < len(session_attempts) and len(page) < limit:
+            attempt = session_attempts[attempt_pos]
+            attempt_pos += 1
+            total_questions += 1
             if attempt.get("is_correct"):
                 total_correct += 1
-            total_questions += 1
-            
-            growth_data.append({
-                "question_number": total_questions,
-                "correct": total_correct,
-                "accuracy": round((total_correct / total_questions) * 100, 1)
-            })
-            
-            all_attempts.append({
-                "question": attempt.get("question", ""),
-                "topic": attempt.get("topic", "General"),
-                "is_correct": attempt.get("is_correct", False),
-                "difficulty": attempt.get("difficulty", "easy"),
-                "timestamp": attempt.get("timestamp", "")
-            })
+            page.append((attempt, total_questions, total_correct))
+        if attempt_pos >= len(session_attempts):
+            session_pos += 1
+            attempt_pos = 0
     
-    subject_skills = [s for s in storage.user_skills.values() if s["subject"] == subject]
-    avg_mastery = sum(s["mastery_level"] for s in subject_skills) / len(subject_skills) if subject_skills else 0.0
+    # A short page means the walk reached the end of the subject's attempts.
+    next_cursor = encode_cursor({
+        "s": session_pos, "a": attempt_pos, "n": total_questions, "c": total_correct
+    }) if len(page) == limit and session_pos < len(session_ids) else None
+    return page, next_cursor
+
+
+@app.get("/api/analytics/subject/{subject}/growth", tags=["Analytics"])
+async def get_subject_growth(
+    subject: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    max_points: Optional[int] = Query(None, ge=3),
+    downsample_method: str = "lttb",
+    tenant: Tenant = Depends(current_tenant)
+):
+    """Get one page of the cumulative accuracy growth curve for a subject"""
+    _require_local_storage(tenant)
+    page, next_cursor = _subject_attempts_page(tenant.storage, subject, cursor, limit)
+    growth_data = [
+        {
+            "question_number": number,
+            "correct": correct,
+            "accuracy": round((correct / number) * 100, 1)
+        }
+        for _, number, correct in page
+    ]
+    try:
+        growth_data = downsample(growth_data, max_points, downsample_method)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    if not subject_skills and subject_sessions:
-        avg_mastery = subject_sessions[-1].get("mastery_level", 0.0)
+    return {"subject": subject, "growth_data": growth_data, "next_cursor": next_cursor}
+
+
+@app.get("/api/analytics/subject/{subject}/history", tags=["Analytics"])
+async def get_subject_history(
+    subject: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    tenant: Tenant = Depends(current_tenant)
+):
+    """Get one page of the question history for a subject, oldest first"""
+    _require_local_storage(tenant)
+    page, next_cursor = _subject_attempts_page(tenant.storage, subject, cursor, limit)
+    history = [
+        {
+            "question": attempt.get("question", ""),
+            "topic": attempt.get("topic", "General"),
+            "is_correct": attempt.get("is_correct", False),
+            "difficulty": attempt.get("difficulty", "easy"),
+            "timestamp": attempt.get("timestamp", "")
+        }
+        for attempt, _, _ in page
+    ]
+    return {"subject": subject, "question_history": history, "next_cursor": next_cursor}
+
+
+@app.get("/api/analytics/trends", tags=["Analytics"])
+async def get_trends(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = "day",
+    subject: Optional[str] = None,
+    topic: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    user_id: Optional[str] = None,
+    tenant: Tenant = Depends(current_tenant)
+):
+    """Get attempt and accuracy trends for a time range from the rollup buckets"""
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    
+    try:
+        buckets = tenant.rollups.query(
+            parse_timestamp(start),
+            parse_timestamp(end),
+            resolution=resolution,
+            subject=subject,
+            topic=topic,
+            difficulty=difficulty,
+            user_id=user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return {
-        "subject": subject,
-        "mastery_estimate": round(avg_mastery, 3),
-        "growth_data": growth_data,
-        "question_history": all_attempts[-20:],
-        "total_questions": total_questions,
-        "correct_answers": total_correct,
-        "accuracy": round((total_correct / total_questions * 100) if total_questions > 0 else 0, 1)
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "resolution": resolution,
+        "buckets": buckets
     }
 
 
 @app.get("/api/user/{user_id}/skills", tags=["User"])
-async def get_user_skills(user_id: str):
+async def get_user_skills(user_id: str, tenant: Tenant = Depends(current_tenant)):
     """Get all skills for a specific user"""
-    skills = storage.get_all_user_skills(user_id)
+    skills = await tenant.store.get_all_user_skills(user_id)
     return {"user_id": user_id, "skills": skills}
 
 
 @app.get("/api/learning-path/recommendations", tags=["Learning Path"])
-async def get_learning_recommendations(user_id: Optional[str] = None, subject: Optional[str] = None):
+async def get_learning_recommendations(
+    user_id: Optional[str] = None,
+    subject: Optional[str] = None,
+    tenant: Tenant = Depends(current_tenant)
+):
     """Generate AI-powered learning recommendations based on quiz performance"""
+    _require_local_storage(tenant)
     
-    if not user_id:
-        user_sessions = list(storage.sessions.values())
-    else:
-        user_sessions = [s for s in storage.sessions.values() if s.get("user_id") == user_id]
-    
-    if subject:
-        user_sessions = [s for s in user_sessions if s.get("subject") == subject]
+    summary = await tenant.analytics.run(performance_summary, user_id, subject)
     
-    if not user_sessions:
+    if not summary["total_quizzes"]:
         return {
             "has_data": False,
             "message": f"No quiz data available for {subject if subject else 'any subject'}. Complete a quiz to get personalized recommendations!",
@@ -401,48 +1446,7 @@ async def get_learning_recommendations(user_id: Optional[str] = None, subject: O
             "learning_resources": []
         }
     
-    all_attempts = []
-    subject_performance = {}
-    
-    for session in user_sessions:
-        subj = session["subject"]
-        session_attempts = storage.get_attempts(session["session_id"])
-        all_attempts.extend(session_attempts)
-        
-        if subj not in subject_performance:
-            subject_performance[subj] = {
-                "total": 0,
-                "correct": 0,
-                "topics": {}
-            }
-        
-        for attempt in session_attempts:
-            topic = attempt.get("topic", "General")
-            subject_performance[subj]["total"] += 1
-            if attempt.get("is_correct"):
-                subject_performance[subj]["correct"] += 1
-            
-            if topic not in subject_performance[subj]["topics"]:
-                subject_performance[subj]["topics"][topic] = {"total": 0, "correct": 0}
-            subject_performance[subj]["topics"][topic]["total"] += 1
-            if attempt.get("is_correct"):
-                subject_performance[subj]["topics"][topic]["correct"] += 1
-    
-    weak_areas = []
-    for subj, perf in subject_performance.items():
-        accuracy = (perf["correct"] / perf["total"] * 100) if perf["total"] > 0 else 0
-        
-        for topic, topic_perf in perf["topics"].items():
-            topic_accuracy = (topic_perf["correct"] / topic_perf["total"] * 100) if topic_perf["total"] > 0 else 0
-            if topic_accuracy < 60:
-                weak_areas.append({
-                    "subject": subj,
-                    "topic": topic,
-                    "accuracy": round(topic_accuracy, 1),
-                    "questions_attempted": topic_perf["total"]
-                })
-    
-    weak_areas.sort(key=lambda x: x["accuracy"])
+    weak_areas = summary["weak_areas"]
     
     subject_name = subject if subject else "all subjects"
     prompt = f"""Based on a student's {subject_name} quiz performance, provide personalized learning recommendations using markdown formatting.
@@ -453,6 +1457,16 @@ Performance Data:
     for area in weak_areas[:5]:
         prompt += f"- {area['subject']} - {area['topic']}: {area['accuracy']}% accuracy ({area['questions_attempted']} questions)\n"
     
+    retrieved = []
+    if settings.resource_catalog_enabled and settings.rag_enabled:
+        loop = asyncio.get_event_loop()
+        retrieved = await loop.run_in_executor(None, _retrieve_for_areas, weak_areas[:3])
+    if retrieved:
+        prompt += "\nReference material (ground the study tips in it and link resources by URL where relevant):\n"
+        for chunk in retrieved:
+            source = f" ({chunk['url']})" if chunk.get("url") else ""
+            prompt += f"- [{chunk['subject']} - {chunk['title']}]{source}: {chunk['text']}\n"
+    
     prompt += """
 Please provide in markdown format with the following structure:
 1. **Overall Assessment** (2-3 sentences)
@@ -462,13 +1476,18 @@ Please provide in markdown format with the following structure:
 Use markdown formatting including **bold**, lists, and clear sections. Be concise and encouraging. You may use LaTeX math notation where appropriate using $ for inline and $$ for display math."""
     
     try:
-        ai_recommendations = await question_generator.generate_recommendations(prompt)
+        ai_recommendations = await question_generator.generate_recommendations(prompt, tenant=tenant.tenant_id)
     except Exception as e:
         ai_recommendations = "Unable to generate AI recommendations at this time."
     
     learning_resources = []
     for area in weak_areas[:3]:
         search_query = f"{area['subject']} {area['topic']} tutorial learn study guide"
+        resources = []
+        if settings.resource_catalog_enabled:
+            resources = resource_catalog.search(
+                area["topic"], subject=area["subject"], limit=settings.resource_catalog_results
+            )
         learning_resources.append({
             "subject": area["subject"],
             "topic": area["topic"],
@@ -477,7 +1496,12 @@ Use markdown formatting including **bold**, lists, and clear sections. Be concis
             "description": f"Improve your understanding of {area['topic']} in {area['subject']} (Current: {area['accuracy']}% accuracy)",
             "search_url": f"https://www.google.com/search?q={search_query.replace(' ', '+')}",
             "khan_academy_url": f"https://www.khanacademy.org/search?page_search_query={search_query.replace(' ', '+')}",
-            "youtube_url": f"https://www.youtube.com/results?search_query={search_query.replace(' ', '+')}"
+            "youtube_url": f"https://www.youtube.com/results?search_query={search_query.replace(' ', '+')}",
+            "explanation": resources[0]["explanation"] if resources else None,
+            "resources": [
+                {field: resource[field] for field in ("kind", "title", "url", "channel", "topic", "score")}
+                for resource in resources
+            ]
         })
     
     return {
@@ -486,19 +1510,45 @@ Use markdown formatting including **bold**, lists, and clear sections. Be concis
         "ai_recommendations": ai_recommendations,
         "weak_areas": weak_areas[:5],
         "learning_resources": learning_resources,
-        "total_quizzes": len(user_sessions),
-        "total_questions": len(all_attempts)
+        "sources": [
+            {field: chunk[field] for field in ("doc_id", "subject", "topic", "title", "url", "score")}
+            for chunk in retrieved
+        ],
+        "total_quizzes": summary["total_quizzes"],
+        "total_questions": summary["total_questions"]
     }
 
 
+@app.get("/api/learning-path/resources", tags=["Learning Path"])
+async def search_learning_resources(
+    q: str = Query(..., min_length=1, max_length=200),
+    subject: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=50)
+):
+    """
+    Search the curated resource catalog.
+    
+    Results are ranked by BM25 over resource topics, titles and explanations;
+    misspelled terms are matched to the closest catalogued terms.
+    """
+    if not settings.resource_catalog_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resource catalog is not enabled"
+        )
+    return {"query": q, "results": resource_catalog.search(q, subject=subject, limit=limit)}
+
+
 @app.get("/api/learning-path/last-quiz", tags=["Learning Path"])
-async def get_last_quiz_results(user_id: Optional[str] = None):
+async def get_last_quiz_results(user_id: Optional[str] = None, tenant: Tenant = Depends(current_tenant)):
     """Get the most recent quiz results"""
+    _require_local_storage(tenant)
     
+    sessions = tenant.storage.sessions
     if not user_id:
-        user_sessions = list(storage.sessions.values())
+        user_sessions = list(sessions.values())
     else:
-        user_sessions = [s for s in storage.sessions.values() if s.get("user_id") == user_id]
+        user_sessions = [s for s in sessions.values() if s.get("user_id") == user_id]
     
     if not user_sessions:
         return {
@@ -515,7 +1565,7 @@ async def get_last_quiz_results(user_id: Optional[str] = None):
         }
     
     last_session = max(completed_sessions, key=lambda s: s.get("started_at", ""))
-    session_attempts = storage.get_attempts(last_session["session_id"])
+    session_attempts = tenant.storage.get_attempts(last_session["session_id"])
     
     correct_count = sum(1 for a in session_attempts if a.get("is_correct"))
     total_count = len(session_attempts)
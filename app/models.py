@@ -10,6 +10,11 @@ class DifficultyLevel(str, Enum):
     HARD = "hard"
 
 
+class SessionMode(str, Enum):
+    ADAPTIVE = "adaptive"
+    REVIEW = "review"
+
+
 class Question(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
     question: str
@@ -46,6 +51,51 @@ class AnswerSubmission(BaseModel):
     topic: Optional[str] = None
 
 
+class ChannelAnswer(BaseModel):
+    """An answer sent over the assessment WebSocket channel"""
+    selected_answer: str
+    time_spent: Optional[int] = None
+    topic: Optional[str] = None
+    idempotency_key: Optional[str] = Field(None, min_length=1, max_length=128)
+
+
+class BatchAnswerItem(BaseModel):
+    idempotency_key: str = Field(..., min_length=1, max_length=128)
+    session_id: str
+    selected_answer: str
+    # Text of the question being answered; defaults to the session's current question
+    question: Optional[str] = None
+    time_spent: Optional[int] = None
+    topic: Optional[str] = None
+    client_timestamp: Optional[datetime] = None
+
+
+class BatchAnswerSubmission(BaseModel):
+    answers: List[BatchAnswerItem] = Field(..., min_length=1, max_length=200)
+
+
+class BatchAnswerResult(BaseModel):
+    idempotency_key: str
+    session_id: str
+    status: str  # "applied", "duplicate" or "error"
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+
+class BatchAnswerResponse(BaseModel):
+    applied: int
+    duplicates: int
+    errors: int
+    results: List[BatchAnswerResult]
+
+
+class TerminationPolicyInfo(BaseModel):
+    strategy: str = "fixed"
+    max_questions: int = 15
+    min_questions: int = 5
+    max_ability_se: Optional[float] = None
+
+
 class AssessmentSession(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
     session_id: str
@@ -56,6 +106,8 @@ class AssessmentSession(BaseModel):
     is_active: bool = True
     total_questions: int = 15
     questions_answered: int = 0
+    mode: SessionMode = SessionMode.ADAPTIVE
+    termination: Optional[TerminationPolicyInfo] = None
     
     class Config:
         populate_by_name = True
@@ -143,6 +195,20 @@ class NextQuestionResponse(BaseModel):
     subject: str
 
 
+class AnswerAndAdvanceResponse(BaseModel):
+    is_correct: bool
+    correct_answer: str
+    explanation: str
+    new_mastery_level: float
+    new_difficulty: str
+    questions_answered: int
+    total_correct: int
+    assessment_complete: bool
+    stop_reason: Optional[str] = None
+    next_question: Optional[NextQuestionResponse] = None
+    next_question_error: Optional[str] = None
+
+
 class AssessmentComplete(BaseModel):
     session_id: str
     total_questions: int
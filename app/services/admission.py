@@ -0,0 +1,275 @@
+import asyncio
+import time
+from enum import IntEnum
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+
+
+class Priority(IntEnum):
+    """Model call priority classes; lower values are admitted first"""
+    LIVE = 0
+    PREFETCH = 1
+    RECOMMENDATION = 2
+
+
+# Fraction of each bucket a priority class must leave untouched, so that
+# background work can never drain the capacity live quizzes depend on.
+RESERVE_FRACTION = {
+    Priority.LIVE: 0.0,
+    Priority.PREFETCH: 0.2,
+    Priority.RECOMMENDATION: 0.4
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a model call cannot be admitted within its priority's wait budget"""
+
+    def __init__(self, priority: Priority, retry_after: float):
+        super().__init__(f"Model call rejected by admission control ({priority.name}); retry after {retry_after:.1f}s")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute, capped at capacity"""
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.clock = clock
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate_per_minute: float):
+        self._refill()
+        self.rate = rate_per_minute / 60.0
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        """Seconds until amount can be taken while leaving reserve tokens behind"""
+        self._refill()
+        missing = amount + reserve - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def debit(self, amount: float):
+        """Adjust for actual usage; may drive the bucket negative"""
+        self._refill()
+        self.tokens -= amount
+
+
+class AdmissionController:
+    """
+    Proactive admission control for model calls.
+
+    Every call must take one token from the requests-per-minute bucket and
+    its estimated token count from the tokens-per-minute bucket. Lower
+    priority classes must leave a reserve in both buckets. A call that
+    cannot be admitted within its priority's wait budget is rejected
+    instead of queueing indefinitely, so callers can fall back to cached
+    questions.
+
+    The request rate adapts to the provider (AIMD): each observed 429
+    halves it (at most once per cooldown window, so a burst of in-flight
+    failures counts once), and each success adds back a small step up to
+    the configured ceiling.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_wait: Optional[Dict[Priority, float]] = None,
+        min_requests_per_minute: float = 1.0,
+        throttle_cooldown: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.clock = clock
+        self.max_rpm = requests_per_minute
+        self.min_rpm = min_requests_per_minute
+        self.current_rpm = requests_per_minute
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.max_wait = max_wait or {
+            Priority.LIVE: 10.0,
+            Priority.PREFETCH: 2.0,
+            Priority.RECOMMENDATION: 5.0
+        }
+        self.throttle_cooldown = throttle_cooldown
+        self._last_throttle = float("-inf")
+        self.admitted = {p.name: 0 for p in Priority}
+        self.rejected = {p.name: 0 for p in Priority}
+        self.throttled = 0
+
+    def _wait_time(self, priority: Priority, estimated_tokens: int) -> float:
+        reserve = RESERVE_FRACTION[priority]
+        return max(
+            self.requests.wait_time(1, reserve * self.requests.capacity),
+            self.tokens.wait_time(estimated_tokens, reserve * self.tokens.capacity)
+        )
+
+    def try_acquire(self, priority: Priority, estimated_tokens: int) -> float:
+        """
+        Admit the call if capacity allows right now.
+
+        Returns:
+            0.0 if admitted, otherwise the seconds to wait before trying again
+        """
+        wait = self._wait_time(priority, estimated_tokens)
+        if wait == 0.0:
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            self.admitted[priority.name] += 1
+        return wait
+
+    async def acquire(self, priority: Priority = Priority.LIVE, estimated_tokens: int = 1000):
+        """
+        Wait for admission up to the priority's wait budget.
+
+        Raises:
+            AdmissionRejected: If the call cannot be admitted in time
+        """
+        deadline = self.clock() + self.max_wait[priority]
+        while True:
+            wait = self.try_acquire(priority, estimated_tokens)
+            if wait == 0.0:
+                return
+            if self.clock() + wait > deadline:
+                self.rejected[priority.name] += 1
+                raise AdmissionRejected(priority, wait)
+            await asyncio.sleep(min(wait, 0.5))
+
+    def record_usage(self, actual_tokens: int, estimated_tokens: int):
+        """Correct the token bucket once the real token count of a call is known"""
+        self.tokens.debit(actual_tokens - estimated_tokens)
+
+    def record_throttled(self):
+        """Multiplicative decrease after a 429 from the provider"""
+        now = self.clock()
+        self.throttled += 1
+        if now - self._last_throttle < self.throttle_cooldown:
+            return
+        self._last_throttle = now
+        self.current_rpm = max(self.min_rpm, self.current_rpm / 2)
+        self.requests.set_rate(self.current_rpm)
+
+    def record_success(self):
+        """Additive increase after a successful call"""
+        if self.current_rpm < self.max_rpm:
+            self.current_rpm = min(self.max_rpm, self.current_rpm + max(1.0, self.max_rpm / 100))
+            self.requests.set_rate(self.current_rpm)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "configured_rpm": self.max_rpm,
+            "current_rpm": round(self.current_rpm, 1),
+            "available_requests": round(max(0.0, self.requests.tokens), 1),
+            "available_tokens": round(max(0.0, self.tokens.tokens)),
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "throttled": self.throttled
+        }
+
+
+class TenantQuotas:
+    """
+    Per-tenant model-call quotas, checked before shared admission control.
+
+    A tenant with a quota has its own requests-per-minute bucket, and a
+    call over it is rejected at once instead of waiting for shared
+    capacity. A burst from one tenant is therefore limited by its own
+    quota and cannot drain the shared buckets that every other tenant's
+    quizzes depend on. Tenants with no quota only go through shared
+    admission.
+    """
+
+    def __init__(
+        self,
+        default_rpm: float = 0.0,
+        quotas: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.default_rpm = default_rpm
+        self.quotas = quotas or {}
+        self.clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.admitted: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+
+    def rate_for(self, tenant: str) -> float:
+        return self.quotas.get(tenant, self.default_rpm)
+
+    def try_acquire(self, tenant: Optional[str]) -> float:
+        """
+        Take one call from the tenant's quota.
+
+        Returns:
+            0.0 if admitted (or the tenant has no quota), otherwise the
+            seconds until the quota allows another call
+        """
+        if tenant is None:
+            return 0.0
+        rpm = self.rate_for(tenant)
+        if rpm <= 0:
+            return 0.0
+        bucket = self._buckets.get(tenant)
+        if bucket is None:
+            bucket = self._buckets[tenant] = TokenBucket(rpm, clock=self.clock)
+        wait = bucket.wait_time(1)
+        if wait == 0.0:
+            bucket.take(1)
+            self.admitted[tenant] = self.admitted.get(tenant, 0) + 1
+        else:
+            self.rejected[tenant] = self.rejected.get(tenant, 0) + 1
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        for tenant, bucket in self._buckets.items():
+            bucket.wait_time(1)  # refills
+            stats[tenant] = {
+                "rpm": self.rate_for(tenant),
+                "available_requests": round(max(0.0, bucket.tokens), 1),
+                "admitted": self.admitted.get(tenant, 0),
+                "rejected": self.rejected.get(tenant, 0)
+            }
+        return stats
+
+
+def estimate_tokens(*texts: str, output_tokens: int = 400) -> int:
+    """Rough token estimate for a request: ~4 characters per prompt token plus expected output"""
+    return sum(len(text) for text in texts) // 4 + output_tokens
+
+
+def build_tenant_quotas() -> TenantQuotas:
+    return TenantQuotas(
+        default_rpm=settings.tenant_generation_rpm,
+        quotas=settings.tenant_generation_quotas
+    )
+
+
+def build_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        requests_per_minute=settings.gemini_requests_per_minute,
+        tokens_per_minute=settings.gemini_tokens_per_minute,
+        max_wait={
+            Priority.LIVE: settings.admission_max_wait_live_seconds,
+            Priority.PREFETCH: settings.admission_max_wait_prefetch_seconds,
+            Priority.RECOMMENDATION: settings.admission_max_wait_recommendation_seconds
+        }
+    )
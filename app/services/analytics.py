@@ -0,0 +1,238 @@
+import asyncio
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.config import settings
+from app.services.pagination import downsample
+from app.services.storage import InMemoryStorage, storage
+
+
+def subject_analytics(
+    data: InMemoryStorage,
+    subject: str,
+    max_points: Optional[int] = None,
+    downsample_method: str = "lttb"
+) -> Dict[str, Any]:
+    """
+    Mastery, growth curve and recent questions for a subject.
+
+    Raises:
+        ValueError: If the downsampling method is unknown
+    """
+    subject_sessions = [data.sessions[sid] for sid in data.get_subject_session_ids(subject)]
+
+    if not subject_sessions:
+        return {
+            "subject": subject,
+            "mastery_estimate": 0.0,
+            "growth_data": [],
+            "question_history": [],
+            "total_questions": 0,
+            "correct_answers": 0,
+            "accuracy": 0.0
+        }
+
+    growth_data = []
+    recent_attempts = deque(maxlen=20)
+    total_correct = 0
+    total_questions = 0
+
+    for session in subject_sessions:
+        session_attempts = data.get_attempts(session["session_id"])
+
+        for idx, attempt in enumerate(session_attempts, 1):
+            if attempt.get("is_correct"):
+                total_correct += 1
+            total_questions += 1
+
+            growth_data.append({
+                "question_number": total_questions,
+                "correct": total_correct,
+                "accuracy": round((total_correct / total_questions) * 100, 1)
+            })
+
+            recent_attempts.append({
+                "question": attempt.get("question", ""),
+                "topic": attempt.get("topic", "General"),
+                "is_correct": attempt.get("is_correct", False),
+                "difficulty": attempt.get("difficulty", "easy"),
+                "timestamp": attempt.get("timestamp", "")
+            })
+
+    subject_skills = [s for s in data.user_skills.values() if s["subject"] == subject]
+    avg_mastery = sum(s["mastery_level"] for s in subject_skills) / len(subject_skills) if subject_skills else 0.0
+
+    if not subject_skills and subject_sessions:
+        avg_mastery = subject_sessions[-1].get("mastery_level", 0.0)
+
+    growth_data = downsample(growth_data, max_points, downsample_method)
+
+    return {
+        "subject": subject,
+        "mastery_estimate": round(avg_mastery, 3),
+        "growth_data": growth_data,
+        "question_history": list(recent_attempts),
+        "total_questions": total_questions,
+        "correct_answers": total_correct,
+        "accuracy": round((total_correct / total_questions * 100) if total_questions > 0 else 0, 1)
+    }
+
+
+def performance_summary(data: InMemoryStorage, user_id: Optional[str], subject: Optional[str]) -> Dict[str, Any]:
+    """
+    Quiz, question and weak-topic counts for a user (or everyone) and optional subject.
+
+    Weak areas are topics answered below 60% accuracy, weakest first.
+    """
+    if not user_id:
+        user_sessions = list(data.sessions.values())
+    else:
+        user_sessions = [s for s in data.sessions.values() if s.get("user_id") == user_id]
+
+    if subject:
+        user_sessions = [s for s in user_sessions if s.get("subject") == subject]
+
+    total_questions = 0
+    subject_performance = {}
+
+    for session in user_sessions:
+        subj = session["subject"]
+        session_attempts = data.get_attempts(session["session_id"])
+        total_questions += len(session_attempts)
+
+        if subj not in subject_performance:
+            subject_performance[subj] = {
+                "total": 0,
+                "correct": 0,
+                "topics": {}
+            }
+
+        for attempt in session_attempts:
+            topic = attempt.get("topic", "General")
+            subject_performance[subj]["total"] += 1
+            if attempt.get("is_correct"):
+                subject_performance[subj]["correct"] += 1
+
+            if topic not in subject_performance[subj]["topics"]:
+                subject_performance[subj]["topics"][topic] = {"total": 0, "correct": 0}
+            subject_performance[subj]["topics"][topic]["total"] += 1
+            if attempt.get("is_correct"):
+                subject_performance[subj]["topics"][topic]["correct"] += 1
+
+    weak_areas = []
+    for subj, perf in subject_performance.items():
+        for topic, topic_perf in perf["topics"].items():
+            topic_accuracy = (topic_perf["correct"] / topic_perf["total"] * 100) if topic_perf["total"] > 0 else 0
+            if topic_accuracy < 60:
+                weak_areas.append({
+                    "subject": subj,
+                    "topic": topic,
+                    "accuracy": round(topic_accuracy, 1),
+                    "questions_attempted": topic_perf["total"]
+                })
+
+    weak_areas.sort(key=lambda x: x["accuracy"])
+    return {
+        "total_quizzes": len(user_sessions),
+        "total_questions": total_questions,
+        "weak_areas": weak_areas
+    }
+
+
+class AnalyticsExecutor:
+    """
+    Runs analytics functions off the event loop against a storage snapshot.
+
+    Functions take a storage as their first argument and run on a worker
+    thread over storage.snapshot(), never over live state. Results are
+    cached per (function, arguments) against the storage version read
+    before the snapshot was taken, so any new attempt or session change
+    invalidates them; concurrent requests for the same result share one
+    computation. One snapshot is reused for as long as the version holds.
+
+    A worker thread still needs the GIL, and CPython lets it hold the GIL
+    for the switch interval (5 ms by default) before the loop thread can
+    take it back. The executor leaves the interval alone, since it is
+    process-wide; the gil_switch_interval_ms setting lowers it at startup
+    when that delay matters more than throughput. The loop-lag monitor
+    reports what the loop actually sees.
+    """
+
+    def __init__(
+        self,
+        source: InMemoryStorage,
+        workers: int = 1,
+        max_entries: int = 1024
+    ):
+        self.source = source
+        self.workers = workers
+        self.max_entries = max_entries
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._cache: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Tuple[int, asyncio.Future]] = {}
+        self._snapshot: Optional[InMemoryStorage] = None
+        self.hits = 0
+        self.misses = 0
+        self.snapshots = 0
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analytics")
+        return self._pool
+
+    def _compute(self, version: int, func: Callable[..., Any], args: tuple) -> Any:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version < version:
+            snapshot = self.source.snapshot()
+            self._snapshot = snapshot
+            self.snapshots += 1
+        return func(snapshot, *args)
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """Result of func(snapshot, *args), from cache when storage has not changed since"""
+        key = (func.__qualname__, args)
+        version = self.source.version
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == version:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] == version:
+            self.hits += 1
+            return await asyncio.shield(inflight[1])
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._ensure_pool(), self._compute, version, func, args)
+        self._inflight[key] = (version, future)
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key, (None, None))[1] is future:
+                del self._inflight[key]
+        self._cache[key] = (version, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache_entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "snapshots": self.snapshots,
+            "switch_interval_ms": round(sys.getswitchinterval() * 1000, 3)
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+analytics_executor = AnalyticsExecutor(storage)
@@ -0,0 +1,376 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.bkt_model import bkt_model
+from app.services.rollups import parse_timestamp
+from app.services.storage import InMemoryStorage
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+# Largest attempt batch an import may replay in one go (it runs on the event loop)
+MAX_IMPORT_BATCH_SIZE = 20_000
+
+# Mastery of a freshly created session, where an attempt replay starts
+INITIAL_MASTERY = 0.0
+
+_BOOL_STRINGS = {"true": True, "false": False, "1": True, "0": False}
+
+
+def parse_bool(value: Any) -> Optional[bool]:
+    """Parse a bool, 0/1 or "true"/"false"/"1"/"0" (any case), as exports write them; None otherwise"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        return _BOOL_STRINGS.get(value.strip().lower())
+    return None
+
+EXPORT_COLUMNS = {
+    "sessions": [
+        "session_id", "user_id", "subject", "start_time", "end_time",
+        "total_questions", "correct_answers", "current_difficulty",
+        "mastery_level", "status"
+    ],
+    "attempts": [
+        "attempt_id", "session_id", "timestamp", "question", "selected_answer",
+        "correct_answer", "is_correct", "time_spent", "topic", "difficulty",
+        "client_timestamp"
+    ],
+    "skills": ["user_id", "subject", "topic", "mastery_level", "updated_at"]
+}
+
+NUMERIC_COLUMNS = {
+    "total_questions": "int64",
+    "correct_answers": "int64",
+    "time_spent": "int64",
+    "mastery_level": "float64",
+    "is_correct": "bool"
+}
+
+
+def _chunked(items: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_rows(store: InMemoryStorage, kind: str) -> Iterator[Dict[str, Any]]:
+    # Iterate over a snapshot of the keys so new sessions created while a
+    # long export is streaming don't break iteration.
+    if kind == "sessions":
+        for session_id in list(store.sessions.keys()):
+            session = store.sessions.get(session_id)
+            if session is not None:
+                yield session
+    elif kind == "attempts":
+        for session_id in list(store.attempts.keys()):
+            yield from list(store.attempts.get(session_id, []))
+    elif kind == "skills":
+        for skill_key in list(store.user_skills.keys()):
+            skill = store.user_skills.get(skill_key)
+            if skill is not None:
+                yield skill
+    else:
+        raise ValueError(f"Unknown export kind: {kind}")
+
+
+def iter_chunks(
+    store: InMemoryStorage,
+    kind: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield rows of the given kind in chunks of at most chunk_size.
+
+    Args:
+        store: Storage to export from
+        kind: One of "sessions", "attempts" or "skills"
+        chunk_size: Maximum rows per chunk
+
+    Returns:
+        An iterator of row lists; memory use is bounded by one chunk
+    """
+    if kind not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    columns = EXPORT_COLUMNS[kind]
+    for chunk in _chunked(_iter_rows(store, kind), chunk_size):
+        yield [{column: row.get(column) for column in columns} for row in chunk]
+
+
+def export_jsonl(
+    store: InMemoryStorage,
+    kind: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Stream rows as newline-delimited JSON, one encoded chunk at a time"""
+    for chunk in iter_chunks(store, kind, chunk_size):
+        yield ("\n".join(json.dumps(row, default=str) for row in chunk) + "\n").encode("utf-8")
+
+
+def columnar_media_type() -> str:
+    """Media type produced by export_columnar in this environment"""
+    return "application/vnd.apache.arrow.stream" if HAS_ARROW else "text/csv"
+
+
+def export_columnar(
+    store: InMemoryStorage,
+    kind: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Stream rows in a columnar format.
+
+    Uses the Arrow IPC streaming format (one record batch per chunk) when
+    pyarrow is installed, otherwise falls back to CSV with a fixed header.
+    """
+    columns = EXPORT_COLUMNS[kind]
+    buffer = io.BytesIO() if HAS_ARROW else io.StringIO()
+
+    if HAS_ARROW:
+        schema = pa.schema([
+            (column, pa.type_for_alias(NUMERIC_COLUMNS.get(column, "string")))
+            for column in columns
+        ])
+        writer = pa_ipc.new_stream(buffer, schema)
+        for chunk in iter_chunks(store, kind, chunk_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        writer.close()
+        yield buffer.getvalue()
+        return
+
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    for chunk in iter_chunks(store, kind, chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _decode_object(line: bytes) -> Dict[str, Any]:
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError(f"expected a JSON object per line, got {type(row).__name__}")
+    return row
+
+
+class JSONLDecoder:
+    """Incrementally decode newline-delimited JSON objects from arbitrary byte chunks"""
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """Decode every complete line in the buffered data"""
+        lines = (self._pending + chunk).split(b"\n")
+        self._pending = lines.pop()
+        return [_decode_object(line) for line in lines if line.strip()]
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Decode a trailing line that had no newline"""
+        pending, self._pending = self._pending, b""
+        return [_decode_object(pending)] if pending.strip() else []
+
+
+def iter_jsonl_lines(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Decode a stream of byte chunks into JSON objects, one per non-empty line"""
+    decoder = JSONLDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.finish()
+
+
+class BulkImporter:
+    """
+    Load sessions and attempts in batches and rebuild BKT state by replay.
+
+    Rows are buffered up to batch_size and applied together: attempts are
+    grouped per session and appended in bulk, skipping attempt_ids the
+    session already has. The session totals and mastery are then rebuilt
+    by replaying BKT over the session's full attempt list, so importing the
+    sessions and attempts of an export reproduces the exported state
+    instead of counting the attempts twice. The replay also keeps a
+    running mastery per topic, which is written to the user's skill only
+    if the topic's last attempt is newer than the stored skill, so
+    importing old sessions never overwrites newer mastery. Sessions that
+    are referenced by attempts but unknown to storage are created from the
+    row's user_id/subject.
+    """
+
+    def __init__(self, store: InMemoryStorage, batch_size: int = DEFAULT_CHUNK_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self.sessions_imported = 0
+        self.attempts_imported = 0
+        self.attempts_skipped = 0
+        self.errors: List[str] = []
+        self._pending: List[Dict[str, Any]] = []
+
+    def add(self, kind: str, row: Dict[str, Any]):
+        """Import a row of the given kind ("sessions" or "attempts")"""
+        if kind == "sessions":
+            self.add_session(row)
+        else:
+            self.add_attempt(row)
+
+    def add_session(self, row: Dict[str, Any]):
+        """Import a single session row"""
+        if not row.get("session_id") or not row.get("subject"):
+            self._error("session row missing session_id or subject")
+            return
+        self.store.import_session(row)
+        self.sessions_imported += 1
+
+    def add_attempt(self, row: Dict[str, Any]):
+        """Buffer an attempt row, flushing when the batch is full"""
+        if not row.get("session_id") or "is_correct" not in row:
+            self._error("attempt row missing session_id or is_correct")
+            return
+        is_correct = parse_bool(row["is_correct"])
+        if is_correct is None:
+            self._error(f"attempt row has an invalid is_correct: {row['is_correct']!r}")
+            return
+        if row.get("timestamp"):
+            try:
+                parse_timestamp(row["timestamp"])
+            except ValueError:
+                self._error(f"attempt row has an invalid timestamp: {row['timestamp']!r}")
+                return
+        self._pending.append({**row, "is_correct": is_correct})
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Apply buffered attempts and replay BKT for the affected sessions"""
+        if not self._pending:
+            return
+
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self._pending:
+            grouped.setdefault(row["session_id"], []).append(row)
+        self._pending = []
+
+        for session_id, rows in grouped.items():
+            session = self.store.get_session(session_id)
+            if session is None:
+                first = rows[0]
+                if not first.get("subject"):
+                    self._error(f"unknown session {session_id} and no subject to create it")
+                    continue
+                session = self.store.import_session({
+                    "session_id": session_id,
+                    "user_id": first.get("user_id"),
+                    "subject": first["subject"],
+                    "start_time": first.get("timestamp")
+                })
+                self.sessions_imported += 1
+            self._apply_attempts(session, rows)
+
+    def _apply_attempts(self, session: Dict[str, Any], rows: List[Dict[str, Any]]):
+        session_id = session["session_id"]
+        seen = {attempt["attempt_id"] for attempt in self.store.get_attempts(session_id)}
+        attempts = []
+        for row in rows:
+            attempt_id = row.get("attempt_id")
+            if attempt_id and attempt_id in seen:
+                self.attempts_skipped += 1
+                continue
+            seen.add(attempt_id)
+            attempt = {key: value for key, value in row.items() if key not in ("user_id", "subject")}
+            attempt.setdefault("topic", "General")
+            attempt.setdefault("difficulty", session.get("current_difficulty", "easy"))
+            attempts.append(attempt)
+        if not attempts:
+            return
+        self.store.add_attempts(session_id, attempts)
+
+        mastery = INITIAL_MASTERY
+        topic_mastery: Dict[str, float] = {}
+        topic_updated: Dict[str, float] = {}
+        history = self.store.get_attempts(session_id)
+        for attempt in history:
+            topic = attempt.get("topic", "General")
+            mastery = bkt_model.update_mastery(mastery, attempt["is_correct"])
+            topic_mastery[topic] = bkt_model.update_mastery(
+                topic_mastery.get(topic, INITIAL_MASTERY), attempt["is_correct"]
+            )
+            topic_updated[topic] = max(topic_updated.get(topic, 0.0), parse_timestamp(attempt["timestamp"]))
+
+        self.store.update_session(session_id, {
+            "total_questions": len(history),
+            "correct_answers": sum(1 for attempt in history if attempt["is_correct"]),
+            "mastery_level": mastery,
+            "current_difficulty": bkt_model.recommend_difficulty(mastery)
+        })
+        user_id = session.get("user_id")
+        for topic, topic_level in topic_mastery.items():
+            skill = self.store.get_user_skill(user_id, session["subject"], topic)
+            if skill is not None and parse_timestamp(skill["updated_at"]) >= topic_updated[topic]:
+                continue
+            updated_at = datetime.fromtimestamp(topic_updated[topic], timezone.utc).replace(tzinfo=None)
+            self.store.update_user_skill(
+                user_id, session["subject"], topic, topic_level, updated_at=updated_at.isoformat()
+            )
+        self.attempts_imported += len(attempts)
+
+    def _error(self, message: str):
+        logger.warning(f"Bulk import: {message}")
+        if len(self.errors) < 100:
+            self.errors.append(message)
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts of imported rows and the first errors encountered"""
+        return {
+            "sessions_imported": self.sessions_imported,
+            "attempts_imported": self.attempts_imported,
+            "attempts_skipped": self.attempts_skipped,
+            "errors": self.errors
+        }
+
+
+def import_rows(
+    store: InMemoryStorage,
+    kind: str,
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Import session or attempt rows into storage.
+
+    Args:
+        store: Storage to import into
+        kind: "sessions" or "attempts"
+        rows: Iterable of row dicts, e.g. from iter_jsonl_lines
+        batch_size: Attempts applied per BKT replay batch
+
+    Returns:
+        Import summary with counts and errors
+    """
+    importer = BulkImporter(store, batch_size=batch_size)
+    for row in rows:
+        importer.add(kind, row)
+    importer.flush()
+    return importer.summary()
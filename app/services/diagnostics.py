@@ -0,0 +1,286 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import settings
+from app.services.hedging import percentile
+
+
+def collapse_stack(frame, prefix: Optional[str] = None) -> str:
+    """A frame's call stack as one collapsed-stack line, root first: "a;b;c" """
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    if prefix:
+        names.append(prefix)
+    return ";".join(reversed(names))
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """Collapsed stacks ("frame;frame count" per line), as read by flamegraph.pl and speedscope"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a timer callback runs.
+
+    A task sleeps for `interval` seconds in a loop; the difference between
+    when it wakes and when it asked to wake is the time the loop was busy
+    running something else. The most recent `window` samples are kept.
+    """
+
+    def __init__(self, interval: float = 0.01, window: int = 6000):
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.last_tick: Optional[float] = None
+        self.thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        self.thread_id = threading.get_ident()
+        while True:
+            expected = loop.time() + self.interval
+            self.last_tick = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.last_tick = None
+
+    def reset(self):
+        self.samples.clear()
+        self.max_lag = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        samples = list(self.samples)
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": len(samples),
+            "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+            "max_ms": round(self.max_lag * 1000, 3)
+        }
+
+
+class StallDetector:
+    """
+    Captures what the event loop is running while it is blocked.
+
+    A watchdog thread checks the loop-lag monitor's heartbeat every
+    sample_interval seconds. Once the loop has missed it by threshold
+    seconds, the watchdog samples the loop thread's stack on every check
+    until the loop runs again, and records the stall with its collapsed
+    stacks. Only stalls cost anything beyond the periodic check.
+    """
+
+    def __init__(self, monitor: LoopLagMonitor, threshold: float = 0.1,
+                 sample_interval: float = 0.005, keep: int = 50):
+        self.monitor = monitor
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._current: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _finish(self, now: float):
+        stall = self._current
+        self._current = None
+        stall["duration_ms"] = round((now - stall["started"]) * 1000, 1)
+        stall["ended"] = now
+        self.stalls.append(stall)
+
+    def _run(self):
+        while not self._stop.wait(self.sample_interval):
+            tick = self.monitor.last_tick
+            now = time.monotonic()
+            if tick is None or now - tick - self.monitor.interval < self.threshold:
+                if self._current is not None:
+                    self._finish(now)
+                continue
+            if self._current is not None and self._current["tick"] != tick:
+                self._finish(now)
+            if self._current is None:
+                self._current = {
+                    "tick": tick,
+                    "started": tick + self.monitor.interval,
+                    "started_at": datetime.utcnow().isoformat(),
+                    "stacks": Counter()
+                }
+            frame = sys._current_frames().get(self.monitor.thread_id)
+            if frame is not None:
+                self._current["stacks"][collapse_stack(frame)] += 1
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="loop-stall-detector", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def between(self, start: float, end: float) -> List[Dict[str, Any]]:
+        """Stalls that overlap the monotonic interval [start, end], including one still in progress"""
+        stalls = list(self.stalls)
+        current = self._current
+        if current is not None:
+            now = time.monotonic()
+            stalls.append({**current, "ended": now, "duration_ms": round((now - current["started"]) * 1000, 1)})
+        return [s for s in stalls if s["started"] < end and s["ended"] > start]
+
+    @staticmethod
+    def summary(stall: Dict[str, Any], top: int = 5) -> Dict[str, Any]:
+        return {
+            "started_at": stall["started_at"],
+            "duration_ms": stall["duration_ms"],
+            "samples": sum(stall["stacks"].values()),
+            "top_stacks": [{"stack": stack, "samples": count} for stack, count in stall["stacks"].most_common(top)]
+        }
+
+    def recent(self) -> List[Dict[str, Any]]:
+        return [self.summary(stall) for stall in list(self.stalls)]
+
+
+class SlowRequestLog:
+    """
+    Recent HTTP requests that took longer than a threshold.
+
+    Each slow request is recorded with any loop stalls that happened while
+    it was in flight, which separates handlers that block the loop from
+    ones that were just waiting on I/O.
+    """
+
+    def __init__(self, threshold: float = 1.0, keep: int = 100,
+                 detector: Optional[StallDetector] = None):
+        self.threshold = threshold
+        self.detector = detector
+        self.requests: Deque[Dict[str, Any]] = deque(maxlen=keep)
+
+    def observe(self, method: str, path: str, started: float, ended: float):
+        if ended - started < self.threshold:
+            return
+        stalls = self.detector.between(started, ended) if self.detector else []
+        self.requests.append({
+            "method": method,
+            "path": path,
+            "at": datetime.utcnow().isoformat(),
+            "duration_ms": round((ended - started) * 1000, 1),
+            "loop_blocked_ms": round(sum(s["duration_ms"] for s in stalls), 1),
+            "stalls": [StallDetector.summary(s, top=3) for s in stalls]
+        })
+
+    def recent(self) -> List[Dict[str, Any]]:
+        return list(self.requests)
+
+
+class SlowRequestMiddleware:
+    """ASGI middleware timing each HTTP request into a SlowRequestLog"""
+
+    def __init__(self, app, log: SlowRequestLog):
+        self.app = app
+        self.log = log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.log.observe(scope.get("method"), scope.get("path"), started, time.monotonic())
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for every thread in the process.
+
+    While running, a thread samples all other threads' stacks every
+    interval seconds and counts each collapsed stack, prefixed with the
+    thread name. It stops itself after max_seconds so a forgotten session
+    cannot keep sampling indefinitely.
+    """
+
+    def __init__(self):
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.interval = 0.005
+        self._started = 0.0
+        self._deadline = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval) and time.monotonic() < self._deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.stacks[collapse_stack(frame, names.get(ident, str(ident)))] += 1
+            self.samples += 1
+
+    def start(self, interval: float = 0.005, max_seconds: float = 300.0):
+        """Start a new profile, discarding the previous one"""
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self.stacks = Counter()
+        self.samples = 0
+        self.interval = interval
+        self._started = time.monotonic()
+        self._deadline = self._started + max_seconds
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop profiling and return the collapsed stacks"""
+        if self._thread is None:
+            raise RuntimeError("Profiler is not running")
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return format_collapsed(self.stacks)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "seconds": round(time.monotonic() - self._started, 1) if self._started else 0.0
+        }
+
+
+loop_lag_monitor = LoopLagMonitor()
+stall_detector = StallDetector(loop_lag_monitor, threshold=settings.loop_stall_threshold_ms / 1000)
+slow_request_log = SlowRequestLog(settings.slow_request_ms / 1000, detector=stall_detector)
+profiler = SamplingProfiler()
@@ -0,0 +1,128 @@
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List
+
+from app.config import settings
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of values (q in [0, 1]); 0.0 for no values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """Sliding windows of recent latencies per key"""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: Dict[Hashable, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, seconds: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def samples(self, key: Hashable) -> List[float]:
+        with self._lock:
+            return list(self._samples.get(key, ()))
+
+    def all_samples(self) -> List[float]:
+        with self._lock:
+            return [s for samples in self._samples.values() for s in samples]
+
+    def percentile(self, key: Hashable, q: float) -> float:
+        return percentile(self.samples(key), q)
+
+
+class HedgingPolicy:
+    """
+    Decides when to fire a hedge request and bounds how often it happens.
+
+    The hedge delay is the observed quantile (p90 by default) of single-call
+    latency for the (subject, difficulty) key, falling back to a fixed
+    delay until enough samples exist. Hedges are limited to max_ratio of
+    recent primary requests so extra model spend stays bounded.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        quantile: float = 0.9,
+        max_ratio: float = 0.1,
+        min_samples: int = 20,
+        default_delay: float = 4.0,
+        window: int = 500
+    ):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.call_latency = LatencyTracker(window)
+        self.served_latency = LatencyTracker(window)
+        self._recent: Deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.hedges_started = 0
+        self.hedges_won = 0
+
+    @classmethod
+    def from_settings(cls) -> "HedgingPolicy":
+        return cls(
+            enabled=settings.hedge_enabled,
+            quantile=settings.hedge_quantile,
+            max_ratio=settings.hedge_max_ratio,
+            min_samples=settings.hedge_min_samples,
+            default_delay=settings.hedge_default_delay_seconds
+        )
+
+    def hedge_delay(self, key: Hashable) -> float:
+        """Seconds to wait on the primary call before considering a hedge"""
+        samples = self.call_latency.samples(key)
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return percentile(samples, self.quantile)
+
+    def try_start_hedge(self) -> bool:
+        """Reserve budget for a hedge; False if the hedge rate limit is reached"""
+        with self._lock:
+            hedges = sum(self._recent)
+            primaries = len(self._recent) - hedges
+            if hedges + 1 > self.max_ratio * primaries:
+                return False
+            self._recent.append(True)
+            self.hedges_started += 1
+            return True
+
+    def record_call(self, key: Hashable, seconds: float):
+        """Latency of one completed model call"""
+        self.call_latency.record(key, seconds)
+
+    def record_served(self, key: Hashable, seconds: float):
+        """End-to-end latency of a served question, hedged or not"""
+        self.served_latency.record(key, seconds)
+
+    def start_request(self):
+        """Count a primary request in the window the hedge budget is measured over"""
+        with self._lock:
+            self._recent.append(False)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.call_latency.all_samples()
+        served = self.served_latency.all_samples()
+        return {
+            "enabled": self.enabled,
+            "hedges_started": self.hedges_started,
+            "hedges_won": self.hedges_won,
+            "call_p50_ms": round(percentile(calls, 0.5) * 1000, 1),
+            "call_p99_ms": round(percentile(calls, 0.99) * 1000, 1),
+            "served_p50_ms": round(percentile(served, 0.5) * 1000, 1),
+            "served_p99_ms": round(percentile(served, 0.99) * 1000, 1)
+        }
@@ -0,0 +1,138 @@
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+HAS_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+class TransportMetrics:
+    """Thread-safe counters for requests and connection-level events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.transport_errors = 0
+        self.responses_by_status: Dict[int, int] = {}
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.tls_handshake_seconds = 0.0
+        self.request_seconds = 0.0
+
+    def record_response(self, status_code: int, elapsed: float):
+        with self._lock:
+            self.requests += 1
+            self.request_seconds += elapsed
+            self.responses_by_status[status_code] = self.responses_by_status.get(status_code, 0) + 1
+
+    def record_error(self, elapsed: float):
+        with self._lock:
+            self.requests += 1
+            self.transport_errors += 1
+            self.request_seconds += elapsed
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_tls(self, elapsed: float):
+        with self._lock:
+            self.tls_handshakes += 1
+            self.tls_handshake_seconds += elapsed
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "transport_errors": self.transport_errors,
+                "responses_by_status": dict(self.responses_by_status),
+                "connections_opened": self.connections_opened,
+                "connection_reuse_ratio": round(
+                    1 - self.connections_opened / self.requests, 3
+                ) if self.requests else 0.0,
+                "tls_handshakes": self.tls_handshakes,
+                "avg_tls_handshake_ms": round(
+                    self.tls_handshake_seconds / self.tls_handshakes * 1000, 2
+                ) if self.tls_handshakes else 0.0,
+                "avg_request_ms": round(
+                    self.request_seconds / self.requests * 1000, 2
+                ) if self.requests else 0.0
+            }
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """
+    Pooled HTTP transport that records request and connection metrics.
+
+    Connection events come from httpcore's trace extension, which is
+    attached to every request passing through the transport.
+    """
+
+    def __init__(self, metrics: TransportMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+        self._tls_started = threading.local()
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.metrics.record_connection()
+        elif event_name == "connection.start_tls.started":
+            self._tls_started.value = time.perf_counter()
+        elif event_name == "connection.start_tls.complete":
+            started = getattr(self._tls_started, "value", None)
+            if started is not None:
+                self.metrics.record_tls(time.perf_counter() - started)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["trace"] = self._trace
+        start = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except httpx.TransportError:
+            self.metrics.record_error(time.perf_counter() - start)
+            raise
+        self.metrics.record_response(response.status_code, time.perf_counter() - start)
+        return response
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Open, idle and in-use connections currently held by the pool"""
+        connections = list(getattr(self._pool, "connections", []))
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle
+        }
+
+
+def build_transport(metrics: Optional[TransportMetrics] = None) -> InstrumentedTransport:
+    """
+    Build the pooled transport used for all model API calls.
+
+    Pool size, keep-alive expiry and HTTP/2 come from settings; HTTP/2 is
+    only enabled when the h2 package is installed.
+    """
+    http2 = settings.http_enable_http2 and HAS_HTTP2
+    logger.info(f"HTTP transport: max_connections={settings.http_max_connections}, http2={http2}")
+    return InstrumentedTransport(
+        metrics or TransportMetrics(),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds
+        ),
+        http2=http2,
+        retries=0
+    )
+
+
+def build_http_client(transport: InstrumentedTransport) -> httpx.Client:
+    """Wrap a transport in the client handed to the SDK"""
+    return httpx.Client(transport=transport, timeout=settings.http_timeout_seconds)
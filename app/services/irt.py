@@ -0,0 +1,300 @@
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.question_bank import DEFAULT_ITEM_DIFFICULTY
+
+logger = logging.getLogger(__name__)
+
+# Ability grid used for EAP estimation and the precomputed information tables.
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+
+# Four-option multiple choice: the 3PL lower asymptote is fixed at chance.
+DEFAULT_GUESSING = 0.25
+
+
+def p_correct(theta, a, b, c=0.0):
+    """Probability of a correct response under the 3PL model (2PL when c is 0)"""
+    return c + (1.0 - c) / (1.0 + np.exp(-a * (theta - b)))
+
+
+def item_information(theta, a, b, c=0.0):
+    """Fisher information of items at ability theta"""
+    p = np.clip(p_correct(theta, a, b, c), 1e-9, 1 - 1e-9)
+    return a ** 2 * ((p - c) / (1.0 - c)) ** 2 * (1.0 - p) / p
+
+
+class ItemParameters:
+    """Calibrated item parameters for one subject, aligned by position with item_ids"""
+
+    def __init__(self, item_ids: Sequence[int], a: np.ndarray, b: np.ndarray, c: np.ndarray):
+        self.item_ids = np.asarray(item_ids, dtype=np.int64)
+        self.a = np.asarray(a, dtype=np.float64)
+        self.b = np.asarray(b, dtype=np.float64)
+        self.c = np.asarray(c, dtype=np.float64)
+        self.index = {int(item_id): i for i, item_id in enumerate(self.item_ids)}
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+
+def calibrate(
+    persons: np.ndarray,
+    items: np.ndarray,
+    correct: np.ndarray,
+    n_persons: int,
+    n_items: int,
+    model: str = "2pl",
+    guessing: float = DEFAULT_GUESSING,
+    iterations: int = 30
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Joint maximum a posteriori calibration of 2PL/3PL item parameters.
+
+    Responses are given as three parallel arrays (person index, item index,
+    0/1 outcome). Each iteration takes one Fisher-scoring step for every
+    ability, difficulty and discrimination at once, using bincount to sum
+    per-response terms, so cost is linear in the number of responses.
+    Weak normal priors (theta ~ N(0, 1), b ~ N(0, 2), a ~ N(1, 0.5)) keep
+    estimates finite for all-correct or all-wrong response patterns. The
+    3PL guessing parameter is fixed rather than estimated.
+
+    Returns:
+        (a, b, c, theta) arrays
+    """
+    y = correct.astype(np.float64)
+    c_value = guessing if model == "3pl" else 0.0
+    theta = np.zeros(n_persons)
+    a = np.ones(n_items)
+    b = np.zeros(n_items)
+    c = np.full(n_items, c_value)
+
+    for _ in range(iterations):
+        diff = theta[persons] - b[items]
+        s = 1.0 / (1.0 + np.exp(-a[items] * diff))
+        p = np.clip(c_value + (1.0 - c_value) * s, 1e-9, 1 - 1e-9)
+        dp = (1.0 - c_value) * s * (1.0 - s)
+        # Score and expected information with respect to the logit z = a(theta - b)
+        g = (y - p) * dp / (p * (1.0 - p))
+        w = dp ** 2 / (p * (1.0 - p))
+        ai = a[items]
+
+        grad = np.bincount(persons, ai * g, n_persons) - theta
+        info = np.bincount(persons, ai ** 2 * w, n_persons) + 1.0
+        theta = np.clip(theta + np.clip(grad / info, -1, 1), -4, 4)
+
+        grad = np.bincount(items, -ai * g, n_items) - b / 4.0
+        info = np.bincount(items, ai ** 2 * w, n_items) + 0.25
+        b = np.clip(b + np.clip(grad / info, -1, 1), -4, 4)
+
+        grad = np.bincount(items, diff * g, n_items) - (a - 1.0) / 0.25
+        info = np.bincount(items, diff ** 2 * w, n_items) + 4.0
+        a = np.clip(a + np.clip(grad / info, -0.5, 0.5), 0.2, 3.0)
+
+    return a, b, c, theta
+
+
+def estimate_ability(
+    params: ItemParameters,
+    responses: Iterable[Tuple[int, bool]]
+) -> Tuple[float, float]:
+    """
+    Expected a posteriori ability from a session's responses, with a N(0, 1) prior.
+
+    Responses to items without calibrated parameters are ignored.
+
+    Returns:
+        (theta, standard error)
+    """
+    positions = []
+    outcomes = []
+    for item_id, is_correct in responses:
+        i = params.index.get(int(item_id))
+        if i is not None:
+            positions.append(i)
+            outcomes.append(1.0 if is_correct else 0.0)
+    log_post = -0.5 * THETA_GRID ** 2
+    if positions:
+        idx = np.asarray(positions)
+        y = np.asarray(outcomes)
+        p = np.clip(p_correct(THETA_GRID[:, None], params.a[idx], params.b[idx], params.c[idx]), 1e-9, 1 - 1e-9)
+        log_post = log_post + (y * np.log(p) + (1 - y) * np.log(1 - p)).sum(axis=1)
+    weights = np.exp(log_post - log_post.max())
+    weights /= weights.sum()
+    theta = float((weights * THETA_GRID).sum())
+    se = float(np.sqrt((weights * (THETA_GRID - theta) ** 2).sum()))
+    return theta, se
+
+
+def estimate_ability_from_buckets(responses: Iterable[Tuple[str, bool]]) -> Tuple[float, float]:
+    """
+    EAP ability from (difficulty bucket, outcome) pairs, for uncalibrated items.
+
+    Items are treated as 2PL with unit discrimination and the bucket's
+    default item difficulty.
+    """
+    outcomes = [(DEFAULT_ITEM_DIFFICULTY.get(bucket, 0.0), is_correct) for bucket, is_correct in responses]
+    params = ItemParameters(
+        range(len(outcomes)),
+        np.ones(len(outcomes)),
+        np.array([b for b, _ in outcomes]),
+        np.zeros(len(outcomes))
+    )
+    return estimate_ability(params, ((i, is_correct) for i, (_, is_correct) in enumerate(outcomes)))
+
+
+class InformationTable:
+    """
+    Items ranked by Fisher information at each point of the ability grid.
+
+    Only the top_k items per grid point are kept ranked; selection walks
+    that list and falls back to a masked argmax over the full information
+    row when every ranked item has been seen.
+    """
+
+    def __init__(self, params: ItemParameters, top_k: int = 256):
+        self.params = params
+        self.info = item_information(THETA_GRID[:, None], params.a, params.b, params.c).astype(np.float32)
+        k = min(top_k, len(params))
+        if k < len(params):
+            top = np.argpartition(-self.info, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(params)), self.info.shape)
+        order = np.argsort(-np.take_along_axis(self.info, top, axis=1), axis=1)
+        self.ranked = np.take_along_axis(top, order, axis=1).astype(np.int32)
+
+    def select(self, theta: float, exclude: Iterable[int] = (),
+               candidates: Optional[Iterable[int]] = None) -> Optional[int]:
+        """
+        Item id with maximum information at theta among items not excluded.
+
+        With candidates, only those item ids are considered.
+        """
+        g = int(np.abs(THETA_GRID - theta).argmin())
+        excluded = {int(item_id) for item_id in exclude}
+        allowed = None if candidates is None else {int(item_id) for item_id in candidates} - excluded
+        item_ids = self.params.item_ids
+        for i in self.ranked[g]:
+            item_id = int(item_ids[i])
+            if item_id not in excluded and (allowed is None or item_id in allowed):
+                return item_id
+        mask = ~np.isin(item_ids, list(excluded))
+        if allowed is not None:
+            mask &= np.isin(item_ids, list(allowed))
+        if not mask.any():
+            return None
+        row = np.where(mask, self.info[g], -np.inf)
+        return int(item_ids[int(row.argmax())])
+
+
+class IRTEngine:
+    """
+    Per-subject IRT calibrations built from stored attempts.
+
+    Attempts on bank items carry an item_id; calibrate_subject() fits item
+    parameters from every session in the subject, writes calibrated
+    difficulties back to the question bank, and rebuilds the subject's
+    information table used for item selection.
+    """
+
+    def __init__(self, model: str = "2pl", min_responses: int = 5, min_items: int = 20):
+        self.model = model
+        self.min_responses = min_responses
+        self.min_items = min_items
+        self._tables: Dict[str, InformationTable] = {}
+        self._lock = threading.Lock()
+
+    def is_calibrated(self, subject: str) -> bool:
+        return subject in self._tables
+
+    def parameters(self, subject: str) -> Optional[ItemParameters]:
+        table = self._tables.get(subject)
+        return table.params if table else None
+
+    def calibrate_subject(self, subject: str, attempts_by_session: Dict[str, List[Dict[str, Any]]],
+                          question_bank=None) -> Dict[str, Any]:
+        """
+        Fit item parameters for a subject from its sessions' attempts.
+
+        Items with fewer than min_responses responses are left out. The
+        calibration is only installed if at least min_items items qualify.
+        """
+        persons, items, correct = [], [], []
+        person_index: Dict[str, int] = {}
+        for session_id, attempts in attempts_by_session.items():
+            for attempt in attempts:
+                item_id = attempt.get("item_id")
+                if item_id is None:
+                    continue
+                persons.append(person_index.setdefault(session_id, len(person_index)))
+                items.append(int(item_id))
+                correct.append(bool(attempt.get("is_correct", False)))
+        if not items:
+            return {"subject": subject, "items": 0, "responses": 0, "installed": False}
+
+        raw_items = np.asarray(items, dtype=np.int64)
+        item_ids, item_pos, counts = np.unique(raw_items, return_inverse=True, return_counts=True)
+        keep = counts[item_pos] >= self.min_responses
+        kept_ids = item_ids[counts >= self.min_responses]
+        summary = {"subject": subject, "items": int(len(kept_ids)), "responses": int(keep.sum()), "installed": False}
+        if len(kept_ids) < self.min_items:
+            return summary
+
+        # Re-index the kept items densely
+        dense = np.full(len(item_ids), -1, dtype=np.int64)
+        dense[counts >= self.min_responses] = np.arange(len(kept_ids))
+        a, b, c, _ = calibrate(
+            np.asarray(persons, dtype=np.int64)[keep],
+            dense[item_pos[keep]],
+            np.asarray(correct)[keep],
+            len(person_index),
+            len(kept_ids),
+            model=self.model
+        )
+        table = InformationTable(ItemParameters(kept_ids, a, b, c))
+        with self._lock:
+            self._tables[subject] = table
+        if question_bank is not None:
+            question_bank.set_item_difficulty({int(i): float(v) for i, v in zip(kept_ids, b)})
+        summary["installed"] = True
+        logger.info(f"IRT calibration for {subject}: {summary['items']} items, {summary['responses']} responses")
+        return summary
+
+    def estimate(self, subject: str, responses: Iterable[Tuple[int, bool]]) -> Optional[Tuple[float, float]]:
+        """(theta, standard error) for a session, or None if the subject has no calibration"""
+        table = self._tables.get(subject)
+        if table is None:
+            return None
+        return estimate_ability(table.params, responses)
+
+    def select_item(self, subject: str, responses: Iterable[Tuple[int, bool]],
+                    exclude: Iterable[int] = (),
+                    candidates: Optional[Iterable[int]] = None) -> Optional[Tuple[int, float, float]]:
+        """
+        Pick the calibrated item with maximum information at the session's ability.
+
+        Args:
+            subject: The subject area
+            responses: (item_id, is_correct) pairs answered so far
+            exclude: Item ids the session must not be served again
+            candidates: If given, only these item ids are eligible
+
+        Returns:
+            (item_id, theta, standard error), or None if the subject has no
+            calibration or no eligible item is left
+        """
+        table = self._tables.get(subject)
+        if table is None:
+            return None
+        theta, se = estimate_ability(table.params, responses)
+        item_id = table.select(theta, exclude, candidates)
+        if item_id is None:
+            return None
+        return item_id, theta, se
+
+
+irt_engine = IRTEngine(model=settings.irt_model, min_responses=settings.irt_min_responses_per_item,
+                       min_items=settings.irt_min_items)
@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.services.serialization import HAS_ORJSON, dumps
+
+if HAS_ORJSON:
+    import orjson
+    _loads = orjson.loads
+else:
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Record header: LSN, payload length, CRC32 of the payload, event kind code.
+HEADER = struct.Struct("<QIIB")
+
+EVENT_KINDS = (
+    "session", "session_update", "attempts", "skill",
+    "history", "current", "current_clear", "processed", "answers_clear"
+)
+KIND_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+
+SEGMENT_PREFIX = "journal-"
+SNAPSHOT_PREFIX = "snapshot-"
+
+Event = Tuple[int, str, Dict[str, Any]]
+
+
+def encode_record(lsn: int, kind: str, payload: Dict[str, Any]) -> bytes:
+    data = dumps(payload)
+    return HEADER.pack(lsn, len(data), zlib.crc32(data), KIND_CODES[kind]) + data
+
+
+def _number(path: Path, prefix: str) -> int:
+    return int(path.name[len(prefix):].split(".")[0])
+
+
+class EventJournal:
+    """
+    Append-only binary journal of storage events with snapshots.
+
+    Each record is a fixed header (LSN, length, CRC32, kind) followed by a
+    JSON payload. Appends are encoded on the caller's thread and queued; a
+    writer thread writes whatever has queued up and fsyncs once per batch
+    (group commit), at most every fsync_interval seconds. An append is
+    therefore durable within roughly one interval, not when append()
+    returns; flush() waits for everything appended so far.
+
+    The journal is split into segments named after their first LSN.
+    compact() seals the current segment and, off the request path, builds
+    a new snapshot from the previous snapshot plus the sealed segments,
+    then deletes what the snapshot covers. Recovery loads the latest
+    snapshot and replays only the records after it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fsync_interval: float = 0.005,
+        max_batch: int = 1000,
+        segment_max_bytes: int = 64 * 1024 * 1024
+    ):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.max_batch = max_batch
+        self.segment_max_bytes = segment_max_bytes
+        self.next_lsn = 1
+        self.durable_lsn = 0
+        self._queue: Deque[Tuple[int, bytes]] = deque()
+        self._cond = threading.Condition()
+        self._segment = None
+        self._segment_bytes = 0
+        self._rotate_requested = False
+        self._rotated_at: Optional[int] = None
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._compact_lock = threading.Lock()
+        self.batches = 0
+        self.records_written = 0
+
+    # Files
+
+    def segments(self) -> List[Path]:
+        return sorted(self.dir.glob(f"{SEGMENT_PREFIX}*.log"), key=lambda p: _number(p, SEGMENT_PREFIX))
+
+    def snapshots(self) -> List[Path]:
+        return sorted(self.dir.glob(f"{SNAPSHOT_PREFIX}*.snap"), key=lambda p: _number(p, SNAPSHOT_PREFIX))
+
+    def _open_segment(self, first_lsn: int):
+        path = self.dir / f"{SEGMENT_PREFIX}{first_lsn:016d}.log"
+        self._segment = open(path, "ab")
+        self._segment_bytes = self._segment.tell()
+
+    # Reading
+
+    @staticmethod
+    def _read_segment(path: Path, from_lsn: int, to_lsn: Optional[int],
+                      repair: bool = False) -> Iterator[Event]:
+        with open(path, "rb") as f:
+            offset = 0
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                lsn, length, crc, code = HEADER.unpack(header)
+                data = f.read(length)
+                if len(data) < length or zlib.crc32(data) != crc:
+                    break
+                offset += HEADER.size + length
+                if to_lsn is not None and lsn > to_lsn:
+                    return
+                if lsn >= from_lsn:
+                    yield lsn, EVENT_KINDS[code], _loads(data)
+            torn = f.seek(0, os.SEEK_END) > offset
+        if torn and repair:
+            # A torn tail is a write cut short by a crash; drop it so new
+            # records are not appended after garbage.
+            logger.warning(f"Truncating torn journal tail in {path.name} at byte {offset}")
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+
+    def read_events(self, from_lsn: int = 1, to_lsn: Optional[int] = None,
+                    repair: bool = False) -> Iterator[Event]:
+        """
+        Stream journal records in LSN order, starting at from_lsn.
+
+        Only complete, checksummed records are returned, so this is safe
+        to call while the journal is being written.
+        """
+        segments = self.segments()
+        for i, path in enumerate(segments):
+            # Skip segments that end before from_lsn
+            if i + 1 < len(segments) and _number(segments[i + 1], SEGMENT_PREFIX) <= from_lsn:
+                continue
+            if to_lsn is not None and _number(path, SEGMENT_PREFIX) > to_lsn:
+                break
+            yield from self._read_segment(path, from_lsn, to_lsn, repair=repair and i == len(segments) - 1)
+
+    # Snapshots
+
+    def _load_snapshot(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+        snapshots = self.snapshots()
+        if not snapshots:
+            return 0, None
+        path = snapshots[-1]
+        with open(path, "rb") as f:
+            return _number(path, SNAPSHOT_PREFIX), pickle.load(f)
+
+    def _write_snapshot(self, lsn: int, state: Dict[str, Any]) -> Path:
+        path = self.dir / f"{SNAPSHOT_PREFIX}{lsn:016d}.snap"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return path
+
+    # Recovery and writing
+
+    def recover(self, storage) -> Dict[str, Any]:
+        """
+        Rebuild storage from the latest snapshot and the journal tail, then start writing.
+
+        Must be called once, before storage is attached to the journal.
+        """
+        started = time.perf_counter()
+        snapshot_lsn, state = self._load_snapshot()
+        if state is not None:
+            storage.load_state(state)
+        last_lsn = snapshot_lsn
+        replayed = 0
+        for lsn, kind, payload in self.read_events(snapshot_lsn + 1, repair=True):
+            storage.apply_event(kind, payload)
+            last_lsn = lsn
+            replayed += 1
+        self.next_lsn = last_lsn + 1
+        self.durable_lsn = last_lsn
+        self._open_segment(self.next_lsn)
+        self._thread = threading.Thread(target=self._run, name="event-journal", daemon=True)
+        self._thread.start()
+        return {
+            "snapshot_lsn": snapshot_lsn,
+            "replayed_events": replayed,
+            "last_lsn": last_lsn,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def append(self, kind: str, payload: Dict[str, Any]) -> int:
+        """Queue an event for the next group commit; returns its LSN"""
+        with self._cond:
+            lsn = self.next_lsn
+            self.next_lsn += 1
+            self._queue.append((lsn, encode_record(lsn, kind, payload)))
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+        return lsn
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._queue and not self._rotate_requested and not self._closed:
+                    self._cond.wait(self.fsync_interval)
+                batch = list(self._queue)
+                self._queue.clear()
+                rotate = self._rotate_requested
+                closing = self._closed
+            if batch:
+                data = b"".join(record for _, record in batch)
+                self._segment.write(data)
+                self._segment.flush()
+                os.fsync(self._segment.fileno())
+                self._segment_bytes += len(data)
+                self.batches += 1
+                self.records_written += len(batch)
+            with self._cond:
+                if batch:
+                    self.durable_lsn = batch[-1][0]
+                if rotate or self._segment_bytes >= self.segment_max_bytes:
+                    self._segment.close()
+                    self._open_segment(self.durable_lsn + 1)
+                    if rotate:
+                        self._rotated_at = self.durable_lsn
+                        self._rotate_requested = False
+                self._cond.notify_all()
+                if closing and not self._queue:
+                    self._segment.close()
+                    return
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every event appended so far is durable"""
+        with self._cond:
+            target = self.next_lsn - 1
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self.durable_lsn >= target, timeout)
+
+    def _rotate(self) -> int:
+        """Seal the current segment; returns the last LSN in sealed segments"""
+        with self._cond:
+            self._rotated_at = None
+            self._rotate_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._rotated_at is not None)
+            return self._rotated_at
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        Write a snapshot covering all sealed segments and delete what it covers.
+
+        The snapshot is built by replaying the previous snapshot and the
+        sealed segments into a scratch storage, so live state is never
+        locked or copied.
+        """
+        from app.services.storage import InMemoryStorage
+
+        with self._compact_lock:
+            started = time.perf_counter()
+            boundary = self._rotate()
+            snapshot_lsn, state = self._load_snapshot()
+            if boundary <= snapshot_lsn:
+                return {"snapshot_lsn": snapshot_lsn, "compacted_events": 0}
+            scratch = InMemoryStorage()
+            if state is not None:
+                scratch.load_state(state, notify=False)
+            events = 0
+            for _, kind, payload in self.read_events(snapshot_lsn + 1, boundary):
+                scratch.apply_event(kind, payload)
+                events += 1
+            self._write_snapshot(boundary, scratch.export_state())
+            for path in self.snapshots()[:-1]:
+                path.unlink()
+            for path in self.segments():
+                if _number(path, SEGMENT_PREFIX) <= boundary:
+                    path.unlink()
+            return {
+                "snapshot_lsn": boundary,
+                "compacted_events": events,
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "next_lsn": self.next_lsn,
+            "durable_lsn": self.durable_lsn,
+            "batches": self.batches,
+            "records_written": self.records_written,
+            "avg_batch_size": round(self.records_written / self.batches, 1) if self.batches else 0.0,
+            "segments": len(self.segments()),
+            "snapshots": [p.name for p in self.snapshots()]
+        }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,136 @@
+import base64
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Encode pagination state as an opaque, URL-safe cursor string"""
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Cursor fields are positions and running counts, so a negative number
+    can only come from a tampered cursor and is rejected.
+
+    Raises:
+        ValueError: If the cursor is malformed or has a negative field
+    """
+    if not cursor:
+        return {}
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor")
+    if any(isinstance(value, (int, float)) and value < 0 for value in state.values()):
+        raise ValueError("Invalid cursor: negative offset")
+    return state
+
+
+def bucket_downsample(
+    points: List[Dict[str, Any]],
+    max_points: int,
+    y_key: str = "accuracy"
+) -> List[Dict[str, Any]]:
+    """
+    Reduce points to at most max_points fixed-size buckets.
+
+    Each bucket is represented by its last point with y_key replaced by the
+    bucket mean, so cumulative fields stay correct at bucket boundaries.
+    """
+    if max_points <= 0 or len(points) <= max_points:
+        return points
+    bucket_size = len(points) / max_points
+    sampled = []
+    for i in range(max_points):
+        bucket = points[int(i * bucket_size):int((i + 1) * bucket_size)]
+        if not bucket:
+            continue
+        point = dict(bucket[-1])
+        point[y_key] = round(sum(p[y_key] for p in bucket) / len(bucket), 1)
+        sampled.append(point)
+    return sampled
+
+
+def lttb(
+    points: List[Dict[str, Any]],
+    max_points: int,
+    x_key: str = "question_number",
+    y_key: str = "accuracy"
+) -> List[Dict[str, Any]]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each intermediate bucket, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Preserves the visual shape of a curve
+    far better than plain striding.
+    """
+    n = len(points)
+    if max_points >= n or max_points < 3:
+        return points
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (max_points - 2)
+    a = 0
+    for i in range(max_points - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_bucket = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(p[x_key] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[y_key] for p in next_bucket) / len(next_bucket)
+
+        ax, ay = points[a][x_key], points[a][y_key]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs(
+                (ax - avg_x) * (points[j][y_key] - ay)
+                - (ax - points[j][x_key]) * (avg_y - ay)
+            )
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def downsample(
+    points: List[Dict[str, Any]],
+    max_points: Optional[int],
+    method: str = "lttb"
+) -> List[Dict[str, Any]]:
+    """Downsample growth points with the named method ("lttb" or "bucket")"""
+    if not max_points:
+        return points
+    if method == "bucket":
+        return bucket_downsample(points, max_points)
+    if method == "lttb":
+        return lttb(points, max_points)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+
+def stream_json_array(items: Iterable[Any], chunk_size: int = 1000) -> Iterator[bytes]:
+    """Encode an iterable as a JSON array in chunks, without building the whole document"""
+    yield b"["
+    first = True
+    chunk = []
+    for item in items:
+        chunk.append(json.dumps(item, default=str))
+        if len(chunk) >= chunk_size:
+            yield (("" if first else ",") + ",".join(chunk)).encode("utf-8")
+            first = False
+            chunk = []
+    if chunk:
+        yield (("" if first else ",") + ",".join(chunk)).encode("utf-8")
+    yield b"]"
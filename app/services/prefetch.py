@@ -0,0 +1,102 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, NamedTuple, Optional
+
+
+class PlannedQuestion(NamedTuple):
+    """A session's next question, decided while the current one is being answered"""
+    difficulty: str
+    topic: str
+    fresh: bool
+    task: Optional["asyncio.Future"]
+
+
+class QuestionPrefetcher:
+    """
+    Plans each session's next question while the student answers the current one.
+
+    When a question is served, the caller predicts the difficulty and
+    topic of the next one and decides now whether it will come from the question bank
+    or a fresh generation (the same draw it would make at serve time, so
+    the bank/fresh ratio is unchanged). For fresh questions the generation
+    call starts immediately at prefetch priority. When the next question
+    is served, the plan is used if the prediction was right;
+    otherwise, or if the plan is dropped, the generated question is not
+    lost, since the generator adds every question it produces to the
+    question pool. Generations that are started but not served to their
+    session (mispredicted, replaced or dropped) are counted as wasted.
+
+    At most max_sessions plans are kept; the oldest are dropped first.
+    """
+
+    def __init__(self, max_sessions: int = 10_000):
+        self.max_sessions = max_sessions
+        self._plans: "OrderedDict[str, PlannedQuestion]" = OrderedDict()
+        self.planned = 0
+        self.hits = 0
+        self.mispredicted = 0
+        self.failed = 0
+        self.dropped = 0
+        self.wasted = 0
+
+    def plan(self, session_id: str, difficulty: str, topic: str, fresh: bool,
+             generation: Optional[Awaitable[Dict[str, Any]]] = None):
+        """Record the next question's plan, starting its generation if one is given"""
+        self.drop(session_id)
+        task = asyncio.ensure_future(generation) if generation is not None else None
+        if task is not None:
+            # Failures surface through take(); don't log them as unretrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._plans[session_id] = PlannedQuestion(difficulty, topic, fresh, task)
+        self.planned += 1
+        while len(self._plans) > self.max_sessions:
+            self._discard(self._plans.popitem(last=False)[1])
+
+    def pop(self, session_id: str) -> Optional[PlannedQuestion]:
+        return self._plans.pop(session_id, None)
+
+    def drop(self, session_id: str):
+        planned = self._plans.pop(session_id, None)
+        if planned is not None:
+            self._discard(planned)
+
+    def _discard(self, planned: PlannedQuestion):
+        self.dropped += 1
+        if planned.task is not None:
+            self.wasted += 1
+
+    async def take(self, planned: Optional[PlannedQuestion], difficulty: str,
+                   topic: str) -> Optional[Dict[str, Any]]:
+        """
+        The prefetched question for a plan, if it was generated for this difficulty and topic.
+
+        Returns None when there is nothing usable, so the caller generates live.
+        """
+        if planned is None or planned.task is None:
+            return None
+        if (planned.difficulty, planned.topic) != (difficulty, topic):
+            self.mispredicted += 1
+            self.wasted += 1
+            return None
+        try:
+            # Shielded so a cancelled request does not cancel the shared generation
+            question = await asyncio.shield(planned.task)
+        except Exception:
+            self.failed += 1
+            return None
+        self.hits += 1
+        return dict(question)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._plans),
+            "planned": self.planned,
+            "hits": self.hits,
+            "mispredicted": self.mispredicted,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "wasted": self.wasted
+        }
+
+
+question_prefetcher = QuestionPrefetcher()
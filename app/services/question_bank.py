@@ -0,0 +1,273 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import settings
+
+# Starting item difficulty (logit scale) for each difficulty bucket, used
+# until an item has a calibrated value.
+DEFAULT_ITEM_DIFFICULTY = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+
+QUESTION_FIELDS = (
+    "question", "option_a", "option_b", "option_c", "option_d",
+    "correct_answer", "explanation", "difficulty", "subject", "topic"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    subject TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    item_difficulty REAL NOT NULL,
+    question TEXT NOT NULL UNIQUE,
+    option_a TEXT NOT NULL,
+    option_b TEXT NOT NULL,
+    option_c TEXT NOT NULL,
+    option_d TEXT NOT NULL,
+    correct_answer TEXT NOT NULL,
+    explanation TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT 'generated',
+    served_count INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_level
+    ON questions (subject, difficulty, item_difficulty);
+CREATE INDEX IF NOT EXISTS idx_questions_topic
+    ON questions (subject, topic, difficulty, item_difficulty);
+"""
+
+
+def _to_question(row: sqlite3.Row) -> Dict[str, Any]:
+    question = {field: row[field] for field in QUESTION_FIELDS}
+    question["bank_id"] = row["id"]
+    question["item_difficulty"] = row["item_difficulty"]
+    return question
+
+
+class QuestionBank:
+    """
+    Persistent SQLite-backed bank of validated questions.
+
+    Items are indexed on (subject, difficulty, item_difficulty) and
+    (subject, topic, difficulty, item_difficulty), so picking the unseen
+    item nearest a target difficulty is two short range scans outward
+    from the target rather than a scan of the bank. The connection is
+    opened on first use.
+
+    Serves are counted in memory and written by flush_served(), so serving
+    an item is a read only and does not commit a transaction.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._served: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def add(self, question: Dict[str, Any], source: str = "generated",
+            item_difficulty: Optional[float] = None) -> Optional[int]:
+        """
+        Store a validated question.
+
+        Returns:
+            The item id, or None if an identical question is already banked
+        """
+        if item_difficulty is None:
+            item_difficulty = DEFAULT_ITEM_DIFFICULTY.get(question["difficulty"], 0.0)
+        with self._lock:
+            cursor = self.conn.execute(
+                """INSERT OR IGNORE INTO questions
+                   (subject, topic, difficulty, item_difficulty, question, option_a, option_b,
+                    option_c, option_d, correct_answer, explanation, source, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    question["subject"], question.get("topic") or "General", question["difficulty"],
+                    item_difficulty, question["question"], question["option_a"], question["option_b"],
+                    question["option_c"], question["option_d"], question["correct_answer"],
+                    question.get("explanation", ""), source, time.time()
+                )
+            )
+            self.conn.commit()
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def add_many(self, questions: Iterable[Dict[str, Any]], source: str = "curated") -> int:
+        """Bulk-load questions in one transaction; returns the number newly added"""
+        rows = [
+            (
+                q["subject"], q.get("topic") or "General", q["difficulty"],
+                q.get("item_difficulty", DEFAULT_ITEM_DIFFICULTY.get(q["difficulty"], 0.0)),
+                q["question"], q["option_a"], q["option_b"], q["option_c"], q["option_d"],
+                q["correct_answer"], q.get("explanation", ""), source, time.time()
+            )
+            for q in questions
+        ]
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                """INSERT OR IGNORE INTO questions
+                   (subject, topic, difficulty, item_difficulty, question, option_a, option_b,
+                    option_c, option_d, correct_answer, explanation, source, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+            self.conn.commit()
+            return self.conn.total_changes - before
+
+    def _nearest(self, where: str, params: List[Any], target: float,
+                 exclude: List[str]) -> Optional[sqlite3.Row]:
+        # The NOT IN list is the session's history (at most a quiz's worth of
+        # items), so each scan reads at most len(exclude) + 1 index entries.
+        placeholders = ",".join("?" * len(exclude))
+        not_seen = f" AND question NOT IN ({placeholders})" if exclude else ""
+        best = None
+        for op, order in ((">=", "ASC"), ("<", "DESC")):
+            row = self.conn.execute(
+                f"SELECT * FROM questions WHERE {where} AND item_difficulty {op} ?{not_seen} "
+                f"ORDER BY item_difficulty {order} LIMIT 1",
+                params + [target] + exclude
+            ).fetchone()
+            if row is not None and (
+                best is None or abs(row["item_difficulty"] - target) < abs(best["item_difficulty"] - target)
+            ):
+                best = row
+        return best
+
+    def pick(
+        self,
+        subject: str,
+        difficulty: str,
+        exclude: Iterable[str] = (),
+        topic: Optional[str] = None,
+        target_difficulty: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Pick the unseen item closest to the target item difficulty.
+
+        Items on the requested topic are preferred; otherwise any topic in
+        the subject and difficulty bucket is used.
+
+        Args:
+            subject: The subject area
+            difficulty: The difficulty bucket (easy, medium, hard)
+            exclude: Question texts the session has already seen
+            topic: Preferred topic, if any
+            target_difficulty: Target item difficulty; defaults to the bucket's centre
+
+        Returns:
+            A question dict shaped like a generated question plus "bank_id",
+            or None if the bank has no unseen item
+        """
+        if target_difficulty is None:
+            target_difficulty = DEFAULT_ITEM_DIFFICULTY.get(difficulty, 0.0)
+        excluded = list(dict.fromkeys(exclude))
+        with self._lock:
+            row = None
+            if topic:
+                row = self._nearest(
+                    "subject = ? AND topic = ? AND difficulty = ?",
+                    [subject, topic, difficulty], target_difficulty, excluded
+                )
+            if row is None:
+                row = self._nearest(
+                    "subject = ? AND difficulty = ?",
+                    [subject, difficulty], target_difficulty, excluded
+                )
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._served[row["id"]] = self._served.get(row["id"], 0) + 1
+        return _to_question(row)
+
+    def get(self, item_id: int, mark_served: bool = True) -> Optional[Dict[str, Any]]:
+        """Fetch an item by id, in the same shape as pick()"""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM questions WHERE id = ?", (item_id,)).fetchone()
+            if row is not None and mark_served:
+                self._served[item_id] = self._served.get(item_id, 0) + 1
+        if row is None:
+            return None
+        return _to_question(row)
+
+    def flush_served(self) -> int:
+        """
+        Write the serve counts accumulated since the last flush in one transaction.
+
+        Returns:
+            Number of items whose count was updated
+        """
+        with self._lock:
+            served, self._served = self._served, {}
+            if served:
+                self.conn.executemany(
+                    "UPDATE questions SET served_count = served_count + ? WHERE id = ?",
+                    [(count, item_id) for item_id, count in served.items()]
+                )
+                self.conn.commit()
+        return len(served)
+
+    def set_item_difficulty(self, updates: Dict[int, float]):
+        """Store calibrated item difficulties keyed by item id"""
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE questions SET item_difficulty = ? WHERE id = ?",
+                [(value, item_id) for item_id, value in updates.items()]
+            )
+            self.conn.commit()
+
+    def item_ids(self, subject: str, difficulty: str, topic: Optional[str] = None) -> List[int]:
+        """Ids of the items in a subject's difficulty bucket, optionally on one topic"""
+        where, params = "subject = ? AND difficulty = ?", [subject, difficulty]
+        if topic:
+            where, params = where + " AND topic = ?", params + [topic]
+        with self._lock:
+            rows = self.conn.execute(f"SELECT id FROM questions WHERE {where}", params).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, subject: Optional[str] = None) -> int:
+        with self._lock:
+            if subject is None:
+                return self.conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM questions WHERE subject = ?", (subject,)).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT subject, difficulty, COUNT(*) FROM questions GROUP BY subject, difficulty"
+            ).fetchall()
+        lookups = self.hits + self.misses
+        return {
+            "items": {f"{subject}/{difficulty}": n for subject, difficulty, n in rows},
+            "hits": self.hits,
+            "misses": self.misses,
+            "unflushed_serves": sum(self._served.values()),
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self):
+        self.flush_served()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+question_bank = QuestionBank(settings.question_bank_path)
@@ -2,11 +2,20 @@ import json
 import logging
 import os
 import asyncio
+import random
+import threading
+import time
 from typing import Dict, Any, List, Optional
-from google import genai
-from google.genai import types
-from google.genai.errors import ClientError
 from pydantic import BaseModel
+from app.config import settings
+from app.services.http_transport import TransportMetrics, build_transport, build_http_client
+from app.services.admission import (
+    AdmissionRejected, Priority, build_admission_controller, build_tenant_quotas, estimate_tokens
+)
+from app.services.question_pool import QuestionPool
+from app.services.hedging import HedgingPolicy
+from app.services.question_validation import REQUIRED_FIELDS, ValidationResult, extract_json, validate_question
+from app.services.topic_scheduler import TOPIC_CATALOG
 
 # IMPORTANT: KEEP THIS COMMENT
 # Follow these instructions when using this blueprint:
@@ -17,8 +26,8 @@ from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
-# This API key is from Gemini Developer API Key, not vertex AI API Key
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+# The google-genai SDK is imported and the client built on first use, so
+# importing this module (the API, tests, CLI tools) stays cheap.
 
 
 class Question(BaseModel):
@@ -35,35 +44,172 @@ class QuestionGenerator:
     """Generate adaptive questions using Gemini AI based on BKT difficulty levels"""
     
     def __init__(self):
-        self.client = client
+        self._client = None
+        self._transport = None
+        self._client_lock = threading.Lock()
+        self.transport_metrics = TransportMetrics()
+        self.admission = build_admission_controller()
+        self.tenant_quotas = build_tenant_quotas()
+        self.question_pool = QuestionPool()
+        self.hedging = HedgingPolicy.from_settings()
+        self.validation_stats = {
+            "served": 0,
+            "wasted_calls": 0,
+            "auto_repaired": 0,
+            "partial_regenerations": 0
+        }
         self.max_retries = 3
         self.base_delay = 2  # Base delay in seconds
     
-    async def _call_with_retry(self, func, *args, **kwargs):
+    @property
+    def client(self):
+        """The Gemini client, constructed on first access"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from google import genai
+                    from google.genai import types
+                    
+                    # One pooled HTTP client is shared by every generation and
+                    # recommendation call so connections are kept alive and reused.
+                    self._transport = build_transport(self.transport_metrics)
+                    # This API key is from Gemini Developer API Key, not vertex AI API Key
+                    self._client = genai.Client(
+                        api_key=os.environ.get("GEMINI_API_KEY"),
+                        http_options=types.HttpOptions(
+                            base_url=settings.gemini_base_url,
+                            httpx_client=build_http_client(self._transport)
+                        )
+                    )
+        return self._client
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Generation metrics for the admin metrics endpoint"""
+        return {
+            "transport": self.transport_stats(),
+            "admission": self.admission.stats(),
+            "tenant_quotas": self.tenant_quotas.stats(),
+            "question_pool": self.question_pool.stats(),
+            "hedging": self.hedging.stats(),
+            "validation": {
+                **self.validation_stats,
+                "wasted_calls_per_served": round(
+                    self.validation_stats["wasted_calls"] / self.validation_stats["served"], 3
+                ) if self.validation_stats["served"] else 0.0
+            }
+        }
+    
+    def transport_stats(self) -> Dict[str, Any]:
+        """Request and connection metrics for the shared HTTP transport"""
+        stats = self.transport_metrics.snapshot()
+        if self._transport is not None:
+            stats.update(self._transport.pool_stats())
+        return stats
+    
+    async def warmup(self):
+        """
+        Construct the client, open a connection to the API and fill the question pool.
+        
+        The pool gets settings.warmup_pool_questions questions for every
+        catalog subject and difficulty, so pooled fallbacks are available
+        from the first request. Failures are logged and ignored; the first
+        real request will simply pay the setup cost instead.
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            client = await loop.run_in_executor(None, lambda: self.client)
+            await loop.run_in_executor(None, lambda: client.models.get(model="gemini-2.5-flash"))
+            logger.info("Gemini client warmed up")
+        except Exception as e:
+            logger.warning(f"Gemini warmup failed: {e}")
+            return
+        if settings.warmup_pool_questions > 0:
+            pooled = await self.fill_pool(settings.warmup_pool_questions)
+            logger.info(f"Question pool warmed up with {pooled} questions")
+    
+    async def fill_pool(self, per_key: int, catalog: Optional[Dict[str, Dict[str, List[str]]]] = None) -> int:
+        """
+        Generate questions into the pool for every subject and difficulty of a topic catalog.
+        
+        Each (subject, difficulty) is filled in sequence, cycling through
+        its topics, and all of them concurrently. Calls are made at
+        PREFETCH priority, so admission control sheds them before live
+        traffic; a rejected or failed call ends that key's fill.
+        
+        Args:
+            per_key: Questions to generate per (subject, difficulty)
+            catalog: Topics per subject and difficulty, TOPIC_CATALOG by default
+        
+        Returns:
+            Number of questions added to the pool
+        """
+        async def fill(subject: str, difficulty: str, topics: List[str]) -> int:
+            generated: List[str] = []
+            for i in range(per_key):
+                try:
+                    question_data = await self._generate_once(
+                        subject, topics[i % len(topics)], difficulty, generated, Priority.PREFETCH
+                    )
+                except Exception as e:
+                    logger.warning(f"Pool warmup for {subject}/{difficulty} stopped: {e}")
+                    break
+                self.question_pool.add(question_data)
+                generated.append(question_data["question"])
+            return len(generated)
+        
+        counts = await asyncio.gather(*(
+            fill(subject, difficulty, topics)
+            for subject, buckets in (catalog or TOPIC_CATALOG).items()
+            for difficulty, topics in buckets.items() if topics
+        ))
+        return sum(counts)
+    
+    async def _call_with_retry(
+        self,
+        func,
+        *args,
+        priority: Priority = Priority.LIVE,
+        estimated_tokens: int = 1000,
+        **kwargs
+    ):
         """
         Call a function with exponential backoff retry logic for transient errors.
         Performs 1 initial attempt + max_retries retry attempts.
         
+        Every attempt first goes through admission control, so calls are
+        paced to the configured request and token rates instead of
+        discovering the quota through 429s.
+        
         Args:
             func: The function to call
             *args: Positional arguments for the function
+            priority: Admission priority class of the call
+            estimated_tokens: Estimated total tokens, charged against the token bucket
             **kwargs: Keyword arguments for the function
         
         Returns:
             The result of the function call
         
         Raises:
+            AdmissionRejected: If the call could not be admitted in time
             Exception: If all retries are exhausted
         """
+        from google.genai.errors import APIError
+        
         last_exception = None
         total_attempts = self.max_retries + 1  # Initial attempt + retries
         
         for attempt in range(total_attempts):
+            await self.admission.acquire(priority, estimated_tokens)
             try:
                 loop = asyncio.get_event_loop()
                 result = await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+                self.admission.record_success()
+                usage = getattr(result, "usage_metadata", None)
+                if usage is not None and getattr(usage, "total_token_count", None):
+                    self.admission.record_usage(usage.total_token_count, estimated_tokens)
                 return result
-            except ClientError as e:
+            except APIError as e:
                 last_exception = e
                 error_message = str(e)
                 
@@ -81,17 +227,21 @@ class QuestionGenerator:
                     logger.error(f"Non-transient error: {e}")
                     raise
                 
+                if '429' in error_message or 'RESOURCE_EXHAUSTED' in error_message:
+                    self.admission.record_throttled()
+                
                 if attempt < total_attempts - 1:
-                    # Calculate exponential backoff delay
-                    delay = self.base_delay * (2 ** attempt)
+                    # Exponential backoff with jitter, so requests that failed
+                    # together don't all retry at the same instant
+                    delay = self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
                     retry_num = attempt + 1
-                    logger.warning(f"Transient error: {error_message}. Retry {retry_num}/{self.max_retries} in {delay}s...")
+                    logger.warning(f"Transient error: {error_message}. Retry {retry_num}/{self.max_retries} in {delay:.1f}s...")
                     await asyncio.sleep(delay)
                 else:
                     logger.error(f"All {self.max_retries} retry attempts exhausted")
                     raise Exception(f"Failed after {self.max_retries} retries. Last error: {error_message}")
             except Exception as e:
-                # Non-ClientError exceptions (parsing errors, etc.)
+                # Non-API exceptions (parsing errors, etc.)
                 logger.error(f"Non-retryable error: {e}")
                 raise
         
@@ -105,32 +255,122 @@ class QuestionGenerator:
         subject: str, 
         topic: str, 
         difficulty: str,
-        previous_questions: Optional[List[str]] = None
+        previous_questions: Optional[List[str]] = None,
+        priority: Priority = Priority.LIVE,
+        tenant: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate a question using Gemini AI based on subject, topic, and difficulty.
         
+        With hedging enabled, a second call is fired if the first has not
+        returned by the observed p90 latency for this subject and difficulty;
+        the first valid response wins. If the model call is over the tenant's
+        quota, rejected by admission control or fails, an unseen question from
+        the pool of recently generated questions is served instead, when one
+        is available.
+        
         Args:
             subject: The subject area (Maths, Science, Python)
             topic: The specific topic within the subject
             difficulty: The difficulty level (easy, medium, hard)
             previous_questions: List of previous questions to avoid duplicates
+            priority: Admission priority class of the model call
+            tenant: Tenant whose generation quota the call counts against
         
         Returns:
             A dictionary containing the generated question
         """
+        started = time.perf_counter()
         try:
-            difficulty_descriptions = {
-                "easy": "basic, introductory level suitable for beginners",
-                "medium": "intermediate level requiring some understanding of concepts",
-                "hard": "advanced level requiring deep understanding and problem-solving"
-            }
-            
-            previous_context = ""
-            if previous_questions:
-                previous_context = f"\n\nAvoid generating questions similar to these:\n" + "\n".join(previous_questions[-3:])
-            
-            system_prompt = f"""You are an expert educational content creator specializing in {subject}.
+            quota_wait = self.tenant_quotas.try_acquire(tenant)
+            if quota_wait:
+                raise AdmissionRejected(priority, quota_wait)
+            if self.hedging.enabled and priority == Priority.LIVE:
+                question_data = await self._generate_hedged(subject, topic, difficulty, previous_questions)
+            else:
+                question_data = await self._generate_once(subject, topic, difficulty, previous_questions, priority)
+            self.question_pool.add(question_data)
+            self.hedging.record_served((subject, difficulty), time.perf_counter() - started)
+            self.validation_stats["served"] += 1
+            return question_data
+        except Exception as e:
+            pooled = self.question_pool.take(subject, difficulty, exclude=previous_questions or (), topic=topic)
+            if pooled is not None:
+                logger.warning(f"Serving pooled question for {subject}/{difficulty} after generation failure: {e}")
+                self.validation_stats["served"] += 1
+                return pooled
+            logger.error(f"Failed to generate question: {e}")
+            if isinstance(e, AdmissionRejected):
+                raise
+            raise Exception(f"Failed to generate question with Gemini: {e}")
+    
+    async def _generate_hedged(
+        self,
+        subject: str,
+        topic: str,
+        difficulty: str,
+        previous_questions: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """
+        Run a generation call, hedging it with a second call if it is slow.
+        
+        The hedge is only fired when the hedge budget allows. Model calls
+        running in executor threads cannot be cancelled, so the losing call
+        is left to finish and its question is added to the pool.
+        """
+        key = (subject, difficulty)
+        self.hedging.start_request()
+        primary = asyncio.ensure_future(
+            self._generate_once(subject, topic, difficulty, previous_questions, Priority.LIVE)
+        )
+        done, _ = await asyncio.wait({primary}, timeout=self.hedging.hedge_delay(key))
+        if done or not self.hedging.try_start_hedge():
+            return await primary
+        
+        hedge = asyncio.ensure_future(
+            self._generate_once(subject, topic, difficulty, previous_questions, Priority.PREFETCH)
+        )
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        self.hedging.hedges_won += 1
+                    for loser in pending:
+                        loser.add_done_callback(self._pool_loser)
+                    return task.result()
+                first_error = first_error or task.exception()
+        raise first_error
+    
+    def _pool_loser(self, task: "asyncio.Future"):
+        if not task.cancelled() and task.exception() is None:
+            self.question_pool.add(task.result())
+    
+    async def _generate_once(
+        self,
+        subject: str,
+        topic: str,
+        difficulty: str,
+        previous_questions: Optional[List[str]],
+        priority: Priority
+    ) -> Dict[str, Any]:
+        """Make a single generation call (with retries) and parse its result"""
+        from google.genai import types
+        
+        started = time.perf_counter()
+        difficulty_descriptions = {
+            "easy": "basic, introductory level suitable for beginners",
+            "medium": "intermediate level requiring some understanding of concepts",
+            "hard": "advanced level requiring deep understanding and problem-solving"
+        }
+        
+        previous_context = ""
+        if previous_questions:
+            previous_context = f"\n\nAvoid generating questions similar to these:\n" + "\n".join(previous_questions[-3:])
+        
+        system_prompt = f"""You are an expert educational content creator specializing in {subject}.
 Generate a {difficulty_descriptions.get(difficulty, 'medium')} multiple-choice question about {topic} in {subject}.
 
 Requirements:
@@ -156,129 +396,160 @@ Respond with JSON matching this exact format:
 }}
 {previous_context}"""
 
-            # Run Gemini API call with retry logic for transient errors
-            response = await self._call_with_retry(
-                self.client.models.generate_content,
-                model="gemini-2.5-flash",
-                contents=[
-                    types.Content(role="user", parts=[types.Part(text=f"Generate a {difficulty} question about {topic} in {subject}.")])
-                ],
-                config=types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    response_mime_type="application/json",
-                    temperature=0.7,
-                )
+        # Run Gemini API call with retry logic for transient errors
+        response = await self._call_with_retry(
+            self.client.models.generate_content,
+            priority=priority,
+            estimated_tokens=estimate_tokens(system_prompt),
+            model="gemini-2.5-flash",
+            contents=[
+                types.Content(role="user", parts=[types.Part(text=f"Generate a {difficulty} question about {topic} in {subject}.")])
+            ],
+            config=types.GenerateContentConfig(
+                system_instruction=system_prompt,
+                response_mime_type="application/json",
+                temperature=0.7,
             )
+        )
+        
+        # Debug logging
+        logger.info(f"Response object type: {type(response)}")
+        logger.info(f"Response has text attr: {hasattr(response, 'text')}")
+        
+        # Check candidates first for safety filters or blocks
+        if hasattr(response, 'candidates') and response.candidates:
+            logger.info(f"Response has {len(response.candidates)} candidates")
+            for i, candidate in enumerate(response.candidates):
+                logger.info(f"Candidate {i} finish_reason: {getattr(candidate, 'finish_reason', 'N/A')}")
+                if hasattr(candidate, 'safety_ratings'):
+                    logger.info(f"Candidate {i} safety_ratings: {candidate.safety_ratings}")
+                if hasattr(candidate, 'content'):
+                    logger.info(f"Candidate {i} has content: {bool(candidate.content)}")
+        
+        # Check prompt_feedback for blocks
+        if hasattr(response, 'prompt_feedback'):
+            logger.info(f"Prompt feedback: {response.prompt_feedback}")
+        
+        raw_json = response.text if hasattr(response, 'text') and response.text else None
+        
+        if not raw_json:
+            logger.error(f"Empty or no response.text from Gemini for {subject}/{topic}/{difficulty}")
             
-            # Debug logging
-            logger.info(f"Response object type: {type(response)}")
-            logger.info(f"Response has text attr: {hasattr(response, 'text')}")
-            
-            # Check candidates first for safety filters or blocks
+            # Try to extract from candidates directly
             if hasattr(response, 'candidates') and response.candidates:
-                logger.info(f"Response has {len(response.candidates)} candidates")
-                for i, candidate in enumerate(response.candidates):
-                    logger.info(f"Candidate {i} finish_reason: {getattr(candidate, 'finish_reason', 'N/A')}")
-                    if hasattr(candidate, 'safety_ratings'):
-                        logger.info(f"Candidate {i} safety_ratings: {candidate.safety_ratings}")
-                    if hasattr(candidate, 'content'):
-                        logger.info(f"Candidate {i} has content: {bool(candidate.content)}")
-            
-            # Check prompt_feedback for blocks
-            if hasattr(response, 'prompt_feedback'):
-                logger.info(f"Prompt feedback: {response.prompt_feedback}")
-            
-            raw_json = response.text if hasattr(response, 'text') and response.text else None
+                for candidate in response.candidates:
+                    if hasattr(candidate, 'content') and candidate.content:
+                        if hasattr(candidate.content, 'parts') and candidate.content.parts:
+                            for part in candidate.content.parts:
+                                if hasattr(part, 'text') and part.text:
+                                    raw_json = part.text
+                                    logger.info(f"Extracted text from candidate.content.parts: {raw_json[:100]}...")
+                                    break
+                    if raw_json:
+                        break
             
             if not raw_json:
-                logger.error(f"Empty or no response.text from Gemini for {subject}/{topic}/{difficulty}")
-                
-                # Try to extract from candidates directly
-                if hasattr(response, 'candidates') and response.candidates:
-                    for candidate in response.candidates:
-                        if hasattr(candidate, 'content') and candidate.content:
-                            if hasattr(candidate.content, 'parts') and candidate.content.parts:
-                                for part in candidate.content.parts:
-                                    if hasattr(part, 'text') and part.text:
-                                        raw_json = part.text
-                                        logger.info(f"Extracted text from candidate.content.parts: {raw_json[:100]}...")
-                                        break
-                        if raw_json:
-                            break
-                
-                if not raw_json:
-                    raise ValueError("Empty response from Gemini - response.text is None or empty")
-            
-            logger.info(f"Generated question JSON: {raw_json}")
-            
-            if raw_json:
-                data = json.loads(raw_json)
-                question_data = {
-                    "question": data["question"],
-                    "option_a": data["option_a"],
-                    "option_b": data["option_b"],
-                    "option_c": data["option_c"],
-                    "option_d": data["option_d"],
-                    "correct_answer": data["correct_answer"].upper(),
-                    "difficulty": difficulty,
-                    "subject": subject,
-                    "topic": topic,
-                    "explanation": data.get("explanation", "")
-                }
-                return question_data
-            else:
-                raise ValueError("Empty response from Gemini")
-                
-        except Exception as e:
-            logger.error(f"Failed to generate question: {e}")
-            raise Exception(f"Failed to generate question with Gemini: {e}")
+                self.validation_stats["wasted_calls"] += 1
+                raise ValueError("Empty response from Gemini - response.text is None or empty")
+        
+        logger.info(f"Generated question JSON: {raw_json}")
+        
+        data = extract_json(raw_json)
+        if data is None:
+            self.validation_stats["wasted_calls"] += 1
+            raise ValueError("Gemini response did not contain a JSON object")
+        
+        result = validate_question(data)
+        if result.repairs:
+            self.validation_stats["auto_repaired"] += 1
+        if not result.ok:
+            if len(result.invalid_fields) == len(REQUIRED_FIELDS):
+                self.validation_stats["wasted_calls"] += 1
+                raise ValueError("Gemini response had no usable question fields")
+            result = await self._regenerate_fields(subject, topic, difficulty, result, priority)
+            if not result.ok:
+                # Both the original call and the repair call produced nothing servable
+                self.validation_stats["wasted_calls"] += 2
+                raise ValueError(f"Invalid question fields after repair: {', '.join(result.invalid_fields)}")
+        
+        question_data = {
+            "question": result.data["question"],
+            "option_a": result.data["option_a"],
+            "option_b": result.data["option_b"],
+            "option_c": result.data["option_c"],
+            "option_d": result.data["option_d"],
+            "correct_answer": result.data["correct_answer"],
+            "difficulty": difficulty,
+            "subject": subject,
+            "topic": topic,
+            "explanation": result.data["explanation"]
+        }
+        self.hedging.record_call((subject, difficulty), time.perf_counter() - started)
+        return question_data
     
-    async def generate_topic_for_subject(self, subject: str, difficulty: str) -> str:
+    async def _regenerate_fields(
+        self,
+        subject: str,
+        topic: str,
+        difficulty: str,
+        result: ValidationResult,
+        priority: Priority
+    ) -> ValidationResult:
         """
-        Generate a relevant topic based on the subject and difficulty level.
-        
-        Args:
-            subject: The subject area (Maths, Science, Python)
-            difficulty: The difficulty level (easy, medium, hard)
+        Ask the model to regenerate only the invalid fields of a question.
         
-        Returns:
-            A topic string
+        The valid fields are sent back as fixed context, so a single bad
+        option or answer key doesn't cost a full regeneration.
         """
-        topic_map = {
-            "Maths": {
-                "easy": ["Arithmetic", "Basic Addition", "Subtraction", "Multiplication", "Division"],
-                "medium": ["Algebra", "Geometry", "Fractions", "Percentages", "Equations"],
-                "hard": ["Calculus", "Trigonometry", "Statistics", "Advanced Algebra", "Probability"]
-            },
-            "Science": {
-                "easy": ["Biology Basics", "Chemistry Basics", "Physics Basics", "Human Body", "Plants"],
-                "medium": ["Cell Biology", "Chemical Reactions", "Forces and Motion", "Energy", "Ecosystems"],
-                "hard": ["Genetics", "Organic Chemistry", "Thermodynamics", "Quantum Physics", "Evolution"]
-            },
-            "Python": {
-                "easy": ["Variables", "Data Types", "Basic Operators", "Print Statements", "Input"],
-                "medium": ["Lists", "Loops", "Functions", "Dictionaries", "Conditionals"],
-                "hard": ["Object-Oriented Programming", "Decorators", "Generators", "Async/Await", "Design Patterns"]
-            }
+        from google.genai import types
+        
+        self.validation_stats["partial_regenerations"] += 1
+        valid = {
+            field: result.data[field] for field in REQUIRED_FIELDS
+            if field not in result.invalid_fields and field in result.data
         }
+        prompt = f"""This {difficulty} multiple-choice question about {topic} in {subject} is incomplete.
+Keep these fields exactly as they are:
+{json.dumps(valid, indent=2)}
+
+Generate ONLY these fields: {", ".join(result.invalid_fields)}.
+All four options must be distinct, non-empty and at most 15 words. correct_answer must be one of "A", "B", "C", "D".
+Respond with a JSON object containing only the requested fields."""
         
-        import random
-        topics = topic_map.get(subject, {}).get(difficulty, [f"{subject} General"])
-        return random.choice(topics)
+        response = await self._call_with_retry(
+            self.client.models.generate_content,
+            priority=priority,
+            estimated_tokens=estimate_tokens(prompt, output_tokens=200),
+            model="gemini-2.5-flash",
+            contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+            config=types.GenerateContentConfig(response_mime_type="application/json", temperature=0.4)
+        )
+        patch = extract_json(response.text if response.text else "") or {}
+        merged = dict(result.data)
+        merged.update({field: patch[field] for field in result.invalid_fields if field in patch})
+        return validate_question(merged)
     
-    async def generate_recommendations(self, prompt: str) -> str:
+    async def generate_recommendations(self, prompt: str, tenant: Optional[str] = None) -> str:
         """
         Generate personalized learning recommendations using Gemini AI.
         
         Args:
             prompt: The prompt containing performance data and request for recommendations
+            tenant: Tenant whose generation quota the call counts against
         
         Returns:
             AI-generated recommendations as text
         """
+        from google.genai import types
+        
         try:
+            quota_wait = self.tenant_quotas.try_acquire(tenant)
+            if quota_wait:
+                raise AdmissionRejected(Priority.RECOMMENDATION, quota_wait)
             response = await self._call_with_retry(
                 self.client.models.generate_content,
+                priority=Priority.RECOMMENDATION,
+                estimated_tokens=estimate_tokens(prompt, output_tokens=800),
                 model="gemini-2.5-flash",
                 contents=[
                     types.Content(role="user", parts=[types.Part(text=prompt)])
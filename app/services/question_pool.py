@@ -0,0 +1,56 @@
+import random
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+
+class QuestionPool:
+    """
+    Bounded in-memory pool of recently generated questions per (subject, difficulty).
+
+    Used as a fallback when a live model call cannot be made (admission
+    rejected, provider unavailable) and as a home for generated questions
+    that were not served.
+    """
+
+    def __init__(self, max_per_key: int = 200):
+        self.max_per_key = max_per_key
+        self._pools: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, question: Dict[str, Any]):
+        """Add a generated question; the oldest entry is evicted when the pool is full"""
+        key = (question["subject"], question["difficulty"])
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = deque(maxlen=self.max_per_key)
+            pool.append(dict(question))
+
+    def take(
+        self,
+        subject: str,
+        difficulty: str,
+        exclude: Iterable[str] = (),
+        topic: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Pick a pooled question the session has not seen, preferring the requested topic.
+
+        Returns:
+            A copy of the question, or None if no unseen question is pooled
+        """
+        excluded = set(exclude)
+        with self._lock:
+            candidates = [
+                q for q in self._pools.get((subject, difficulty), ())
+                if q["question"] not in excluded
+            ]
+        if not candidates:
+            return None
+        on_topic = [q for q in candidates if q.get("topic") == topic]
+        return dict(random.choice(on_topic or candidates))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {f"{subject}/{difficulty}": len(pool) for (subject, difficulty), pool in self._pools.items()}
@@ -0,0 +1,167 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+OPTION_FIELDS = ("option_a", "option_b", "option_c", "option_d")
+REQUIRED_FIELDS = ("question",) + OPTION_FIELDS + ("correct_answer",)
+ANSWER_LETTERS = ("A", "B", "C", "D")
+
+MAX_QUESTION_CHARS = 500
+MAX_OPTION_CHARS = 200
+MAX_OPTION_WORDS = 30
+MAX_EXPLANATION_CHARS = 600
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_OPTION_PREFIX_RE = re.compile(r"^\(?([A-Da-d])[\).:]\s+")
+# Explicit letter forms only: "B", "B)", "(B)", "B.", "Option B", "Answer: B"
+_ANSWER_RE = re.compile(r"(?:(?:OPTION|ANSWER)\s*:?\s*)?(?:\(([A-D])\)|([A-D])[\).]?)")
+
+
+def _balanced_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} span in text, honouring JSON strings"""
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Leniently extract a JSON object from model output.
+
+    Handles markdown code fences, prose around the object and trailing
+    commas. Returns None if no object can be recovered.
+    """
+    if not text:
+        return None
+    candidates = [text.strip(), _FENCE_RE.sub("", text.strip())]
+    span = _balanced_object(text)
+    if span:
+        candidates.append(span)
+    for candidate in candidates:
+        for attempt in (candidate, _TRAILING_COMMA_RE.sub(r"\1", candidate)):
+            try:
+                data = json.loads(attempt)
+            except (ValueError, TypeError):
+                continue
+            if isinstance(data, dict):
+                return data
+    return None
+
+
+class ValidationResult:
+    """Outcome of validating a question: the repaired data and the fields still invalid"""
+
+    def __init__(self, data: Dict[str, Any], invalid_fields: List[str], repairs: List[str]):
+        self.data = data
+        self.invalid_fields = invalid_fields
+        self.repairs = repairs
+
+    @property
+    def ok(self) -> bool:
+        return not self.invalid_fields
+
+
+def _normalize_answer(value: Any, data: Dict[str, Any]) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    answer = value.strip()
+    # The model sometimes repeats the option text instead of its letter; an
+    # exact match wins over letter parsing, as option text may itself start
+    # with "A " or "B "
+    for letter, field in zip(ANSWER_LETTERS, OPTION_FIELDS):
+        option = data.get(field)
+        if isinstance(option, str) and option.strip().casefold() == answer.casefold():
+            return letter
+    match = _ANSWER_RE.fullmatch(answer.upper())
+    if match:
+        return match.group(1) or match.group(2)
+    return None
+
+
+def validate_question(raw: Dict[str, Any]) -> ValidationResult:
+    """
+    Validate and, where safe, repair a generated question.
+
+    Safe repairs: whitespace trimming, stripping "A) " style prefixes from
+    options, normalizing the correct answer to a letter and truncating an
+    over-long explanation. Missing, empty, over-long or duplicate fields
+    are reported as invalid so they can be regenerated.
+    """
+    data = dict(raw)
+    invalid: List[str] = []
+    repairs: List[str] = []
+
+    for field in ("question",) + OPTION_FIELDS:
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            invalid.append(field)
+            continue
+        cleaned = value.strip()
+        if field in OPTION_FIELDS:
+            match = _OPTION_PREFIX_RE.match(cleaned)
+            if match and match.group(1).lower() == field[-1]:
+                cleaned = cleaned[match.end():].strip()
+        if cleaned != value:
+            repairs.append(f"normalized {field}")
+        data[field] = cleaned
+
+    if "question" not in invalid and len(data["question"]) > MAX_QUESTION_CHARS:
+        invalid.append("question")
+
+    seen = {}
+    for field in OPTION_FIELDS:
+        if field in invalid:
+            continue
+        option = data[field]
+        if len(option) > MAX_OPTION_CHARS or len(option.split()) > MAX_OPTION_WORDS:
+            invalid.append(field)
+            continue
+        key = option.casefold()
+        if key in seen:
+            invalid.append(field)
+        else:
+            seen[key] = field
+
+    answer = _normalize_answer(data.get("correct_answer"), data)
+    if answer is None:
+        invalid.append("correct_answer")
+    else:
+        if answer != data.get("correct_answer"):
+            repairs.append("normalized correct_answer")
+        data["correct_answer"] = answer
+        if OPTION_FIELDS[ANSWER_LETTERS.index(answer)] in invalid:
+            # The keyed option is being replaced, so the key must be regenerated with it
+            invalid.append("correct_answer")
+
+    explanation = data.get("explanation")
+    if not isinstance(explanation, str):
+        data["explanation"] = ""
+    elif len(explanation.strip()) > MAX_EXPLANATION_CHARS:
+        data["explanation"] = explanation.strip()[:MAX_EXPLANATION_CHARS].rsplit(" ", 1)[0] + "..."
+        repairs.append("truncated explanation")
+    else:
+        data["explanation"] = explanation.strip()
+
+    return ValidationResult(data, invalid, repairs)
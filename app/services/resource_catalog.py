@@ -0,0 +1,396 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+RESOURCE_KINDS = ("video", "article")
+
+RESOURCE_FIELDS = ("subject", "topic", "kind", "title", "url", "channel", "explanation", "tip")
+
+# Curated resources shipped with the app, one entry per topic
+CURATED_RESOURCES_PATH = Path(__file__).resolve().parent.parent / "resources" / "learning_resources.json"
+
+# BM25F-style field weights: a query term in the topic counts three times a
+# term in the explanation
+FIELD_WEIGHTS = {"topic": 3.0, "title": 2.0, "subject": 1.0, "explanation": 1.0}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Query terms missing from the vocabulary are matched to vocabulary terms
+# whose character trigrams overlap at least this much (Jaccard)
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_MAX_EXPANSIONS = 3
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from how in into is it its of on or the this to "
+    "what when which with you your".split()
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    id INTEGER PRIMARY KEY,
+    subject TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    channel TEXT NOT NULL DEFAULT '',
+    explanation TEXT NOT NULL DEFAULT '',
+    tip TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT 'curated',
+    created_at REAL NOT NULL,
+    UNIQUE (subject, topic, url)
+);
+"""
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith("sses"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, lightly stemmed word tokens without stopwords"""
+    return [_stem(token) for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _trigrams(term: str) -> set:
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def validate_resource(resource: Dict[str, Any]) -> Optional[str]:
+    """Why a resource cannot be catalogued, or None if it can"""
+    for field in ("subject", "topic", "title", "url"):
+        if not isinstance(resource.get(field), str) or not resource[field].strip():
+            return f"Missing {field}"
+    if resource.get("kind") not in RESOURCE_KINDS:
+        return f"kind must be one of: {', '.join(RESOURCE_KINDS)}"
+    if not resource["url"].startswith(("http://", "https://")):
+        return "url must be an http(s) URL"
+    for field in ("channel", "explanation", "tip"):
+        if resource.get(field) is not None and not isinstance(resource[field], str):
+            return f"{field} must be a string"
+    return None
+
+
+def _to_row(resource: Dict[str, Any]) -> Tuple[str, ...]:
+    error = validate_resource(resource)
+    if error:
+        raise ValueError(error)
+    return tuple((resource.get(field) or "").strip() for field in RESOURCE_FIELDS)
+
+
+class ResourceCatalog:
+    """
+    Persistent catalog of curated learning resources with a BM25 index.
+
+    Resources live in SQLite; the inverted index over their topics, titles,
+    subjects and explanations is held in memory, built from the store on
+    first use and extended as resources are added. A query touches only the
+    postings of its own terms, scored with NumPy, so its cost grows with how
+    common the query terms are rather than with the size of the catalog.
+    Query terms that are not in the vocabulary (misspellings, other word
+    forms) are expanded to the closest vocabulary terms by trigram overlap.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._docs: List[Dict[str, Any]] = []
+        self._lengths: List[float] = []
+        self._total_length = 0.0
+        self._subject_codes: Dict[str, int] = {}
+        self._doc_subjects: List[int] = []
+        self._postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._trigram_terms: Dict[str, List[str]] = {}
+        self._trigram_counts: Dict[str, int] = {}
+        # Array views of the postings and per-document columns, rebuilt only
+        # for what changed since the last query
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._columns: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._expansions: Dict[str, List[Tuple[str, float]]] = {}
+        self.searches = 0
+        self.misses = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _index(self, resource_id: int, row: Tuple[str, ...]):
+        doc = dict(zip(RESOURCE_FIELDS, row))
+        doc["id"] = resource_id
+        doc_index = len(self._docs)
+        self._docs.append(doc)
+        self._doc_subjects.append(self._subject_codes.setdefault(doc["subject"].lower(), len(self._subject_codes)))
+
+        frequencies: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(doc[field]):
+                frequencies[term] += weight
+        length = sum(frequencies.values())
+        self._lengths.append(length)
+        self._total_length += length
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = ([], [])
+                grams = _trigrams(term)
+                for gram in grams:
+                    self._trigram_terms.setdefault(gram, []).append(term)
+                self._trigram_counts[term] = len(grams)
+                self._expansions.clear()
+            postings[0].append(doc_index)
+            postings[1].append(frequency)
+            self._arrays.pop(term, None)
+        self._columns = None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        rows = self.conn.execute(
+            f"SELECT id, {', '.join(RESOURCE_FIELDS)} FROM resources ORDER BY id"
+        ).fetchall()
+        for row in rows:
+            self._index(row["id"], tuple(row[field] for field in RESOURCE_FIELDS))
+        self._loaded = True
+
+    def load(self) -> int:
+        """Build the in-memory index from the store; returns the number of resources"""
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._docs)
+
+    def add(self, resource: Dict[str, Any], source: str = "curated") -> Optional[int]:
+        """
+        Store and index a resource.
+
+        Returns:
+            The resource id, or None if the subject and topic already have this URL
+
+        Raises:
+            ValueError: If the resource is missing a field or has an unknown kind
+        """
+        row = _to_row(resource)
+        with self._lock:
+            self._ensure_loaded()
+            resource_id = self._insert(row, source)
+            self.conn.commit()
+            return resource_id
+
+    def _insert(self, row: Tuple[str, ...], source: str) -> Optional[int]:
+        cursor = self.conn.execute(
+            f"""INSERT OR IGNORE INTO resources ({', '.join(RESOURCE_FIELDS)}, source, created_at)
+                VALUES ({', '.join('?' * len(RESOURCE_FIELDS))}, ?, ?)""",
+            row + (source, time.time())
+        )
+        if not cursor.rowcount:
+            return None
+        self._index(cursor.lastrowid, row)
+        return cursor.lastrowid
+
+    def add_many(self, resources: Iterable[Dict[str, Any]], source: str = "curated") -> int:
+        """Store and index resources in one transaction; returns the number newly added"""
+        rows = [_to_row(resource) for resource in resources]
+        with self._lock:
+            self._ensure_loaded()
+            added = sum(self._insert(row, source) is not None for row in rows)
+            self.conn.commit()
+        return added
+
+    def add_topics(self, entries: Iterable[Dict[str, Any]], source: str = "curated") -> int:
+        """
+        Store topic entries shaped like the curated resources file.
+
+        Each entry has subject, topic, explanation and tip plus "videos" and
+        "articles" lists; every video and article becomes one resource that
+        carries its topic's explanation and tip.
+        """
+        resources = []
+        for entry in entries:
+            shared = {field: entry.get(field, "") for field in ("subject", "topic", "explanation", "tip")}
+            for kind, key in (("video", "videos"), ("article", "articles")):
+                for item in entry.get(key, []):
+                    resources.append({**shared, **item, "kind": kind})
+        return self.add_many(resources, source)
+
+    def load_curated(self, path: Path = CURATED_RESOURCES_PATH) -> int:
+        """Add the curated resources file; already stored resources are skipped"""
+        with open(path, encoding="utf-8") as f:
+            return self.add_topics(json.load(f))
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        if term in self._postings:
+            return [(term, 1.0)]
+        expansions = self._expansions.get(term)
+        if expansions is None:
+            grams = _trigrams(term)
+            shared: Counter = Counter()
+            for gram in grams:
+                shared.update(self._trigram_terms.get(gram, ()))
+            scored = []
+            for candidate, overlap in shared.items():
+                similarity = overlap / (len(grams) + self._trigram_counts[candidate] - overlap)
+                if similarity >= FUZZY_MIN_SIMILARITY:
+                    scored.append((candidate, similarity))
+            scored.sort(key=lambda item: (-item[1], item[0]))
+            expansions = self._expansions[term] = scored[:FUZZY_MAX_EXPANSIONS]
+        return expansions
+
+    def _postings_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            docs, frequencies = self._postings[term]
+            arrays = self._arrays[term] = (
+                np.array(docs, dtype=np.int32), np.array(frequencies, dtype=np.float32)
+            )
+        return arrays
+
+    def search(self, query: str, subject: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank resources for a free-text query, such as a weak topic.
+
+        Args:
+            query: Topic or question text; misspelled terms are matched fuzzily
+            subject: Only return resources for this subject (case-insensitive)
+            limit: Maximum number of results
+
+        Returns:
+            Resources with their id and BM25 "score", best first
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self.searches += 1
+            results = self._search(tokenize(query), subject, limit)
+            if not results:
+                self.misses += 1
+            return results
+
+    def _search(self, tokens: List[str], subject: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        count = len(self._docs)
+        if not count or not tokens or limit <= 0:
+            return []
+        subject_code = None
+        if subject is not None:
+            subject_code = self._subject_codes.get(subject.lower())
+            if subject_code is None:
+                return []
+
+        weights: Dict[str, float] = {}
+        for token in tokens:
+            for term, weight in self._expand(token):
+                weights[term] = weights.get(term, 0.0) + weight
+        if not weights:
+            return []
+
+        if self._columns is None:
+            self._columns = (
+                np.array(self._lengths, dtype=np.float32), np.array(self._doc_subjects, dtype=np.int32)
+            )
+        lengths, subjects = self._columns
+        average_length = self._total_length / count
+        scores = np.zeros(count, dtype=np.float32)
+        matched = []
+        for term, weight in weights.items():
+            docs, frequencies = self._postings_arrays(term)
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / average_length)
+            scores[docs] += weight * idf * frequencies * (BM25_K1 + 1) / (frequencies + norm)
+            matched.append(docs)
+        # Only documents in the query terms' postings can score, so candidates
+        # come from those rather than a scan of every document's score
+        hits = matched[0] if len(matched) == 1 else np.unique(np.concatenate(matched))
+        if subject_code is not None:
+            hits = hits[subjects[hits] == subject_code]
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+        ranked = sorted(hits.tolist(), key=lambda index: (-scores[index], index))
+        return [{**self._docs[index], "score": round(float(scores[index]), 4)} for index in ranked]
+
+    def topic_resources(self, topic: str, subject: Optional[str] = None,
+                        limit: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        The best-matching topic for a (possibly misspelled) topic name, with its resources.
+
+        Returns:
+            {"subject", "topic", "score", "explanation", "tip", "videos", "articles"},
+            with videos and articles ranked, or None if nothing matches
+        """
+        hits = self.search(topic, subject=subject, limit=limit)
+        if not hits:
+            return None
+        best = hits[0]
+        matched = [hit for hit in hits if (hit["subject"], hit["topic"]) == (best["subject"], best["topic"])]
+        return {
+            "subject": best["subject"],
+            "topic": best["topic"],
+            "score": best["score"],
+            "explanation": best["explanation"],
+            "tip": best["tip"],
+            "videos": [
+                {"title": hit["title"], "url": hit["url"], "channel": hit["channel"]}
+                for hit in matched if hit["kind"] == "video"
+            ],
+            "articles": [
+                {"title": hit["title"], "url": hit["url"]}
+                for hit in matched if hit["kind"] == "article"
+            ]
+        }
+
+    def resources(self) -> List[Dict[str, Any]]:
+        """Every catalogued resource, in the order it was added"""
+        with self._lock:
+            self._ensure_loaded()
+            return [dict(doc) for doc in self._docs]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM resources").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resources": len(self._docs),
+                "indexed": self._loaded,
+                "terms": len(self._postings),
+                "subjects": len(self._subject_codes),
+                "searches": self.searches,
+                "misses": self.misses
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+resource_catalog = ResourceCatalog(settings.resource_catalog_path)
@@ -0,0 +1,208 @@
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Finest to coarsest; compaction moves buckets one step along this list.
+RESOLUTION_ORDER = ["minute", "hour", "day"]
+
+RollupKey = Tuple[str, str, str, Optional[str]]
+
+
+def parse_timestamp(value: Any) -> float:
+    """Convert an attempt timestamp (ISO string in UTC, datetime or epoch) to epoch seconds"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return time.time()
+
+
+class RollupStore:
+    """
+    Time-bucketed attempt/correct counters per (subject, topic, difficulty, user).
+
+    New attempts land in minute buckets. compact() folds minute buckets
+    older than the minute retention into hour buckets, and hour buckets
+    older than the hour retention into day buckets, so memory is bounded
+    by the number of active keys per bucket rather than by raw attempts.
+    Queries only touch the buckets inside the requested range.
+    """
+
+    def __init__(
+        self,
+        minute_retention_seconds: int = 6 * 3600,
+        hour_retention_seconds: int = 30 * 86400
+    ):
+        self.retention = {
+            "minute": minute_retention_seconds,
+            "hour": hour_retention_seconds
+        }
+        self._buckets: Dict[str, Dict[int, Dict[RollupKey, List[int]]]] = {
+            resolution: {} for resolution in RESOLUTION_ORDER
+        }
+        self._starts: Dict[str, List[int]] = {resolution: [] for resolution in RESOLUTION_ORDER}
+        self._lock = threading.Lock()
+        # Stored attempts left out of the rollups because their timestamp could not be parsed
+        self.skipped_attempts = 0
+
+    def _resolution_for(self, timestamp: float, now: float) -> str:
+        # Old records (e.g. bulk imports) go straight to the bucket size
+        # they would have been compacted into.
+        age = now - timestamp
+        if age < self.retention["minute"]:
+            return "minute"
+        if age < self.retention["hour"]:
+            return "hour"
+        return "day"
+
+    def _add(self, resolution: str, start: int, key: RollupKey, attempts: int, correct: int):
+        buckets = self._buckets[resolution]
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = buckets[start] = {}
+            bisect.insort(self._starts[resolution], start)
+        counts = bucket.get(key)
+        if counts is None:
+            bucket[key] = [attempts, correct]
+        else:
+            counts[0] += attempts
+            counts[1] += correct
+
+    def record(
+        self,
+        timestamp: float,
+        subject: str,
+        topic: str,
+        difficulty: str,
+        user_id: Optional[str],
+        is_correct: bool
+    ):
+        """Count one attempt in the bucket covering its timestamp"""
+        resolution = self._resolution_for(timestamp, time.time())
+        size = RESOLUTIONS[resolution]
+        start = int(timestamp // size) * size
+        with self._lock:
+            self._add(resolution, start, (subject, topic, difficulty, user_id), 1, 1 if is_correct else 0)
+
+    def record_attempt(self, session: Optional[Dict[str, Any]], attempt: Dict[str, Any]):
+        """
+        Storage attempt listener: roll up a stored attempt.
+
+        The attempt is already stored, so one with an unparseable timestamp
+        is skipped and counted rather than failing the write.
+        """
+        if session is None:
+            return
+        try:
+            timestamp = parse_timestamp(attempt.get("timestamp"))
+        except ValueError:
+            self.skipped_attempts += 1
+            logger.warning(f"Rollups: skipping attempt with invalid timestamp {attempt.get('timestamp')!r}")
+            return
+        self.record(
+            timestamp,
+            session["subject"],
+            attempt.get("topic") or "General",
+            attempt.get("difficulty") or "easy",
+            session.get("user_id"),
+            bool(attempt.get("is_correct"))
+        )
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """
+        Fold expired fine buckets into the next coarser resolution.
+
+        Returns:
+            Number of buckets that were compacted
+        """
+        now = time.time() if now is None else now
+        compacted = 0
+        with self._lock:
+            for fine, coarse in zip(RESOLUTION_ORDER, RESOLUTION_ORDER[1:]):
+                cutoff = now - self.retention[fine]
+                starts = self._starts[fine]
+                expired = bisect.bisect_left(starts, int(cutoff // RESOLUTIONS[fine]) * RESOLUTIONS[fine])
+                coarse_size = RESOLUTIONS[coarse]
+                for start in starts[:expired]:
+                    bucket = self._buckets[fine].pop(start)
+                    coarse_start = (start // coarse_size) * coarse_size
+                    for key, (attempts, correct) in bucket.items():
+                        self._add(coarse, coarse_start, key, attempts, correct)
+                del starts[:expired]
+                compacted += expired
+        return compacted
+
+    def query(
+        self,
+        start: float,
+        end: float,
+        resolution: str = "hour",
+        subject: Optional[str] = None,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate attempts and accuracy per output bucket in [start, end).
+
+        Stored buckets coarser than the requested resolution are reported
+        at their own start time, since they cannot be split.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        size = RESOLUTIONS[resolution]
+        filters = (subject, topic, difficulty, user_id)
+        totals: Dict[int, List[int]] = {}
+
+        with self._lock:
+            for stored in RESOLUTION_ORDER:
+                starts = self._starts[stored]
+                stored_size = RESOLUTIONS[stored]
+                lo = bisect.bisect_left(starts, int(start // stored_size) * stored_size)
+                hi = bisect.bisect_left(starts, end)
+                for bucket_start in starts[lo:hi]:
+                    attempts = correct = 0
+                    for key, counts in self._buckets[stored][bucket_start].items():
+                        if all(f is None or f == k for f, k in zip(filters, key)):
+                            attempts += counts[0]
+                            correct += counts[1]
+                    if not attempts:
+                        continue
+                    out_start = (bucket_start // size) * size if stored_size <= size else bucket_start
+                    total = totals.setdefault(out_start, [0, 0])
+                    total[0] += attempts
+                    total[1] += correct
+
+        return [
+            {
+                "bucket_start": datetime.fromtimestamp(bucket_start, tz=timezone.utc).isoformat(),
+                "attempts": attempts,
+                "correct": correct,
+                "accuracy": round(correct / attempts * 100, 1)
+            }
+            for bucket_start, (attempts, correct) in sorted(totals.items())
+        ]
+
+    def bucket_counts(self) -> Dict[str, int]:
+        """Number of stored buckets per resolution"""
+        with self._lock:
+            return {resolution: len(starts) for resolution, starts in self._starts.items()}
+
+
+rollup_store = RollupStore(
+    minute_retention_seconds=settings.rollup_minute_retention_hours * 3600,
+    hour_retention_seconds=settings.rollup_hour_retention_days * 86400
+)
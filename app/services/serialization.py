@@ -0,0 +1,73 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Type, TypeVar
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.config import settings
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON bytes with orjson when installed, else the stdlib encoder"""
+    if isinstance(content, BaseModel):
+        content = content.model_dump()
+    if HAS_ORJSON:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that skips jsonable_encoder and encodes directly with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def build_model(model: Type[ModelT], **fields: Any) -> ModelT:
+    """
+    Construct a response model from server-produced fields.
+
+    With fast responses enabled the fields are trusted and validation is
+    skipped (model_construct); otherwise the model is validated as usual.
+    """
+    if settings.fast_json_responses:
+        return model.model_construct(**fields)
+    return model(**fields)
+
+
+def respond(content: Any) -> Any:
+    """
+    Return content through the fast JSON path when it is enabled.
+
+    Returning a Response directly means FastAPI neither re-validates it
+    against the route's response_model nor walks it with jsonable_encoder,
+    so large analytics payloads are encoded exactly once.
+    """
+    if settings.fast_json_responses:
+        return FastJSONResponse(content)
+    return content
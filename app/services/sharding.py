@@ -0,0 +1,203 @@
+import asyncio
+import multiprocessing
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.storage import InMemoryStorage, analytics_from_partials
+
+Call = Tuple[str, tuple]
+
+# Storage owned by a shard worker process
+_shard_storage: Optional[InMemoryStorage] = None
+
+
+def _init_shard():
+    global _shard_storage
+    _shard_storage = InMemoryStorage()
+
+
+def _shard_call(method: str, args: tuple) -> Any:
+    return getattr(_shard_storage, method)(*args)
+
+
+def _shard_batch(calls: Sequence[Call]) -> List[Any]:
+    return [getattr(_shard_storage, method)(*args) for method, args in calls]
+
+
+def shard_for(key: str, shards: int) -> int:
+    """Stable shard index for a session or user ID"""
+    return zlib.crc32(key.encode()) % shards
+
+
+class AsyncStorage:
+    """
+    Async storage interface used by the request path.
+
+    Session-scoped operations are routed by session ID and user-scoped
+    operations by user ID. Subclasses decide where a call runs.
+    """
+
+    sharded = False
+
+    async def _session_call(self, session_id: str, method: str, *args) -> Any:
+        raise NotImplementedError
+
+    async def _user_call(self, user_id: str, method: str, *args) -> Any:
+        raise NotImplementedError
+
+    async def batch(self, session_id: str, calls: Sequence[Call]) -> List[Any]:
+        """Run several session-scoped calls in order, in one round trip"""
+        raise NotImplementedError
+
+    def add_attempt_listener(self, listener: Callable[[Optional[Dict[str, Any]], Dict[str, Any]], None]):
+        raise NotImplementedError
+
+    async def create_session(self, user_id: str, subject: str, mode: str = "adaptive") -> str:
+        session_id = str(uuid.uuid4())
+        return await self._session_call(session_id, "create_session", user_id, subject, mode, session_id)
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self._session_call(session_id, "get_session", session_id)
+
+    async def update_session(self, session_id: str, updates: Dict[str, Any]):
+        return await self._session_call(session_id, "update_session", session_id, updates)
+
+    async def complete_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self._session_call(session_id, "complete_session", session_id)
+
+    async def add_attempt(self, session_id: str, attempt: Dict[str, Any]) -> Dict[str, Any]:
+        return (await self.batch(session_id, [("add_attempt", (session_id, attempt))]))[0]
+
+    async def get_attempts(self, session_id: str) -> List[Dict[str, Any]]:
+        return await self._session_call(session_id, "get_attempts", session_id)
+
+    async def get_question_history(self, session_id: str) -> List[str]:
+        return await self._session_call(session_id, "get_question_history", session_id)
+
+    async def get_current_question(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self._session_call(session_id, "get_current_question", session_id)
+
+    async def get_processed_answer(self, session_id: str, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        return await self._session_call(session_id, "get_processed_answer", session_id, idempotency_key)
+
+    async def reserve_processed_answer(
+        self, session_id: str, idempotency_key: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        return await self._session_call(session_id, "reserve_processed_answer", session_id, idempotency_key)
+
+    async def release_processed_answer(self, session_id: str, idempotency_key: str):
+        return await self._session_call(session_id, "release_processed_answer", session_id, idempotency_key)
+
+    async def record_processed_answer(self, session_id: str, idempotency_key: str, result: Dict[str, Any]):
+        return await self._session_call(session_id, "record_processed_answer", session_id, idempotency_key, result)
+
+    async def get_user_skill(self, user_id: str, subject: str, topic: str) -> Optional[Dict[str, Any]]:
+        return await self._user_call(user_id, "get_user_skill", user_id, subject, topic)
+
+    async def update_user_skill(self, user_id: str, subject: str, topic: str, mastery: float):
+        return await self._user_call(user_id, "update_user_skill", user_id, subject, topic, mastery)
+
+    async def get_topic_masteries(self, user_id: str, subject: str, topics: List[str]) -> Dict[str, float]:
+        return await self._user_call(user_id, "get_topic_masteries", user_id, subject, topics)
+
+    async def get_all_user_skills(self, user_id: str) -> List[Dict[str, Any]]:
+        return await self._user_call(user_id, "get_all_user_skills", user_id)
+
+    async def get_analytics_data(self, include_user_skills: bool = True) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class LocalStorage(AsyncStorage):
+    """AsyncStorage over the in-process storage; calls run inline"""
+
+    def __init__(self, storage: InMemoryStorage):
+        self.storage = storage
+
+    async def _session_call(self, session_id: str, method: str, *args) -> Any:
+        return getattr(self.storage, method)(*args)
+
+    async def _user_call(self, user_id: str, method: str, *args) -> Any:
+        return getattr(self.storage, method)(*args)
+
+    async def batch(self, session_id: str, calls: Sequence[Call]) -> List[Any]:
+        return [getattr(self.storage, method)(*args) for method, args in calls]
+
+    def add_attempt_listener(self, listener: Callable[[Optional[Dict[str, Any]], Dict[str, Any]], None]):
+        self.storage.add_attempt_listener(listener)
+
+    async def get_analytics_data(self, include_user_skills: bool = True) -> Dict[str, Any]:
+        return self.storage.get_analytics_data(include_user_skills=include_user_skills)
+
+
+class ShardedStorage(AsyncStorage):
+    """
+    Storage partitioned across worker processes.
+
+    Sessions are placed by a hash of the session ID and user skills by a
+    hash of the user ID, each on one of N single-process executors that
+    owns an InMemoryStorage. Calls to one shard run in submission order.
+    Analytics are scatter-gather: every shard computes partial aggregates
+    over its own data in parallel, and they are merged here.
+
+    Attempt listeners (rollups, review schedules) run in this process
+    after an attempt is stored, since their state lives here.
+    """
+
+    sharded = True
+
+    def __init__(self, shards: int):
+        context = multiprocessing.get_context("spawn")
+        self.shards = shards
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_shard)
+            for _ in range(shards)
+        ]
+        self._listeners: List[Callable[[Optional[Dict[str, Any]], Dict[str, Any]], None]] = []
+
+    async def _run(self, shard: int, func: Callable, *args) -> Any:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executors[shard], func, *args)
+
+    async def _session_call(self, session_id: str, method: str, *args) -> Any:
+        return await self._run(shard_for(session_id, self.shards), _shard_call, method, args)
+
+    async def _user_call(self, user_id: str, method: str, *args) -> Any:
+        return await self._run(shard_for(user_id, self.shards), _shard_call, method, args)
+
+    async def batch(self, session_id: str, calls: Sequence[Call]) -> List[Any]:
+        calls = list(calls)
+        notify = bool(self._listeners) and any(method == "add_attempt" for method, _ in calls)
+        if notify:
+            # Fetch the session for the listeners in the same round trip
+            calls.append(("get_session", (session_id,)))
+        results = await self._run(shard_for(session_id, self.shards), _shard_batch, calls)
+        if notify:
+            session = results.pop()
+            for (method, _), result in zip(calls, results):
+                if method == "add_attempt":
+                    for listener in self._listeners:
+                        listener(session, result)
+        return results
+
+    def add_attempt_listener(self, listener: Callable[[Optional[Dict[str, Any]], Dict[str, Any]], None]):
+        self._listeners.append(listener)
+
+    async def scatter(self, method: str, *args) -> List[Any]:
+        """Run a method on every shard concurrently"""
+        return await asyncio.gather(*(
+            self._run(shard, _shard_call, method, args) for shard in range(self.shards)
+        ))
+
+    async def get_analytics_data(self, include_user_skills: bool = True) -> Dict[str, Any]:
+        partials = await self.scatter("analytics_partials", include_user_skills)
+        return analytics_from_partials(partials, include_user_skills)
+
+    async def start(self):
+        """Start every worker process ahead of the first request"""
+        await self.scatter("get_session", "")
+
+    def close(self):
+        for executor in self._executors:
+            executor.shutdown(wait=True)
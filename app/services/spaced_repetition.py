@@ -0,0 +1,156 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.rollups import parse_timestamp
+
+DAY = 86400
+
+CardKey = Tuple[str, str, str]
+
+
+class Card:
+    """SM-2 review state of one (user, subject, topic)"""
+    __slots__ = ("ease", "interval_days", "repetitions", "due", "last_review", "version", "counted_due")
+
+    def __init__(self):
+        self.ease = 2.5
+        self.interval_days = 0.0
+        self.repetitions = 0
+        self.due = 0.0
+        self.last_review = float("-inf")
+        self.version = 0
+        self.counted_due = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ease": round(self.ease, 2),
+            "interval_days": self.interval_days,
+            "repetitions": self.repetitions,
+            "due": self.due
+        }
+
+
+class ReviewScheduler:
+    """
+    Per-user spaced-repetition schedule of topics, using SM-2.
+
+    Every stored attempt is a review of its (user, subject, topic) card. A
+    correct answer within min_review_gap of the previous review (the same
+    quiz, typically) does not lengthen the interval; a wrong answer always
+    resets it.
+
+    Due dates are kept in a min-heap per (user, subject) with lazy
+    invalidation, so the next due topic for a user is an O(log n) peek.
+    A global heap feeds a running count of due cards per user: due_counts()
+    only advances past cards that became due since the last call, and a
+    review of a counted card decrements its user's count.
+    """
+
+    def __init__(self, min_review_gap_seconds: float = 3600):
+        self.min_review_gap = min_review_gap_seconds
+        self.cards: Dict[CardKey, Card] = {}
+        self._user_heaps: Dict[Tuple[str, str], List[Tuple[float, int, int, str]]] = {}
+        self._global: List[Tuple[float, int, int, CardKey]] = []
+        self._due_counts: Dict[str, int] = {}
+        self._tiebreak = itertools.count()
+        self._lock = threading.Lock()
+
+    def review(self, user_id: str, subject: str, topic: str, is_correct: bool, reviewed_at: float):
+        """Apply one review to a card and reschedule it"""
+        key = (user_id, subject, topic)
+        with self._lock:
+            card = self.cards.get(key)
+            if card is None:
+                card = self.cards[key] = Card()
+            if is_correct and reviewed_at - card.last_review < self.min_review_gap:
+                return
+            quality = 4 if is_correct else 1
+            if quality < 3:
+                card.repetitions = 0
+                card.interval_days = 1.0
+            else:
+                card.repetitions += 1
+                if card.repetitions == 1:
+                    card.interval_days = 1.0
+                elif card.repetitions == 2:
+                    card.interval_days = 6.0
+                else:
+                    card.interval_days = round(card.interval_days * card.ease, 1)
+            card.ease = max(1.3, card.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+            card.last_review = reviewed_at
+            card.due = reviewed_at + card.interval_days * DAY
+            card.version += 1
+            if card.counted_due:
+                card.counted_due = False
+                self._due_counts[user_id] -= 1
+            tiebreak = next(self._tiebreak)
+            heapq.heappush(self._user_heaps.setdefault((user_id, subject), []), (card.due, tiebreak, card.version, topic))
+            heapq.heappush(self._global, (card.due, tiebreak, card.version, key))
+
+    def record_attempt(self, session: Optional[Dict[str, Any]], attempt: Dict[str, Any]):
+        """Storage attempt listener: treat a stored attempt as a review"""
+        if session is None or not session.get("user_id"):
+            return
+        self.review(
+            session["user_id"],
+            session["subject"],
+            attempt.get("topic") or "General",
+            bool(attempt.get("is_correct")),
+            parse_timestamp(attempt.get("timestamp"))
+        )
+
+    def _valid_head(self, user_id: str, subject: str) -> Optional[Tuple[float, str]]:
+        heap = self._user_heaps.get((user_id, subject))
+        while heap:
+            due, _, version, topic = heap[0]
+            if self.cards[(user_id, subject, topic)].version == version:
+                return due, topic
+            heapq.heappop(heap)
+        return None
+
+    def next_due_topic(self, user_id: str, subject: str, now: Optional[float] = None) -> Optional[str]:
+        """The most overdue topic for a user in a subject, or None if nothing is due"""
+        now = time.time() if now is None else now
+        with self._lock:
+            head = self._valid_head(user_id, subject)
+        if head is None or head[0] > now:
+            return None
+        return head[1]
+
+    def due_cards(self, user_id: str, now: Optional[float] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Cards due for a user across subjects, most overdue first"""
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            subjects = [subject for (user, subject) in self._user_heaps if user == user_id]
+            for subject in subjects:
+                heap = self._user_heaps[(user_id, subject)]
+                popped = []
+                while len(popped) < limit:
+                    head = self._valid_head(user_id, subject)
+                    if head is None or head[0] > now:
+                        break
+                    popped.append(heapq.heappop(heap))
+                    due.append({"subject": subject, "topic": head[1], **self.cards[(user_id, subject, head[1])].to_dict()})
+                for entry in popped:
+                    heapq.heappush(heap, entry)
+        due.sort(key=lambda card: card["due"])
+        return due[:limit]
+
+    def due_counts(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Number of due cards for every user with at least one due"""
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._global and self._global[0][0] <= now:
+                _, _, version, key = heapq.heappop(self._global)
+                card = self.cards[key]
+                if card.version == version and not card.counted_due:
+                    card.counted_due = True
+                    self._due_counts[key[0]] = self._due_counts.get(key[0], 0) + 1
+            return {user: count for user, count in self._due_counts.items() if count > 0}
+
+
+review_scheduler = ReviewScheduler()
@@ -1,7 +1,17 @@
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
 from datetime import datetime
+import time
 import uuid
 
+# Unanswered questions remembered per session, so buffered answers can be
+# graded against the question they were given for; the oldest are dropped
+MAX_ISSUED_QUESTIONS = 20
+
+# How long a completed session's idempotency keys are kept, so late retries
+# are still reported as duplicates
+PROCESSED_ANSWER_TTL_SECONDS = 24 * 3600
+
 
 class InMemoryStorage:
     """In-memory storage for sessions, attempts, and user skills"""
@@ -12,10 +22,41 @@ class InMemoryStorage:
         self.user_skills: Dict[str, Dict[str, Any]] = {}
         self.question_history: Dict[str, List[str]] = {}
         self.current_questions: Dict[str, Dict[str, Any]] = {}
+        self.issued_questions: Dict[str, List[Dict[str, Any]]] = {}
+        self.processed_answers: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Idempotency keys claimed by an answer that is being applied (not durable)
+        self.reserved_answers: Dict[str, Set[str]] = {}
+        # Completed sessions in completion order, with the time their keys expire
+        self.processed_expiry: "OrderedDict[str, float]" = OrderedDict()
+        self.sessions_by_subject: Dict[str, List[str]] = {}
+        self.attempt_listeners: List[Callable[[Optional[Dict[str, Any]], Dict[str, Any]], None]] = []
+        self.journal = None
+        # Bumped on every change, so readers can tell whether cached results are current
+        self.version = 0
+    
+    def attach_journal(self, journal):
+        """Record every state change to an event journal from now on"""
+        self.journal = journal
+    
+    def _log(self, kind: str, payload: Dict[str, Any]):
+        self.version += 1
+        if self.journal is not None:
+            self.journal.append(kind, payload)
     
-    def create_session(self, user_id: str, subject: str) -> str:
-        """Create a new assessment session"""
-        session_id = str(uuid.uuid4())
+    def add_attempt_listener(self, listener: Callable[[Optional[Dict[str, Any]], Dict[str, Any]], None]):
+        """Register a callback invoked with (session, attempt) after every stored attempt"""
+        self.attempt_listeners.append(listener)
+    
+    def _notify_attempt(self, session_id: str, attempt: Dict[str, Any]):
+        session = self.sessions.get(session_id)
+        for listener in self.attempt_listeners:
+            listener(session, attempt)
+    
+    def create_session(
+        self, user_id: str, subject: str, mode: str = "adaptive", session_id: Optional[str] = None
+    ) -> str:
+        """Create a new assessment session, with a new ID unless one is given"""
+        session_id = session_id or str(uuid.uuid4())
         self.sessions[session_id] = {
             "session_id": session_id,
             "user_id": user_id,
@@ -26,12 +67,43 @@ class InMemoryStorage:
             "correct_answers": 0,
             "current_difficulty": "easy",
             "mastery_level": 0.0,
-            "status": "active"
+            "status": "active",
+            "mode": mode
         }
         self.attempts[session_id] = []
         self.question_history[session_id] = []
+        self.sessions_by_subject.setdefault(subject, []).append(session_id)
+        self._log("session", self.sessions[session_id])
         return session_id
     
+    def import_session(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert or replace a session from an external record, keeping its ID"""
+        session_id = record["session_id"]
+        session = {
+            "session_id": session_id,
+            "user_id": record.get("user_id"),
+            "subject": record["subject"],
+            "start_time": record.get("start_time") or datetime.utcnow().isoformat(),
+            "end_time": record.get("end_time"),
+            "total_questions": record.get("total_questions") or 0,
+            "correct_answers": record.get("correct_answers") or 0,
+            "current_difficulty": record.get("current_difficulty") or "easy",
+            "mastery_level": record.get("mastery_level") or 0.0,
+            "status": record.get("status") or "completed",
+            "mode": record.get("mode") or "adaptive"
+        }
+        previous = self.sessions.get(session_id)
+        if previous is None:
+            self.sessions_by_subject.setdefault(session["subject"], []).append(session_id)
+        elif previous["subject"] != session["subject"]:
+            self.sessions_by_subject[previous["subject"]].remove(session_id)
+            self.sessions_by_subject.setdefault(session["subject"], []).append(session_id)
+        self.sessions[session_id] = session
+        self.attempts.setdefault(session_id, [])
+        self.question_history.setdefault(session_id, [])
+        self._log("session", session)
+        return session
+    
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session by ID"""
         return self.sessions.get(session_id)
@@ -40,6 +112,7 @@ class InMemoryStorage:
         """Update session data"""
         if session_id in self.sessions:
             self.sessions[session_id].update(updates)
+            self._log("session_update", {"session_id": session_id, "updates": updates})
     
     def add_attempt(self, session_id: str, attempt: Dict[str, Any]):
         """Add an attempt to a session"""
@@ -53,8 +126,28 @@ class InMemoryStorage:
             **attempt
         }
         self.attempts[session_id].append(attempt_data)
+        self._log("attempts", {"session_id": session_id, "attempts": [attempt_data]})
+        self._notify_attempt(session_id, attempt_data)
         return attempt_data
     
+    def add_attempts(self, session_id: str, attempts: List[Dict[str, Any]]):
+        """Append many attempts to a session, keeping IDs and timestamps when present"""
+        session_attempts = self.attempts.setdefault(session_id, [])
+        now = datetime.utcnow().isoformat()
+        stored = []
+        for attempt in attempts:
+            attempt_data = {
+                **attempt,
+                "attempt_id": attempt.get("attempt_id") or str(uuid.uuid4()),
+                "session_id": session_id,
+                "timestamp": attempt.get("timestamp") or now
+            }
+            session_attempts.append(attempt_data)
+            stored.append(attempt_data)
+        self._log("attempts", {"session_id": session_id, "attempts": stored})
+        for attempt_data in stored:
+            self._notify_attempt(session_id, attempt_data)
+    
     def get_attempts(self, session_id: str) -> List[Dict[str, Any]]:
         """Get all attempts for a session"""
         return self.attempts.get(session_id, [])
@@ -64,6 +157,7 @@ class InMemoryStorage:
         if session_id not in self.question_history:
             self.question_history[session_id] = []
         self.question_history[session_id].append(question)
+        self._log("history", {"session_id": session_id, "question": question})
     
     def get_question_history(self, session_id: str) -> List[str]:
         """Get question history for a session"""
@@ -72,27 +166,146 @@ class InMemoryStorage:
     def store_current_question(self, session_id: str, question_data: Dict[str, Any]):
         """Store the current question data for validation on answer submission"""
         self.current_questions[session_id] = question_data
+        issued = self.issued_questions.setdefault(session_id, [])
+        issued.append(question_data)
+        del issued[:-MAX_ISSUED_QUESTIONS]
+        self._log("current", {"session_id": session_id, "question": question_data})
     
     def get_current_question(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get the current question data for a session"""
         return self.current_questions.get(session_id)
     
-    def update_user_skill(self, user_id: str, subject: str, topic: str, mastery: float):
-        """Update user skill mastery level"""
+    def get_issued_questions(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get the unanswered questions issued to a session, oldest first"""
+        return self.issued_questions.get(session_id, [])
+    
+    def get_issued_question(self, session_id: str, question: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent unanswered question with the given text issued to a session"""
+        for question_data in reversed(self.issued_questions.get(session_id, [])):
+            if question_data["question"] == question:
+                return question_data
+        return None
+    
+    def clear_current_question(self, session_id: str, question: Optional[str] = None):
+        """
+        Forget a question once it has been answered.
+        
+        Without question text this is the current question; otherwise the
+        current question is only cleared if it is the one answered.
+        """
+        current = self.current_questions.get(session_id)
+        answered = question if question is not None else (current or {}).get("question")
+        changed = False
+        issued = self.issued_questions.get(session_id, [])
+        for index in range(len(issued) - 1, -1, -1):
+            if issued[index]["question"] == answered:
+                del issued[index]
+                changed = True
+                break
+        if current is not None and current["question"] == answered:
+            del self.current_questions[session_id]
+            changed = True
+        if changed:
+            self._log("current_clear", {"session_id": session_id, "question": question})
+    
+    def get_processed_answer(self, session_id: str, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """Get the stored result of an already-applied answer, if any"""
+        return self.processed_answers.get(session_id, {}).get(idempotency_key)
+    
+    def reserve_processed_answer(
+        self, session_id: str, idempotency_key: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Claim an idempotency key before applying its answer.
+        
+        Checking and claiming happen in one storage call, so of two
+        concurrent submissions with the same key only one can apply it.
+        
+        Returns:
+            ("reserved", None) if the caller now owns the key,
+            ("applied", result) if it was already applied, or
+            ("in_progress", None) if another submission is applying it
+        """
+        self._expire_processed()
+        result = self.get_processed_answer(session_id, idempotency_key)
+        if result is not None:
+            return "applied", result
+        reserved = self.reserved_answers.setdefault(session_id, set())
+        if idempotency_key in reserved:
+            return "in_progress", None
+        reserved.add(idempotency_key)
+        return "reserved", None
+    
+    def release_processed_answer(self, session_id: str, idempotency_key: str):
+        """Give up a reserved key whose answer could not be applied"""
+        reserved = self.reserved_answers.get(session_id)
+        if reserved is not None:
+            reserved.discard(idempotency_key)
+            if not reserved:
+                del self.reserved_answers[session_id]
+    
+    def record_processed_answer(self, session_id: str, idempotency_key: str, result: Dict[str, Any]):
+        """Remember the result of an applied answer so retries are not re-applied"""
+        self.processed_answers.setdefault(session_id, {})[idempotency_key] = result
+        self.release_processed_answer(session_id, idempotency_key)
+        self._log("processed", {"session_id": session_id, "key": idempotency_key, "result": result})
+    
+    def clear_answer_state(self, session_id: str):
+        """
+        Drop a finished session's unanswered questions.
+        
+        Its idempotency records are kept for PROCESSED_ANSWER_TTL_SECONDS,
+        so a retry arriving after completion is still a duplicate.
+        """
+        removed = [state.pop(session_id, None) for state in (self.current_questions, self.issued_questions)]
+        if session_id in self.processed_answers:
+            self.processed_expiry[session_id] = time.time() + PROCESSED_ANSWER_TTL_SECONDS
+            self.processed_expiry.move_to_end(session_id)
+        self._expire_processed()
+        if any(item is not None for item in removed) or session_id in self.processed_expiry:
+            self._log("answers_clear", {"session_id": session_id})
+    
+    def _expire_processed(self):
+        now = time.time()
+        while self.processed_expiry:
+            session_id, expires = next(iter(self.processed_expiry.items()))
+            if expires > now:
+                break
+            del self.processed_expiry[session_id]
+            self.processed_answers.pop(session_id, None)
+    
+    def update_user_skill(
+        self, user_id: str, subject: str, topic: str, mastery: float, updated_at: Optional[str] = None
+    ):
+        """Update user skill mastery level, as of updated_at (default now)"""
         skill_key = f"{user_id}_{subject}_{topic}"
         self.user_skills[skill_key] = {
             "user_id": user_id,
             "subject": subject,
             "topic": topic,
             "mastery_level": mastery,
-            "updated_at": datetime.utcnow().isoformat()
+            "updated_at": updated_at or datetime.utcnow().isoformat()
         }
+        self._log("skill", self.user_skills[skill_key])
     
     def get_user_skill(self, user_id: str, subject: str, topic: str) -> Optional[Dict[str, Any]]:
         """Get user skill data"""
         skill_key = f"{user_id}_{subject}_{topic}"
         return self.user_skills.get(skill_key)
     
+    def get_topic_masteries(self, user_id: str, subject: str, topics: List[str]) -> Dict[str, float]:
+        """Stored mastery for each of the given topics the user has a skill entry for"""
+        masteries = {}
+        for topic in topics:
+            skill = self.user_skills.get(f"{user_id}_{subject}_{topic}")
+            if skill is not None:
+                masteries[topic] = skill["mastery_level"]
+        return masteries
+    
+    def get_subject_session_ids(self, subject: str) -> List[str]:
+        """Get session IDs for a subject in creation order"""
+        return self.sessions_by_subject.get(subject, [])
+    
     def get_all_user_skills(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all skills for a user"""
         return [
@@ -105,22 +318,94 @@ class InMemoryStorage:
         if session_id in self.sessions:
             self.sessions[session_id]["status"] = "completed"
             self.sessions[session_id]["end_time"] = datetime.utcnow().isoformat()
+            self._log("session_update", {
+                "session_id": session_id,
+                "updates": {"status": "completed", "end_time": self.sessions[session_id]["end_time"]}
+            })
+            self.clear_answer_state(session_id)
             return self.sessions[session_id]
         return None
     
-    def get_analytics_data(self) -> Dict[str, Any]:
-        """Get analytics data for Power BI integration"""
-        total_sessions = len(self.sessions)
-        completed_sessions = sum(1 for s in self.sessions.values() if s["status"] == "completed")
-        total_attempts = sum(len(attempts) for attempts in self.attempts.values())
-        
-        correct_attempts = 0
-        for attempts_list in self.attempts.values():
-            correct_attempts += sum(1 for a in attempts_list if a.get("is_correct", False))
-        
-        accuracy = (correct_attempts / total_attempts * 100) if total_attempts > 0 else 0
+    def apply_event(self, kind: str, payload: Dict[str, Any]):
+        """Re-apply a journaled event; used for recovery and snapshot building"""
+        if kind == "session":
+            self.import_session(payload)
+        elif kind == "session_update":
+            self.update_session(payload["session_id"], payload["updates"])
+        elif kind == "attempts":
+            self.add_attempts(payload["session_id"], payload["attempts"])
+        elif kind == "skill":
+            self.user_skills[f"{payload['user_id']}_{payload['subject']}_{payload['topic']}"] = payload
+            self.version += 1
+        elif kind == "history":
+            self.add_question_to_history(payload["session_id"], payload["question"])
+        elif kind == "current":
+            self.store_current_question(payload["session_id"], payload["question"])
+        elif kind == "current_clear":
+            self.clear_current_question(payload["session_id"], payload.get("question"))
+        elif kind == "processed":
+            self.record_processed_answer(payload["session_id"], payload["key"], payload["result"])
+        elif kind == "answers_clear":
+            self.clear_answer_state(payload["session_id"])
+        else:
+            raise ValueError(f"Unknown journal event kind: {kind}")
+    
+    def export_state(self) -> Dict[str, Any]:
+        """The durable state, for snapshots"""
+        return {
+            "sessions": self.sessions,
+            "attempts": self.attempts,
+            "user_skills": self.user_skills,
+            "question_history": self.question_history,
+            "current_questions": self.current_questions,
+            "issued_questions": self.issued_questions,
+            "processed_answers": self.processed_answers
+        }
+    
+    def load_state(self, state: Dict[str, Any], notify: bool = True):
+        """
+        Replace the durable state with a snapshot.
         
+        With notify, attempt listeners see every loaded attempt, so derived
+        state (rollups, review schedules) is rebuilt too.
+        """
+        self.sessions = state["sessions"]
+        self.attempts = state["attempts"]
+        self.user_skills = state["user_skills"]
+        self.question_history = state["question_history"]
+        self.current_questions = state["current_questions"]
+        self.issued_questions = state["issued_questions"]
+        self.processed_answers = state["processed_answers"]
+        self.reserved_answers = {}
+        self.processed_expiry = OrderedDict()
+        expires = time.time() + PROCESSED_ANSWER_TTL_SECONDS
+        for session_id in self.processed_answers:
+            if self.sessions.get(session_id, {}).get("status") == "completed":
+                self.processed_expiry[session_id] = expires
+        self.sessions_by_subject = {}
+        for session_id, session in self.sessions.items():
+            self.sessions_by_subject.setdefault(session["subject"], []).append(session_id)
+        self.version += 1
+        if notify:
+            for session_id, attempts in self.attempts.items():
+                for attempt in attempts:
+                    self._notify_attempt(session_id, attempt)
+    
+    def snapshot(self) -> "StorageSnapshot":
+        """Point-in-time view of sessions, attempts and user skills for readers on another thread"""
+        return StorageSnapshot(self)
+    
+    def analytics_partials(self, include_user_skills: bool = True) -> Dict[str, Any]:
+        """
+        Additive analytics aggregates over this storage's data.
+
+        Partials from several storages (shards) merge into the same
+        result a single storage holding all of the data would return;
+        see analytics_from_partials.
+        """
         subject_performance = {}
+        total_attempts = 0
+        correct_attempts = 0
         for session in self.sessions.values():
             subject = session["subject"]
             if subject not in subject_performance:
@@ -132,30 +417,102 @@ class InMemoryStorage:
                 }
             subject_performance[subject]["total_sessions"] += 1
             
-            session_attempts = self.attempts.get(session["session_id"], [])
+            session_attempts = self.get_attempts(session["session_id"])
+            correct = sum(1 for a in session_attempts if a.get("is_correct", False))
             subject_performance[subject]["total_attempts"] += len(session_attempts)
-            subject_performance[subject]["correct_attempts"] += sum(
-                1 for a in session_attempts if a.get("is_correct", False)
-            )
-        
-        for subject_data in subject_performance.values():
-            if subject_data["total_attempts"] > 0:
-                subject_data["accuracy"] = (
-                    subject_data["correct_attempts"] / subject_data["total_attempts"] * 100
-                )
-            else:
-                subject_data["accuracy"] = 0
+            subject_performance[subject]["correct_attempts"] += correct
+            total_attempts += len(session_attempts)
+            correct_attempts += correct
         
-        return {
-            "overview": {
-                "total_sessions": total_sessions,
-                "completed_sessions": completed_sessions,
-                "total_attempts": total_attempts,
-                "overall_accuracy": round(accuracy, 2)
-            },
-            "subject_performance": list(subject_performance.values()),
-            "user_skills": list(self.user_skills.values())
+        partial = {
+            "total_sessions": len(self.sessions),
+            "completed_sessions": sum(1 for s in self.sessions.values() if s["status"] == "completed"),
+            "total_attempts": total_attempts,
+            "correct_attempts": correct_attempts,
+            "subject_performance": subject_performance
+        }
+        if include_user_skills:
+            partial["user_skills"] = list(self.user_skills.values())
+        return partial
+    
+    def get_analytics_data(self, include_user_skills: bool = True) -> Dict[str, Any]:
+        """Get analytics data for Power BI integration"""
+        return analytics_from_partials([self.analytics_partials(include_user_skills)], include_user_skills)
+
+
+class StorageSnapshot(InMemoryStorage):
+    """
+    Read-only view of a storage as of its current version.
+    
+    Only the top-level containers are copied, each in a single call that
+    the GIL makes atomic, so taking a snapshot is cheap and safe while the
+    event loop keeps writing. Attempt lists are shared but append-only;
+    the snapshot remembers their lengths and only returns that prefix.
+    Session records are shared too, so a field updated after the snapshot
+    was taken can show through; version is read first, so such a view is
+    never older than the version it reports.
+    
+    The subject index is copied before the sessions: sessions are never
+    removed, so every indexed ID is then present in the copied sessions,
+    while a session created between the copies is simply not indexed.
+    """
+    
+    def __init__(self, source: InMemoryStorage):
+        super().__init__()
+        self.version = source.version
+        self.sessions_by_subject = {
+            subject: list(session_ids) for subject, session_ids in dict(source.sessions_by_subject).items()
         }
+        self.sessions = dict(source.sessions)
+        self.user_skills = dict(source.user_skills)
+        self.attempts = dict(source.attempts)
+        self.attempt_counts = {session_id: len(attempts) for session_id, attempts in self.attempts.items()}
+    
+    def get_attempts(self, session_id: str) -> List[Dict[str, Any]]:
+        return self.attempts.get(session_id, [])[:self.attempt_counts.get(session_id, 0)]
+
+
+def analytics_from_partials(partials: List[Dict[str, Any]], include_user_skills: bool = True) -> Dict[str, Any]:
+    """Merge per-storage analytics partials into the Power BI analytics payload"""
+    total_sessions = sum(p["total_sessions"] for p in partials)
+    completed_sessions = sum(p["completed_sessions"] for p in partials)
+    total_attempts = sum(p["total_attempts"] for p in partials)
+    correct_attempts = sum(p["correct_attempts"] for p in partials)
+    accuracy = (correct_attempts / total_attempts * 100) if total_attempts > 0 else 0
+    
+    subject_performance: Dict[str, Dict[str, Any]] = {}
+    for partial in partials:
+        for subject, data in partial["subject_performance"].items():
+            merged = subject_performance.setdefault(subject, {
+                "subject": subject,
+                "total_sessions": 0,
+                "total_attempts": 0,
+                "correct_attempts": 0
+            })
+            merged["total_sessions"] += data["total_sessions"]
+            merged["total_attempts"] += data["total_attempts"]
+            merged["correct_attempts"] += data["correct_attempts"]
+    
+    for subject_data in subject_performance.values():
+        if subject_data["total_attempts"] > 0:
+            subject_data["accuracy"] = (
+                subject_data["correct_attempts"] / subject_data["total_attempts"] * 100
+            )
+        else:
+            subject_data["accuracy"] = 0
+    
+    analytics = {
+        "overview": {
+            "total_sessions": total_sessions,
+            "completed_sessions": completed_sessions,
+            "total_attempts": total_attempts,
+            "overall_accuracy": round(accuracy, 2)
+        },
+        "subject_performance": list(subject_performance.values())
+    }
+    if include_user_skills:
+        analytics["user_skills"] = [skill for p in partials for skill in p["user_skills"]]
+    return analytics
 
 
 storage = InMemoryStorage()
@@ -0,0 +1,104 @@
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from app.config import settings
+from app.services.analytics import AnalyticsExecutor
+from app.services.journal import EventJournal
+from app.services.rollups import RollupStore
+from app.services.sharding import AsyncStorage, LocalStorage
+from app.services.spaced_repetition import ReviewScheduler
+from app.services.storage import InMemoryStorage
+
+DEFAULT_TENANT = "default"
+
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class Tenant:
+    """
+    One tenant's partition of the quiz data.
+
+    Each tenant has its own storage, so its session and subject indexes,
+    user skills and analytics aggregates only ever hold its own data, and
+    its own attempt rollups, review queues, journal and analytics executor
+    (worker thread and result cache). A query for one tenant never scans,
+    invalidates or queues behind another tenant's data.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        storage: InMemoryStorage,
+        store: AsyncStorage,
+        rollups: RollupStore,
+        reviews: ReviewScheduler,
+        analytics: AnalyticsExecutor,
+        journal: Optional[EventJournal] = None
+    ):
+        if not TENANT_ID_PATTERN.match(tenant_id):
+            raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+        self.tenant_id = tenant_id
+        self.storage = storage
+        self.store = store
+        self.rollups = rollups
+        self.reviews = reviews
+        self.analytics = analytics
+        self.journal = journal
+        store.add_attempt_listener(rollups.record_attempt)
+        store.add_attempt_listener(reviews.record_attempt)
+
+    @classmethod
+    def create(cls, tenant_id: str) -> "Tenant":
+        """A new, empty in-process partition configured from settings"""
+        storage = InMemoryStorage()
+        journal = None
+        if settings.journal_enabled:
+            journal = EventJournal(
+                str(Path(settings.journal_dir) / "tenants" / tenant_id),
+                fsync_interval=settings.journal_fsync_interval_ms / 1000
+            )
+        return cls(
+            tenant_id,
+            storage,
+            LocalStorage(storage),
+            RollupStore(
+                minute_retention_seconds=settings.rollup_minute_retention_hours * 3600,
+                hour_retention_seconds=settings.rollup_hour_retention_days * 86400
+            ),
+            ReviewScheduler(),
+            AnalyticsExecutor(storage),
+            journal
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.storage.sessions),
+            "sharded": self.store.sharded,
+            "journal": self.journal is not None,
+            "analytics": self.analytics.stats()
+        }
+
+
+class TenantRegistry:
+    """The configured tenants by id; requests that name no tenant use the default one"""
+
+    def __init__(self, default: Tenant):
+        self.default = default
+        self._tenants: Dict[str, Tenant] = {default.tenant_id: default}
+
+    def add(self, tenant: Tenant):
+        if tenant.tenant_id in self._tenants:
+            raise ValueError(f"Duplicate tenant id: {tenant.tenant_id}")
+        self._tenants[tenant.tenant_id] = tenant
+
+    def get(self, tenant_id: Optional[str]) -> Optional[Tenant]:
+        if not tenant_id:
+            return self.default
+        return self._tenants.get(tenant_id)
+
+    def __iter__(self) -> Iterator[Tenant]:
+        return iter(list(self._tenants.values()))
+
+    def __len__(self) -> int:
+        return len(self._tenants)
@@ -0,0 +1,69 @@
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+STRATEGIES = ("fixed", "confidence")
+
+
+class TerminationPolicy:
+    """
+    When an assessment should stop.
+
+    "fixed" stops after max_questions. "confidence" also stops once at
+    least min_questions have been answered and the ability standard error
+    (IRT when the subject is calibrated, difficulty buckets otherwise) is
+    at or below max_ability_se; None disables it.
+
+    BKT mastery is a point estimate without a posterior spread, so it is
+    not used as a stopping criterion.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "fixed",
+        max_questions: int = 15,
+        min_questions: int = 5,
+        max_ability_se: Optional[float] = 0.6
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown termination strategy: {strategy}")
+        self.strategy = strategy
+        self.max_questions = max_questions
+        self.min_questions = min(min_questions, max_questions)
+        self.max_ability_se = max_ability_se
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TerminationPolicy":
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "max_questions": self.max_questions,
+            "min_questions": self.min_questions,
+            "max_ability_se": self.max_ability_se
+        }
+
+    def stop_reason(self, answered: int, ability_se: Optional[float] = None) -> Optional[str]:
+        """
+        Decide whether to stop after `answered` questions.
+
+        Returns:
+            "max_questions" or "ability_converged" if the assessment should
+            stop, otherwise None
+        """
+        if answered >= self.max_questions:
+            return "max_questions"
+        if self.strategy != "confidence" or answered < self.min_questions:
+            return None
+        if self.max_ability_se is not None and ability_se is not None and ability_se <= self.max_ability_se:
+            return "ability_converged"
+        return None
+
+
+def policy_for(subject: str) -> TerminationPolicy:
+    """The configured policy for a subject, or fixed-length at the default quiz length"""
+    configured = settings.termination_policies.get(subject)
+    if configured:
+        return TerminationPolicy.from_dict(configured)
+    return TerminationPolicy(max_questions=settings.default_quiz_length)
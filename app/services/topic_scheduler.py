@@ -0,0 +1,228 @@
+import heapq
+import itertools
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.bkt_model import bkt_model
+
+TOPIC_CATALOG: Dict[str, Dict[str, List[str]]] = {
+    "Maths": {
+        "easy": ["Arithmetic", "Basic Addition", "Subtraction", "Multiplication", "Division"],
+        "medium": ["Algebra", "Geometry", "Fractions", "Percentages", "Equations"],
+        "hard": ["Calculus", "Trigonometry", "Statistics", "Advanced Algebra", "Probability"]
+    },
+    "Science": {
+        "easy": ["Biology Basics", "Chemistry Basics", "Physics Basics", "Human Body", "Plants"],
+        "medium": ["Cell Biology", "Chemical Reactions", "Forces and Motion", "Energy", "Ecosystems"],
+        "hard": ["Genetics", "Organic Chemistry", "Thermodynamics", "Quantum Physics", "Evolution"]
+    },
+    "Python": {
+        "easy": ["Variables", "Data Types", "Basic Operators", "Print Statements", "Input"],
+        "medium": ["Lists", "Loops", "Functions", "Dictionaries", "Conditionals"],
+        "hard": ["Object-Oriented Programming", "Decorators", "Generators", "Async/Await", "Design Patterns"]
+    }
+}
+
+
+class TopicState:
+    __slots__ = ("mastery", "last_seen", "seen", "version")
+
+    def __init__(self, mastery: float):
+        self.mastery = mastery
+        self.last_seen = -1
+        self.seen = 0
+        self.version = 0
+
+
+class SessionSchedule:
+    """
+    Per-session priority queues of topics, one heap per difficulty bucket.
+
+    A topic's score is linear in its mastery, the step it was last seen and
+    how often it has been asked. Because "steps since last seen" only
+    differs between topics by their last_seen step, ordering by last_seen
+    is equivalent and scores never need recomputing as time passes; an
+    answer changes one topic's score, which is a single heap push. Stale
+    heap entries are skipped lazily by version.
+    """
+
+    def __init__(self, weights: Tuple[float, float, float]):
+        self.weights = weights
+        self.step = 0
+        self.topics: Dict[Tuple[str, str], TopicState] = {}
+        self.heaps: Dict[str, List[Tuple[float, int, int, str]]] = {}
+        self._tiebreak = itertools.count()
+
+    def _score(self, state: TopicState) -> float:
+        mastery_weight, recency_weight, coverage_weight = self.weights
+        return mastery_weight * state.mastery + recency_weight * state.last_seen + coverage_weight * state.seen
+
+    def _push(self, topic: str, difficulty: str, state: TopicState):
+        heapq.heappush(
+            self.heaps.setdefault(difficulty, []),
+            (self._score(state), next(self._tiebreak), state.version, topic)
+        )
+
+    def add(self, topic: str, difficulty: str, mastery: float):
+        state = TopicState(mastery)
+        self.topics[(topic, difficulty)] = state
+        self._push(topic, difficulty, state)
+
+    def peek(self, difficulty: str) -> Optional[str]:
+        heap = self.heaps.get(difficulty)
+        while heap:
+            _, _, version, topic = heap[0]
+            if self.topics[(topic, difficulty)].version == version:
+                return topic
+            heapq.heappop(heap)
+        return None
+
+    def update(self, topic: str, difficulty: str, is_correct: bool):
+        state = self.topics.get((topic, difficulty))
+        if state is None:
+            # Topics outside the catalog (e.g. from banked questions) join the schedule
+            self.add(topic, difficulty, 0.0)
+            state = self.topics[(topic, difficulty)]
+        state.mastery = bkt_model.update_mastery(state.mastery, is_correct)
+        state.last_seen = self.step
+        state.seen += 1
+        state.version += 1
+        self.step += 1
+        self._push(topic, difficulty, state)
+
+    def predict(self, topic: str, difficulty: str, is_correct: bool, next_difficulty: str) -> Optional[str]:
+        """Topic peek(next_difficulty) would return after update(topic, difficulty, is_correct), without applying it"""
+        if next_difficulty != difficulty:
+            return self.peek(next_difficulty)
+        state = self.topics.get((topic, difficulty)) or TopicState(0.0)
+        mastery_weight, recency_weight, coverage_weight = self.weights
+        # The re-pushed entry would get the newest tiebreak, so it loses ties
+        best = (
+            mastery_weight * bkt_model.update_mastery(state.mastery, is_correct)
+            + recency_weight * self.step + coverage_weight * (state.seen + 1),
+            math.inf,
+            topic
+        )
+        for score, tiebreak, version, other in self.heaps.get(difficulty, ()):
+            if other != topic and self.topics[(other, difficulty)].version == version:
+                best = min(best, (score, tiebreak, other))
+        return best[2]
+
+
+class TopicScheduler:
+    """
+    Chooses the next topic for a session from the weakest, least recently
+    seen and least covered topics in the current difficulty bucket.
+
+    Schedules are built on a session's first question from the topic
+    catalog, seeded with the user's stored per-topic mastery, and updated
+    in O(log n) on every answer. At most max_sessions schedules are kept;
+    the least recently used are dropped first, so sessions that are never
+    completed do not accumulate. A dropped session that comes back gets a
+    fresh schedule seeded from stored mastery.
+    """
+
+    def __init__(
+        self,
+        catalog: Dict[str, Dict[str, List[str]]],
+        mastery_weight: float = 10.0,
+        recency_weight: float = 1.0,
+        coverage_weight: float = 3.0,
+        max_sessions: int = 10_000
+    ):
+        self.catalog = catalog
+        self.weights = (mastery_weight, recency_weight, coverage_weight)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, SessionSchedule]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _schedule(self, session_id: str, subject: str,
+                  mastery_lookup: Optional[Callable[[str], Optional[float]]]) -> SessionSchedule:
+        schedule = self._sessions.get(session_id)
+        if schedule is None:
+            schedule = SessionSchedule(self.weights)
+            for difficulty, topics in self.catalog.get(subject, {}).items():
+                for topic in topics:
+                    mastery = mastery_lookup(topic) if mastery_lookup else None
+                    schedule.add(topic, difficulty, mastery or 0.0)
+            self._sessions[session_id] = schedule
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return schedule
+
+    def next_topic(
+        self,
+        session_id: str,
+        subject: str,
+        difficulty: str,
+        mastery_lookup: Optional[Callable[[str], Optional[float]]] = None
+    ) -> str:
+        """
+        Topic to ask next in the given difficulty bucket.
+
+        Args:
+            session_id: The assessment session
+            subject: The session's subject
+            difficulty: The current difficulty bucket
+            mastery_lookup: Returns the user's stored mastery for a topic, used
+                to seed a new schedule
+
+        Returns:
+            The highest-priority topic, or "<subject> General" if the bucket has none
+        """
+        with self._lock:
+            topic = self._schedule(session_id, subject, mastery_lookup).peek(difficulty)
+        return topic or f"{subject} General"
+
+    def predict_topic(
+        self,
+        session_id: str,
+        subject: str,
+        topic: str,
+        difficulty: str,
+        is_correct: bool,
+        next_difficulty: str
+    ) -> Optional[str]:
+        """
+        Topic next_topic() would return once the given answer is recorded.
+
+        Returns None if the session has no schedule yet.
+        """
+        with self._lock:
+            schedule = self._sessions.get(session_id)
+            if schedule is None:
+                return None
+            predicted = schedule.predict(topic, difficulty, is_correct, next_difficulty)
+        return predicted or f"{subject} General"
+
+    def topics(self, subject: str) -> List[str]:
+        """Every catalog topic for a subject, across difficulty buckets"""
+        return [topic for topics in self.catalog.get(subject, {}).values() for topic in topics]
+
+    def has_schedule(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def record_answer(self, session_id: str, topic: str, difficulty: str, is_correct: bool):
+        with self._lock:
+            schedule = self._sessions.get(session_id)
+            if schedule is not None:
+                self._sessions.move_to_end(session_id)
+                schedule.update(topic, difficulty, is_correct)
+
+    def topic_mastery(self, session_id: str) -> Dict[str, float]:
+        """Current per-topic mastery of a session's schedule"""
+        schedule = self._sessions.get(session_id)
+        if schedule is None:
+            return {}
+        return {topic: state.mastery for (topic, _), state in schedule.topics.items()}
+
+    def end_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+topic_scheduler = TopicScheduler(TOPIC_CATALOG)
@@ -0,0 +1,477 @@
+import json
+import logging
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.services.resource_catalog import tokenize
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sentence_transformers import SentenceTransformer
+    HAS_SENTENCE_TRANSFORMERS = True
+except ImportError:
+    HAS_SENTENCE_TRANSFORMERS = False
+
+CHUNK_WORDS = 80
+CHUNK_OVERLAP = 20
+
+# Exact search scores the matrix in blocks of this many rows, so a query
+# batch never materialises more than one block of scores at a time
+SEARCH_BLOCK_ROWS = 65536
+
+MIN_CAPACITY_ROWS = 1024
+
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split text into windows of at most max_words words that overlap by `overlap` words"""
+    words = text.split()
+    if len(words) <= max_words:
+        return [" ".join(words)] if words else []
+    step = max_words - overlap
+    return [" ".join(words[start:start + max_words]) for start in range(0, len(words) - overlap, step)]
+
+
+class HashedEmbedder:
+    """
+    Signed feature hashing of word unigrams and bigrams with sublinear
+    term frequency, L2-normalised.
+
+    Needs no model or vocabulary, so vectors never go stale as the corpus
+    grows; the index applies inverse document frequencies to queries.
+    """
+
+    sparse = True
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashed-tfidf-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = Counter(tokens)
+            features.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+            for feature, count in features.items():
+                digest = zlib.crc32(feature.encode())
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign * (1 + math.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    """A local sentence-transformers model run on the CPU, with normalised embeddings"""
+
+    sparse = False
+
+    def __init__(self, model_name: str):
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = model_name
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return self.model.encode(
+            list(texts), batch_size=64, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+def load_embedder(model_name: str = "", dim: int = 512):
+    """The named local model if it can be loaded, otherwise hashed TF-IDF vectors"""
+    if model_name:
+        if not HAS_SENTENCE_TRANSFORMERS:
+            logger.warning(f"sentence-transformers is not installed; using hashed TF-IDF instead of {model_name}")
+        else:
+            try:
+                return SentenceTransformerEmbedder(model_name)
+            except Exception as e:
+                logger.warning(f"Could not load embedding model {model_name}, using hashed TF-IDF: {e}")
+    return HashedEmbedder(dim)
+
+
+class VectorIndex:
+    """
+    Embedded text chunks with exact or IVF top-k search.
+
+    Vectors are rows of a float32 matrix. On disk the matrix is a
+    memory-mapped file that grows by doubling, with one JSON line of chunk
+    metadata per row and a meta file whose row count is the commit point,
+    so adding documents appends rows instead of rebuilding the index and a
+    crash mid-add leaves the previous state. Without a directory everything
+    stays in memory.
+
+    Exact search multiplies a batch of query vectors against the matrix
+    block by block. Once trained (train_ivf), an inverted-file index
+    clusters the rows, and a query only scores the rows of its closest
+    clusters; new rows join their nearest cluster as they are added. IVF
+    recall depends on the vectors clustering by topic, which model
+    embeddings do far better than hashed ones.
+    """
+
+    def __init__(self, directory: Optional[str] = None, model_name: str = "", dim: int = 512):
+        self.directory = Path(directory) if directory else None
+        self.model_name = model_name
+        self.dim = dim
+        self._embedder = None
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.count = 0
+        self._matrix: Optional[np.ndarray] = None
+        self.chunks: List[Dict[str, Any]] = []
+        self._doc_ids = set()
+        self._document_frequency: Optional[np.ndarray] = None
+        self._subject_codes: Dict[str, int] = {}
+        self._chunk_subjects: List[int] = []
+        self._subject_array: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self.searches = 0
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = load_embedder(self.model_name, self.dim)
+            self.dim = self._embedder.dim
+        return self._embedder
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        embedder = self.embedder
+        self._document_frequency = np.zeros(self.dim, dtype=np.float64)
+        if self.directory is None:
+            self._matrix = np.zeros((MIN_CAPACITY_ROWS, self.dim), dtype=np.float32)
+            self._loaded = True
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {}
+        if self._path("meta.json").exists():
+            meta = json.loads(self._path("meta.json").read_text())
+        if meta and (meta.get("embedder") != embedder.name or meta.get("dim") != self.dim):
+            logger.warning(
+                f"Vector index at {self.directory} was built with {meta.get('embedder')}; "
+                f"rebuilding for {embedder.name}"
+            )
+            meta = {}
+        count = meta.get("count", 0)
+        if not meta:
+            for name in ("vectors.f32", "chunks.jsonl", "centroids.npy"):
+                self._path(name).unlink(missing_ok=True)
+
+        chunks = []
+        self._path("chunks.jsonl").touch()
+        with open(self._path("chunks.jsonl"), "rb+") as f:
+            while len(chunks) < count:
+                line = f.readline()
+                if not line:
+                    break
+                chunks.append(json.loads(line))
+            # Metadata written after the last committed count belongs to an
+            # interrupted add
+            f.truncate(f.tell())
+        count = len(chunks)
+
+        self._open_matrix(max(count, MIN_CAPACITY_ROWS))
+        self.count = count
+        for chunk in chunks:
+            self._track(chunk)
+        if count:
+            self._document_frequency += np.count_nonzero(self._matrix[:count], axis=0)
+        if self._path("centroids.npy").exists():
+            centroids = np.load(self._path("centroids.npy"))
+            if centroids.shape[1] == self.dim:
+                self._set_centroids(centroids)
+        self._loaded = True
+
+    def _open_matrix(self, rows: int):
+        path = self._path("vectors.f32")
+        size = rows * self.dim * 4
+        if not path.exists() or path.stat().st_size < size:
+            with open(path, "ab") as f:
+                f.truncate(size)
+        capacity = path.stat().st_size // (self.dim * 4)
+        self._matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _reserve(self, rows: int):
+        capacity = len(self._matrix)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2)
+        if self.directory is None:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[:self.count] = self._matrix[:self.count]
+            self._matrix = grown
+        else:
+            self._matrix.flush()
+            self._matrix = None
+            self._open_matrix(capacity)
+
+    def _track(self, chunk: Dict[str, Any]):
+        self.chunks.append(chunk)
+        self._doc_ids.add(chunk["doc_id"])
+        subject = (chunk.get("subject") or "").lower()
+        self._chunk_subjects.append(self._subject_codes.setdefault(subject, len(self._subject_codes)))
+        self._subject_array = None
+
+    def _write_meta(self):
+        meta = {"embedder": self.embedder.name, "dim": self.dim, "count": self.count}
+        temporary = self._path("meta.json.tmp")
+        temporary.write_text(json.dumps(meta))
+        os.replace(temporary, self._path("meta.json"))
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Chunk, embed and append documents not already in the index.
+
+        Each document has an "id" and "text"; any other fields (subject,
+        topic, title, url) are copied onto its chunks.
+
+        Returns:
+            The number of chunks added
+        """
+        with self._lock:
+            self._ensure_loaded()
+            chunks = []
+            seen = set(self._doc_ids)
+            for document in documents:
+                if document["id"] in seen:
+                    continue
+                seen.add(document["id"])
+                fields = {key: value for key, value in document.items() if key not in ("id", "text")}
+                for number, text in enumerate(chunk_text(document["text"])):
+                    chunks.append({**fields, "doc_id": document["id"], "chunk": number, "text": text})
+            if not chunks:
+                return 0
+
+            vectors = self.embedder.embed([chunk["text"] for chunk in chunks])
+            start = self.count
+            self._reserve(start + len(chunks))
+            self._matrix[start:start + len(chunks)] = vectors
+            if self.directory is not None:
+                self._matrix.flush()
+                with open(self._path("chunks.jsonl"), "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(chunk) + "\n" for chunk in chunks)
+            for chunk in chunks:
+                self._track(chunk)
+            self._document_frequency += np.count_nonzero(vectors, axis=0)
+            if self._centroids is not None:
+                self._assign(start, start + len(chunks))
+            self.count += len(chunks)
+            if self.directory is not None:
+                self._write_meta()
+            return len(chunks)
+
+    def _embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        vectors = self.embedder.embed(queries)
+        if self.embedder.sparse and self.count:
+            idf = np.log((1 + self.count) / (1 + self._document_frequency)) + 1
+            vectors *= (idf * idf).astype(np.float32)
+        return vectors
+
+    def _subject_mask(self, subject: Optional[str], start: int, end: int) -> Optional[np.ndarray]:
+        if subject is None:
+            return None
+        if self._subject_array is None:
+            self._subject_array = np.array(self._chunk_subjects, dtype=np.int32)
+        return self._subject_array[start:end] != self._subject_codes.get(subject.lower(), -1)
+
+    def search(self, query: str, k: int = 4, subject: Optional[str] = None,
+               probes: int = 8) -> List[Dict[str, Any]]:
+        """The k chunks most similar to the query, best first, each with a "score" """
+        return self.search_many([query], k, subject, probes)[0]
+
+    def search_many(self, queries: Sequence[str], k: int = 4, subject: Optional[str] = None,
+                    probes: int = 8) -> List[List[Dict[str, Any]]]:
+        """
+        Top-k chunks for each of a batch of queries.
+
+        Args:
+            queries: Query texts, embedded and scored together
+            k: Results per query
+            subject: Only return chunks for this subject (case-insensitive)
+            probes: Clusters scored per query once an IVF index is trained
+
+        Returns:
+            One list of chunks per query, each chunk with its similarity "score"
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self.searches += len(queries)
+            if not self.count or not queries or k <= 0:
+                return [[] for _ in queries]
+            vectors = self._embed_queries(queries)
+            if self._centroids is None:
+                ids, scores = self._exact(vectors, k, subject)
+            else:
+                ids, scores = self._probe(vectors, k, subject, probes)
+            return [
+                [{**self.chunks[i], "score": round(float(s), 4)} for i, s in zip(row_ids, row_scores)
+                 if s > 0 and np.isfinite(s)]
+                for row_ids, row_scores in zip(ids, scores)
+            ]
+
+    def _exact(self, vectors: np.ndarray, k: int, subject: Optional[str]):
+        best_ids = np.zeros((len(vectors), 0), dtype=np.int64)
+        best_scores = np.zeros((len(vectors), 0), dtype=np.float32)
+        for start in range(0, self.count, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, self.count)
+            scores = vectors @ self._matrix[start:end].T
+            mask = self._subject_mask(subject, start, end)
+            if mask is not None:
+                scores[:, mask] = -np.inf
+            ids = np.broadcast_to(np.arange(start, end), scores.shape)
+            best_ids, best_scores = _top_k(
+                np.concatenate([best_ids, ids], axis=1), np.concatenate([best_scores, scores], axis=1), k
+            )
+        return best_ids, best_scores
+
+    def _probe(self, vectors: np.ndarray, k: int, subject: Optional[str], probes: int):
+        nearest = np.argsort(-(vectors @ self._centroids.T), axis=1)[:, :probes]
+        results_ids, results_scores = [], []
+        for vector, clusters in zip(vectors, nearest):
+            candidates = np.concatenate([self._list_array(cluster) for cluster in clusters])
+            if subject is not None:
+                if self._subject_array is None:
+                    self._subject_array = np.array(self._chunk_subjects, dtype=np.int32)
+                candidates = candidates[self._subject_array[candidates] == self._subject_codes.get(subject.lower(), -1)]
+            scores = self._matrix[candidates] @ vector
+            ids, top = _top_k(candidates[None, :], scores[None, :], k)
+            results_ids.append(ids[0])
+            results_scores.append(top[0])
+        return results_ids, results_scores
+
+    def _list_array(self, cluster: int) -> np.ndarray:
+        array = self._list_arrays.get(cluster)
+        if array is None:
+            array = self._list_arrays[cluster] = np.array(self._lists[cluster], dtype=np.int64)
+        return array
+
+    def _assign(self, start: int, end: int):
+        for block in range(start, end, SEARCH_BLOCK_ROWS):
+            rows = self._matrix[block:min(block + SEARCH_BLOCK_ROWS, end)]
+            for offset, cluster in enumerate(np.argmax(rows @ self._centroids.T, axis=1).tolist()):
+                self._lists[cluster].append(block + offset)
+                self._list_arrays.pop(cluster, None)
+
+    def _set_centroids(self, centroids: np.ndarray):
+        self._centroids = centroids.astype(np.float32)
+        self._lists = [[] for _ in range(len(centroids))]
+        self._list_arrays = {}
+        self._assign(0, self.count)
+
+    def train_ivf(self, lists: Optional[int] = None, iterations: int = 10,
+                  sample: int = 50_000, seed: int = 0) -> int:
+        """
+        Cluster the vectors (spherical k-means on a sample) and switch search to IVF probing.
+
+        Returns:
+            The number of clusters, about the square root of the row count by default
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if not self.count:
+                return 0
+            lists = min(lists or max(1, int(math.sqrt(self.count))), self.count)
+            rng = np.random.default_rng(seed)
+            rows = self._matrix[np.sort(rng.choice(self.count, min(sample, self.count), replace=False))]
+            centroids = rows[rng.choice(len(rows), lists, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(rows @ centroids.T, axis=1)
+                for cluster in range(lists):
+                    members = rows[assignment == cluster]
+                    centroids[cluster] = members.sum(axis=0) if len(members) else rows[rng.integers(len(rows))]
+                norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+                np.divide(centroids, norms, out=centroids, where=norms > 0)
+            self._set_centroids(centroids)
+            if self.directory is not None:
+                np.save(self._path("centroids.npy"), self._centroids)
+            return lists
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "embedder": self._embedder.name if self._embedder is not None else None,
+                "dim": self.dim,
+                "chunks": self.count,
+                "documents": len(self._doc_ids),
+                "ivf_lists": len(self._lists) if self._centroids is not None else 0,
+                "searches": self.searches
+            }
+
+    def close(self):
+        with self._lock:
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            self._matrix = None
+            self._loaded = False
+            self.count = 0
+            self.chunks = []
+            self._doc_ids = set()
+            self._chunk_subjects = []
+            self._subject_codes = {}
+            self._subject_array = None
+            self._centroids = None
+            self._lists = []
+            self._list_arrays = {}
+
+
+def _top_k(ids: np.ndarray, scores: np.ndarray, k: int):
+    """The k best (ids, scores) in each row, best first"""
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ids = np.take_along_axis(ids, keep, axis=1)
+        scores = np.take_along_axis(scores, keep, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def catalog_documents(resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Retrieval documents for catalogued resources.
+
+    Each topic's explanation and tip becomes one document, and each
+    resource one short document carrying its title and URL.
+    """
+    documents = []
+    topics = set()
+    for resource in resources:
+        key = f"{resource['subject']}/{resource['topic']}"
+        if key not in topics:
+            topics.add(key)
+            documents.append({
+                "id": f"topic:{key}",
+                "text": f"{resource['topic']} ({resource['subject']}). {resource['explanation']} {resource['tip']}",
+                "subject": resource["subject"],
+                "topic": resource["topic"],
+                "title": resource["topic"],
+                "url": None
+            })
+        documents.append({
+            "id": f"resource:{key}/{resource['url']}",
+            "text": f"{resource['title']}. {resource['topic']} {resource['kind']}",
+            "subject": resource["subject"],
+            "topic": resource["topic"],
+            "title": resource["title"],
+            "url": resource["url"]
+        })
+    return documents
+
+
+rag_index = VectorIndex(settings.rag_index_dir, settings.rag_embedding_model, settings.rag_embedding_dim)
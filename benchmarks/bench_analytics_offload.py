@@ -0,0 +1,107 @@
+"""
+Event-loop lag while analytics run inline vs on the analytics executor.
+
+Storage is seeded with completed quizzes. Clients then request the Power
+BI analytics and subject analytics back to back. At the same time a
+simulated quiz stream writes one answer to storage every millisecond,
+which also invalidates the analytics cache. The loop-lag monitor samples
+every millisecond throughout. Inline mode calls the analytics functions
+on the loop, as the handlers did before. Offloaded mode uses
+AnalyticsExecutor at several GIL switch intervals (the
+gil_switch_interval_ms setting).
+
+Usage:
+    python -m benchmarks.bench_analytics_offload [--sessions 20000] [--seconds 5]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.analytics import AnalyticsExecutor, subject_analytics
+from app.services.diagnostics import LoopLagMonitor
+from app.services.storage import InMemoryStorage
+
+SUBJECTS = ("Maths", "Science", "Python")
+
+
+def seed(sessions: int) -> InMemoryStorage:
+    storage = InMemoryStorage()
+    for i in range(sessions):
+        session_id = storage.create_session(f"user_{i % 2000}", SUBJECTS[i % 3])
+        storage.add_attempts(session_id, [
+            {"question": f"q{j}", "is_correct": (i + j) % 3 != 0, "topic": f"T{j % 5}", "difficulty": "medium"}
+            for j in range(15)
+        ])
+        storage.update_user_skill(f"user_{i % 2000}", SUBJECTS[i % 3], "T0", 0.5)
+    return storage
+
+
+async def quiz_traffic(storage: InMemoryStorage, stop: asyncio.Event) -> int:
+    session_id = storage.create_session("live_user", "Maths")
+    answers = 0
+    while not stop.is_set():
+        storage.add_attempt(session_id, {"question": "live", "is_correct": True})
+        answers += 1
+        await asyncio.sleep(0.001)
+    return answers
+
+
+async def scenario(storage: InMemoryStorage, seconds: float, executor: Optional[AnalyticsExecutor]) -> Dict[str, Any]:
+    monitor = LoopLagMonitor(interval=0.001, window=1_000_000)
+    stop = asyncio.Event()
+    monitor.start()
+    traffic = asyncio.create_task(quiz_traffic(storage, stop))
+    runs: List[float] = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        if executor is None:
+            storage.get_analytics_data(include_user_skills=False)
+            subject_analytics(storage, "Maths", 500)
+            await asyncio.sleep(0)
+        else:
+            await executor.run(InMemoryStorage.get_analytics_data, False)
+            await executor.run(subject_analytics, "Maths", 500)
+        runs.append(time.perf_counter() - started)
+    stop.set()
+    answers = await traffic
+    await monitor.stop()
+    lag = monitor.stats()
+    return {
+        "analytics_requests": len(runs) * 2,
+        "avg_request_ms": round(sum(runs) / len(runs) / 2 * 1000, 1),
+        "quiz_answers_written": answers,
+        "loop_lag_p50_ms": lag["p50_ms"],
+        "loop_lag_p99_ms": lag["p99_ms"],
+        "loop_lag_max_ms": lag["max_ms"]
+    }
+
+
+async def run(sessions: int, seconds: float) -> Dict[str, Any]:
+    storage = seed(sessions)
+    default_interval = sys.getswitchinterval()
+    results = {"sessions": sessions, "inline": await scenario(storage, seconds, None)}
+    for interval_ms in (None, 1.0, 0.5):
+        sys.setswitchinterval(interval_ms / 1000 if interval_ms else default_interval)
+        executor = AnalyticsExecutor(storage)
+        label = f"offloaded_switch_interval_{interval_ms}ms" if interval_ms else "offloaded_default_switch_interval"
+        results[label] = await scenario(storage, seconds, executor)
+        results[label]["snapshots"] = executor.snapshots
+        executor.close()
+    sys.setswitchinterval(default_interval)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.sessions, args.seconds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Hedged-request benchmark against a simulated long-tail latency distribution.
+
+Model calls are replaced by sleeps drawn from a lognormal body plus a rare
+slow tail (time is scaled down so a run takes seconds). The same request
+stream is served with hedging off and on, and p50/p99 served latency, hedge
+rate and extra calls are reported.
+
+Usage:
+    python -m benchmarks.bench_hedging [--requests 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.hedging import HedgingPolicy, percentile
+from app.services.question_generator import QuestionGenerator
+from app.services.admission import AdmissionController, Priority
+
+# Seconds of simulated latency per "real" second of model latency.
+TIME_SCALE = 0.01
+
+
+class SimulatedGenerator(QuestionGenerator):
+    def __init__(self, hedging: HedgingPolicy, seed: int = 0):
+        super().__init__()
+        self.hedging = hedging
+        self.admission = AdmissionController(10 ** 9, 10 ** 12)
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def sample_latency(self) -> float:
+        # ~2s median with a 3% tail of 10-20s stalls
+        if self.rng.random() < 0.03:
+            return self.rng.uniform(10, 20)
+        return self.rng.lognormvariate(0.7, 0.35)
+
+    async def _generate_once(
+        self,
+        subject: str,
+        topic: str,
+        difficulty: str,
+        previous_questions: Optional[List[str]],
+        priority: Priority
+    ) -> Dict[str, Any]:
+        self.calls += 1
+        started = time.perf_counter()
+        await asyncio.sleep(self.sample_latency() * TIME_SCALE)
+        self.hedging.record_call((subject, difficulty), time.perf_counter() - started)
+        return {
+            "question": f"q{self.calls}", "option_a": "a", "option_b": "b", "option_c": "c",
+            "option_d": "d", "correct_answer": "A", "difficulty": difficulty,
+            "subject": subject, "topic": topic, "explanation": ""
+        }
+
+
+async def serve(generator: SimulatedGenerator, requests: int, concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await generator.generate_question("Maths", "Algebra", "medium")
+            latencies.append((time.perf_counter() - started) / TIME_SCALE)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+async def run_async(requests: int, concurrency: int, max_ratio: float) -> Dict[str, Any]:
+    results = {}
+    for label, enabled in (("baseline", False), ("hedged", True)):
+        policy = HedgingPolicy(
+            enabled=enabled, max_ratio=max_ratio, min_samples=20,
+            default_delay=4.0 * TIME_SCALE
+        )
+        generator = SimulatedGenerator(policy)
+        latencies = await serve(generator, requests, concurrency)
+        results[label] = {
+            "p50_s": round(percentile(latencies, 0.5), 2),
+            "p90_s": round(percentile(latencies, 0.9), 2),
+            "p99_s": round(percentile(latencies, 0.99), 2),
+            "model_calls": generator.calls,
+            "hedges_started": policy.hedges_started,
+            "hedges_won": policy.hedges_won
+        }
+    return results
+
+
+def run(requests: int = 2000, concurrency: int = 50, max_ratio: float = 0.1) -> Dict[str, Any]:
+    return asyncio.run(run_async(requests, concurrency, max_ratio))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--max-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, args.concurrency, args.max_ratio), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Event journal append throughput and crash-recovery time.
+
+Quiz traffic is written through InMemoryStorage with the journal attached
+(one session event, then an attempt and a session update per answer).
+Recovery is then timed twice: replaying the whole journal, and loading a
+snapshot plus a 1% tail, which is what a server restarting after
+periodic compaction does.
+
+Usage:
+    python -m benchmarks.bench_journal [--events 100000 1000000 10000000]
+"""
+import argparse
+import json
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.services.journal import EventJournal
+from app.services.storage import InMemoryStorage
+
+ANSWERS_PER_SESSION = 15
+
+
+def write_traffic(journal: EventJournal, storage: InMemoryStorage, events: int):
+    written = 0
+    while written < events:
+        session_id = storage.create_session(f"user_{written % 5000}", "Maths")
+        written += 1
+        for i in range(ANSWERS_PER_SESSION):
+            if written >= events:
+                break
+            storage.add_attempt(session_id, {
+                "question": f"q{i}",
+                "selected_answer": "A",
+                "correct_answer": "B",
+                "is_correct": i % 3 == 0,
+                "topic": "Algebra",
+                "difficulty": "medium"
+            })
+            storage.update_session(session_id, {"total_questions": i + 1})
+            written += 2
+
+
+def recover(directory: str) -> Dict[str, Any]:
+    journal = EventJournal(directory)
+    result = journal.recover(InMemoryStorage())
+    journal.close()
+    return result
+
+
+def run(event_counts: List[int]) -> Dict[str, Any]:
+    results = {}
+    for events in event_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            journal = EventJournal(directory)
+            storage = InMemoryStorage()
+            journal.recover(storage)
+            storage.attach_journal(journal)
+
+            started = time.perf_counter()
+            write_traffic(journal, storage, events)
+            journal.flush()
+            append_seconds = time.perf_counter() - started
+            stats = journal.stats()
+            journal.close()
+            del storage
+
+            full = recover(directory)
+
+            journal = EventJournal(directory)
+            storage = InMemoryStorage()
+            journal.recover(storage)
+            storage.attach_journal(journal)
+            compaction = journal.compact()
+            write_traffic(journal, storage, max(1, events // 100))
+            journal.close()
+            del storage
+
+            tail = recover(directory)
+            results[f"{events}_events"] = {
+                "append_events_per_sec": round(stats["records_written"] / append_seconds),
+                "avg_group_commit_batch": stats["avg_batch_size"],
+                "full_replay_seconds": full["seconds"],
+                "snapshot_seconds": compaction["seconds"],
+                "snapshot_plus_tail_seconds": tail["seconds"],
+                "tail_events": tail["replayed_events"]
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    print(json.dumps(run(args.events), indent=2))
+
+
+if __name__ == "__main__":
+    main()
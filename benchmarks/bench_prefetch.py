@@ -0,0 +1,99 @@
+"""
+Time to next question with and without question prefetching.
+
+Simulated students take quizzes through the API: each asks for the next
+question, "thinks" for a while, then submits an answer. The model call is
+replaced by a fake that sleeps for a fixed latency, and the question bank
+is disabled so every question is generated. With prefetching, the next
+question is generated during the think time and next-question only waits
+for it when the prediction of the next difficulty and topic was right.
+
+Usage:
+    python -m benchmarks.bench_prefetch [--students 50] [--model-ms 800] [--think-ms 1500]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.main import app
+from app.services.hedging import percentile
+from app.services.prefetch import question_prefetcher
+from app.services.question_generator import question_generator
+
+SUBJECTS = ("Maths", "Science", "Python")
+
+
+async def scenario(students: int, think_seconds: float, accuracy: float, prefetch: bool) -> Dict[str, Any]:
+    settings.question_prefetch_enabled = prefetch
+    before = question_prefetcher.stats()
+    waits: List[float] = []
+
+    async def quiz(client: AsyncClient, index: int):
+        rng = random.Random(index)
+        session = (await client.post("/api/assessment/start", params={"subject": SUBJECTS[index % 3]})).json()
+        for _ in range(session["total_questions"]):
+            started = time.perf_counter()
+            response = await client.post("/api/assessment/next-question", json={"session_id": session["session_id"]})
+            waits.append(time.perf_counter() - started)
+            response.raise_for_status()
+            await asyncio.sleep(think_seconds * rng.uniform(0.5, 1.5))
+            answer = "A" if rng.random() < accuracy else "B"
+            result = (await client.post("/api/assessment/submit-answer", json={
+                "session_id": session["session_id"], "selected_answer": answer
+            })).json()
+            if result["assessment_complete"]:
+                break
+        await client.post("/api/assessment/complete", params={"session_id": session["session_id"]})
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        await asyncio.gather(*(quiz(client, i) for i in range(students)))
+
+    after = question_prefetcher.stats()
+    planned = after["planned"] - before["planned"]
+    hits = after["hits"] - before["hits"]
+    return {
+        "prefetch": prefetch,
+        "questions": len(waits),
+        "next_question_mean_ms": round(sum(waits) / len(waits) * 1000, 1),
+        "next_question_p50_ms": round(percentile(waits, 0.5) * 1000, 1),
+        "next_question_p90_ms": round(percentile(waits, 0.9) * 1000, 1),
+        "next_question_p99_ms": round(percentile(waits, 0.99) * 1000, 1),
+        "prefetch_hit_rate": round(hits / planned, 3) if planned else None
+    }
+
+
+async def main_async(args) -> List[Dict[str, Any]]:
+    async def fake_generate_question(subject, topic, difficulty, previous_questions=None, priority=None, tenant=None):
+        await asyncio.sleep(args.model_ms / 1000)
+        return {
+            "question": f"{subject} {topic} question {len(previous_questions or [])}-{random.random()}",
+            "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4",
+            "correct_answer": "A", "explanation": "", "topic": topic, "difficulty": difficulty
+        }
+
+    question_generator.generate_question = fake_generate_question
+    settings.question_bank_enabled = False
+    return [
+        await scenario(args.students, args.think_ms / 1000, args.accuracy, prefetch)
+        for prefetch in (False, True)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--model-ms", type=float, default=800)
+    parser.add_argument("--think-ms", type=float, default=1500)
+    parser.add_argument("--accuracy", type=float, default=0.5, help="probability a simulated answer is correct")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Resource catalog query latency by catalog size.
+
+Builds in-memory catalogs of synthetic resources (Zipf-distributed words in
+titles and explanations, two- or three-word topics) and times weak-topic
+lookups: exact topic names, and the same names with one letter dropped from
+a word, first with the fuzzy expansion cache cold and then warm.
+
+Usage:
+    python -m benchmarks.bench_resource_catalog [--sizes 1000 10000 50000] [--queries 500]
+"""
+import argparse
+import json
+import random
+import string
+import time
+from typing import Any, Dict, List
+
+from app.services.hedging import percentile
+from app.services.resource_catalog import ResourceCatalog
+
+
+def _words(rng: random.Random, count: int) -> List[str]:
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10))))
+    return sorted(words)
+
+
+def _corpus(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    vocabulary = _words(rng, 20_000)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    subjects = [f"Subject {i}" for i in range(20)]
+    topics = [" ".join(rng.sample(vocabulary, rng.randint(2, 3))).title() for _ in range(max(size // 5, 1))]
+    resources = []
+    for i in range(size):
+        topic = rng.choice(topics)
+        title = " ".join(rng.choices(vocabulary, weights, k=4)).capitalize()
+        resources.append({
+            "subject": subjects[hash(topic) % len(subjects)],
+            "topic": topic,
+            "kind": rng.choice(("video", "article")),
+            "title": f"{topic}: {title}",
+            "url": f"https://example.com/{i}",
+            "explanation": " ".join(rng.choices(vocabulary, weights, k=25))
+        })
+    return resources
+
+
+def _typo(topic: str, rng: random.Random) -> str:
+    words = topic.split()
+    index = rng.randrange(len(words))
+    word = words[index]
+    cut = rng.randrange(1, len(word) - 1)
+    words[index] = word[:cut] + word[cut + 1:]
+    return " ".join(words)
+
+
+def _time(catalog: ResourceCatalog, queries: List[str], cold: bool = False) -> Dict[str, float]:
+    latencies = []
+    for query in queries:
+        if cold:
+            catalog._expansions.clear()
+        started = time.perf_counter()
+        catalog.search(query, limit=5)
+        latencies.append(time.perf_counter() - started)
+    return {
+        "p50_us": round(percentile(latencies, 0.5) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 1)
+    }
+
+
+def run(sizes: List[int], queries: int = 500, seed: int = 0) -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        resources = _corpus(size, seed)
+        catalog = ResourceCatalog()
+        started = time.perf_counter()
+        catalog.add_many(resources)
+        build_seconds = time.perf_counter() - started
+
+        rng = random.Random(seed + 1)
+        exact = [rng.choice(resources)["topic"] for _ in range(queries)]
+        misspelled = [_typo(topic, rng) for topic in exact]
+        _time(catalog, exact[:20])
+        results.append({
+            "resources": size,
+            "terms": catalog.stats()["terms"],
+            "build_seconds": round(build_seconds, 2),
+            "exact": _time(catalog, exact),
+            "misspelled_cold": _time(catalog, misspelled, cold=True),
+            "misspelled_warm": _time(catalog, misspelled)
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.queries), indent=2))
+
+
+if __name__ == "__main__":
+    main()
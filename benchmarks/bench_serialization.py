@@ -0,0 +1,114 @@
+"""
+Serialization microbenchmark: FastAPI's default response path vs the fast path.
+
+Usage:
+    python -m benchmarks.bench_serialization [--rows 100000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models import NextQuestionResponse, DifficultyLevel
+from app.services import serialization
+from app.services.serialization import FastJSONResponse
+
+
+def question_fields() -> Dict[str, Any]:
+    return dict(
+        session_id="550e8400-e29b-41d4-a716-446655440000",
+        question_number=3,
+        total_questions=15,
+        current_difficulty=DifficultyLevel.MEDIUM,
+        mastery_level=0.42,
+        question="What does `len([1, 2, 3])` return?",
+        option_a="3",
+        option_b="2",
+        option_c="An error",
+        option_d="None",
+        topic="Lists",
+        subject="Python"
+    )
+
+
+def analytics_payload(rows: int) -> Dict[str, Any]:
+    rng = random.Random(0)
+    topics = ["Algebra", "Geometry", "Calculus", "Loops", "Energy"]
+    return {
+        "overview": {
+            "total_sessions": rows // 15,
+            "completed_sessions": rows // 20,
+            "total_attempts": rows,
+            "overall_accuracy": 61.5
+        },
+        "subject_performance": [
+            {"subject": s, "total_sessions": 10, "total_attempts": 100, "correct_attempts": 60, "accuracy": 60.0}
+            for s in ("Maths", "Science", "Python")
+        ],
+        "user_skills": [
+            {
+                "user_id": f"user_{i % 5000}",
+                "subject": "Maths",
+                "topic": rng.choice(topics),
+                "mastery_level": rng.random(),
+                "updated_at": datetime(2025, 1, 1).isoformat()
+            }
+            for i in range(rows)
+        ]
+    }
+
+
+def default_path(content: Any, model=None) -> bytes:
+    # What FastAPI does for a route with response_model: validate, encode, dump.
+    if model is not None:
+        content = model.model_validate(content)
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_path(content: Any, model=None) -> bytes:
+    if model is not None:
+        content = model.model_construct(**content)
+    return FastJSONResponse(content).body
+
+
+def timeit(fn: Callable[[], Any], repeat: int, number: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run(rows: int = 100_000, repeat: int = 5) -> Dict[str, Any]:
+    fields = question_fields()
+    analytics = analytics_payload(rows)
+    assert json.loads(default_path(analytics)) == json.loads(fast_path(analytics))
+
+    results = {
+        "encoder": "orjson" if serialization.HAS_ORJSON else "json",
+        "question_default_us": timeit(lambda: default_path(fields, NextQuestionResponse), repeat, 2000) * 1e6,
+        "question_fast_us": timeit(lambda: fast_path(fields, NextQuestionResponse), repeat, 2000) * 1e6,
+        "analytics_rows": rows,
+        "analytics_default_ms": timeit(lambda: default_path(analytics), repeat, 1) * 1e3,
+        "analytics_fast_ms": timeit(lambda: fast_path(analytics), repeat, 1) * 1e3,
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
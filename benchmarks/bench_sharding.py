@@ -0,0 +1,127 @@
+"""
+Storage throughput and analytics latency with 1..N storage shards.
+
+Quiz traffic replays the storage calls the API makes per question
+(next-question then submit-answer, batched as the handlers batch them)
+from many concurrent simulated students; question generation is not
+included. Analytics latency is measured on a dataset seeded directly
+into each shard. "local" is the unsharded in-process storage.
+
+Shard processes only run in parallel on separate cores; on a machine
+with fewer cores than shards the router and workers share CPU, and the
+IPC cost per call dominates.
+
+Usage:
+    python -m benchmarks.bench_sharding [--shards 1 2 4] [--students 200] [--sessions 50000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List
+
+from app.services.sharding import AsyncStorage, LocalStorage, ShardedStorage, shard_for
+from app.services.storage import InMemoryStorage
+
+QUESTIONS_PER_QUIZ = 15
+SUBJECTS = ("Maths", "Science", "Python")
+
+
+async def student(store: AsyncStorage, index: int):
+    user_id = f"user_{index}"
+    subject = SUBJECTS[index % 3]
+    session_id = await store.create_session(user_id, subject)
+    await store.get_topic_masteries(user_id, subject, ["Algebra", "Geometry"])
+    for i in range(QUESTIONS_PER_QUIZ):
+        question = {"question": f"{session_id}-{i}", "correct_answer": "A", "topic": "Algebra"}
+        await store.batch(session_id, [
+            ("get_session", (session_id,)),
+            ("get_question_history", (session_id,)),
+            ("get_attempts", (session_id,))
+        ])
+        await store.batch(session_id, [
+            ("add_question_to_history", (session_id, question["question"])),
+            ("store_current_question", (session_id, question))
+        ])
+        await store.batch(session_id, [("get_session", (session_id,)), ("get_current_question", (session_id,))])
+        await store.batch(session_id, [
+            ("add_attempt", (session_id, {"question": question["question"], "is_correct": i % 2 == 0})),
+            ("get_attempts", (session_id,))
+        ])
+        await store.batch(session_id, [
+            ("update_session", (session_id, {"total_questions": i + 1})),
+            ("clear_current_question", (session_id,))
+        ])
+        await store.update_user_skill(user_id, subject, "Algebra", 0.5)
+    await store.complete_session(session_id)
+
+
+async def quiz_throughput(store: AsyncStorage, students: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    await asyncio.gather(*(student(store, i) for i in range(students)))
+    seconds = time.perf_counter() - started
+    answers = students * QUESTIONS_PER_QUIZ
+    return {"answers_per_sec": round(answers / seconds), "seconds": round(seconds, 2)}
+
+
+def seed_calls(sessions: int, shards: int) -> List[List[tuple]]:
+    calls: List[List[tuple]] = [[] for _ in range(shards)]
+    for i in range(sessions):
+        session_id = str(uuid.uuid4())
+        shard = calls[shard_for(session_id, shards)]
+        shard.append(("create_session", (f"user_{i}", SUBJECTS[i % 3], "adaptive", session_id)))
+        shard.extend(
+            ("add_attempt", (session_id, {"question": f"q{j}", "is_correct": (i + j) % 3 != 0}))
+            for j in range(QUESTIONS_PER_QUIZ)
+        )
+    return calls
+
+
+async def analytics_latency(store: AsyncStorage, sessions: int, repeats: int = 5) -> Dict[str, Any]:
+    if isinstance(store, ShardedStorage):
+        from app.services.sharding import _shard_batch
+        await asyncio.gather(*(
+            store._run(shard, _shard_batch, calls)
+            for shard, calls in enumerate(seed_calls(sessions, store.shards))
+        ))
+    else:
+        for method, args in seed_calls(sessions, 1)[0]:
+            getattr(store.storage, method)(*args)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await store.get_analytics_data(include_user_skills=False)
+        timings.append(time.perf_counter() - started)
+    return {"sessions": sessions, "best_ms": round(min(timings) * 1000, 1)}
+
+
+async def run(shard_counts: List[int], students: int, sessions: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"cpu_count": os.cpu_count()}
+    for shards in [0] + shard_counts:
+        store = ShardedStorage(shards) if shards else LocalStorage(InMemoryStorage())
+        try:
+            if shards:
+                await store.start()
+            results["local" if not shards else f"{shards}_shards"] = {
+                "quiz": await quiz_throughput(store, students),
+                "analytics": await analytics_latency(store, sessions)
+            }
+        finally:
+            if shards:
+                store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=50_000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.shards, args.students, args.sessions)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
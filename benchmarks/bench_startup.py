@@ -0,0 +1,72 @@
+"""
+Startup benchmark: import time of app.main and time until /health returns 200.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--port 8765]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def measure_import() -> float:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT)
+    return float(output.strip())
+
+
+def measure_first_health(port: int, timeout: float = 30.0) -> float:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, "WARMUP_ON_STARTUP": "false"}
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError("Server did not become healthy in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(runs: int = 5, port: int = 8765) -> Dict[str, Any]:
+    imports = [measure_import() for _ in range(runs)]
+    health = [measure_first_health(port) for _ in range(runs)]
+    return {
+        "runs": runs,
+        "import_ms_median": statistics.median(imports) * 1e3,
+        "first_health_ms_median": statistics.median(health) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs, args.port), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Quiz length and estimation accuracy under fixed-length vs confidence stopping.
+
+Simulated students take quizzes with the current bucket selection. Each
+quiz stops according to a TerminationPolicy, using the same bucket-based
+ability standard error the API uses for uncalibrated subjects; every
+question served is one generation call when the question bank is off.
+Accuracy is reported as the ability RMSE (EAP with true item parameters)
+and the agreement of the final BKT mastery (>= 0.5) with the true "above
+average" label (theta > 0). Fixed-length baselines at several lengths are
+included so confidence stopping can be compared at equal accuracy.
+
+Usage:
+    python -m benchmarks.bench_termination [--students 3000] [--max-questions 15]
+"""
+import argparse
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.bkt_model import bkt_model
+from app.services.irt import estimate_ability, estimate_ability_from_buckets
+from app.services.termination import TerminationPolicy
+from benchmarks.simulator import SimulatedBank, bucket_policy, student_abilities
+
+
+def run_policy(bank: SimulatedBank, thetas: np.ndarray, policy: TerminationPolicy,
+               seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    choose = bucket_policy(bank, policy.max_questions)
+    lengths, errors, agreement = [], [], []
+    for theta in thetas:
+        responses: List[Tuple[int, bool]] = []
+        mastery = 0.0
+        while True:
+            item_id = choose(responses, rng)
+            if item_id is None:
+                break
+            is_correct = bank.answer(theta, item_id, rng)
+            responses.append((item_id, is_correct))
+            mastery = bkt_model.update_mastery(mastery, is_correct)
+            _, se = estimate_ability_from_buckets((bank.bucket[i - 1], c) for i, c in responses)
+            if policy.stop_reason(len(responses), se) is not None:
+                break
+        estimate, _ = estimate_ability(bank.params, responses)
+        lengths.append(len(responses))
+        errors.append(estimate - theta)
+        agreement.append((mastery >= 0.5) == (theta > 0))
+    return {
+        "avg_questions": round(float(np.mean(lengths)), 2),
+        "generation_calls_per_quiz": round(float(np.mean(lengths)), 2),
+        "theta_rmse": round(float(np.sqrt(np.mean(np.square(errors)))), 3),
+        "mastery_agreement": round(float(np.mean(agreement)), 3)
+    }
+
+
+def run(students: int = 3000, max_questions: int = 15, items: int = 600,
+        se_thresholds: Optional[List[float]] = None, seed: int = 0) -> Dict[str, Any]:
+    bank = SimulatedBank(items, seed)
+    thetas = student_abilities(students, seed + 1)
+    results = {}
+    for length in sorted({max(5, max_questions - 5), max(5, max_questions - 3), max_questions}):
+        results[f"fixed_{length}"] = run_policy(bank, thetas, TerminationPolicy("fixed", length), seed)
+    baseline = results[f"fixed_{max_questions}"]
+    candidates = [
+        (f"confidence_se<={threshold}", TerminationPolicy("confidence", max_questions, max_ability_se=threshold))
+        for threshold in se_thresholds or [0.5, 0.55, 0.6]
+    ]
+    for label, policy in candidates:
+        result = run_policy(bank, thetas, policy, seed)
+        result["questions_saved_per_quiz"] = round(baseline["avg_questions"] - result["avg_questions"], 2)
+        results[label] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--max-questions", type=int, default=15)
+    parser.add_argument("--se-thresholds", type=float, nargs="*")
+    args = parser.parse_args()
+    print(json.dumps(run(args.students, args.max_questions, se_thresholds=args.se_thresholds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Retrieval index query latency by corpus size.
+
+Fills a memory-mapped vector index (hashed TF-IDF embeddings) with
+synthetic resource chunks and times top-k queries: one at a time and in
+batches against the whole matrix, then with an IVF index probing a few
+clusters, reporting the IVF recall of the exact top k. Also times an
+incremental add to the full index.
+
+The synthetic text has no topical structure, so this is close to the worst
+case for IVF recall; lexical (hashed) vectors cluster poorly in general, and
+IVF is meant for corpora embedded with a local model.
+
+Usage:
+    python -m benchmarks.bench_vector_index [--sizes 1000 10000 100000] [--queries 200] [--probes 8 32]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.services.hedging import percentile
+from app.services.vector_index import VectorIndex
+from benchmarks.bench_resource_catalog import _corpus
+
+BATCH = 32
+
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3)
+    }
+
+
+def _documents(size: int, seed: int, start: int = 0) -> List[Dict[str, Any]]:
+    return [
+        {"id": f"doc-{start + i}", "text": f"{r['title']}. {r['explanation']}", "subject": r["subject"]}
+        for i, r in enumerate(_corpus(size, seed))
+    ]
+
+
+def run(sizes: List[int], queries: int = 200, probes: List[int] = (8, 32), k: int = 5,
+        seed: int = 0) -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            documents = _documents(size, seed)
+            index = VectorIndex(directory)
+            started = time.perf_counter()
+            index.add_documents(documents)
+            add_seconds = time.perf_counter() - started
+
+            rng = random.Random(seed + 1)
+            texts = [" ".join(rng.choice(documents)["text"].split()[:6]) for _ in range(queries)]
+            index.search(texts[0], k)
+
+            single = []
+            exact = []
+            for text in texts:
+                started = time.perf_counter()
+                found = index.search(text, k)
+                single.append(time.perf_counter() - started)
+                exact.append({chunk["doc_id"] for chunk in found})
+
+            batched = []
+            for start in range(0, queries, BATCH):
+                batch = texts[start:start + BATCH]
+                started = time.perf_counter()
+                index.search_many(batch, k)
+                batched.append((time.perf_counter() - started) / len(batch))
+
+            started = time.perf_counter()
+            lists = index.train_ivf()
+            train_seconds = time.perf_counter() - started
+            ivf = {"lists": lists, "train_seconds": round(train_seconds, 2)}
+            for probe_count in probes:
+                probed = []
+                recall = []
+                for text, expected in zip(texts, exact):
+                    started = time.perf_counter()
+                    found = index.search(text, k, probes=probe_count)
+                    probed.append(time.perf_counter() - started)
+                    recall.append(len(expected & {chunk["doc_id"] for chunk in found}) / max(len(expected), 1))
+                ivf[f"probes_{probe_count}"] = {
+                    **_latency(probed), f"recall_at_{k}": round(sum(recall) / len(recall), 3)
+                }
+
+            more = _documents(100, seed + 2, start=size)
+            started = time.perf_counter()
+            index.add_documents(more)
+            increment_seconds = time.perf_counter() - started
+            index.close()
+
+        results.append({
+            "chunks": size,
+            "add_chunks_per_second": round(size / add_seconds),
+            "exact": _latency(single),
+            f"exact_batched_{BATCH}_per_query": _latency(batched),
+            "ivf": ivf,
+            "add_100_more_ms": round(increment_seconds * 1000, 1)
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--probes", type=int, nargs="+", default=[8, 32])
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.queries, args.probes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
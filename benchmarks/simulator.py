@@ -0,0 +1,75 @@
+"""
+Simulated students and item banks shared by the adaptive-testing benchmarks.
+
+Students have a true ability theta ~ N(0, 1) and answer items according to
+a 2PL model with known true parameters, so estimation accuracy of any
+selection or stopping policy can be measured against the truth.
+"""
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.bkt_model import bkt_model
+from app.services.irt import ItemParameters, InformationTable, estimate_ability, p_correct
+
+BUCKETS = ("easy", "medium", "hard")
+
+
+class SimulatedBank:
+    """Items with true 2PL parameters, bucketed into easy/medium/hard by difficulty"""
+
+    def __init__(self, n_items: int, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.item_ids = np.arange(1, n_items + 1)
+        self.a = rng.lognormal(0.0, 0.3, n_items)
+        self.b = rng.normal(0.0, 1.0, n_items)
+        self.bucket = np.where(self.b < -0.5, "easy", np.where(self.b > 0.5, "hard", "medium"))
+        self.params = ItemParameters(self.item_ids, self.a, self.b, np.zeros(n_items))
+
+    def answer(self, theta: float, item_id: int, rng: np.random.Generator) -> bool:
+        i = int(item_id) - 1
+        return bool(rng.random() < p_correct(theta, self.a[i], self.b[i]))
+
+
+# A quiz policy is called with the responses so far and returns the next item
+# id, or None to stop.
+Policy = Callable[[List[Tuple[int, bool]], np.random.Generator], Optional[int]]
+
+
+def bucket_policy(bank: SimulatedBank, max_questions: int = 15) -> Policy:
+    """The current approach: BKT mastery picks a bucket, a random unseen item in it is served"""
+    def choose(responses, rng):
+        if len(responses) >= max_questions:
+            return None
+        mastery = 0.0
+        for _, is_correct in responses:
+            mastery = bkt_model.update_mastery(mastery, is_correct)
+        seen = {item_id for item_id, _ in responses}
+        bucket = bkt_model.recommend_difficulty(mastery)
+        candidates = [i for i in bank.item_ids[bank.bucket == bucket] if i not in seen]
+        return int(rng.choice(candidates)) if candidates else None
+    return choose
+
+
+def information_policy(table: InformationTable, max_questions: int = 15) -> Policy:
+    """Maximum Fisher information at the current EAP ability estimate"""
+    def choose(responses, rng):
+        if len(responses) >= max_questions:
+            return None
+        theta, _ = estimate_ability(table.params, responses)
+        return table.select(theta, exclude=[item_id for item_id, _ in responses])
+    return choose
+
+
+def run_quiz(bank: SimulatedBank, theta: float, policy: Policy,
+             rng: np.random.Generator) -> List[Tuple[int, bool]]:
+    responses: List[Tuple[int, bool]] = []
+    while True:
+        item_id = policy(responses, rng)
+        if item_id is None:
+            return responses
+        responses.append((item_id, bank.answer(theta, item_id, rng)))
+
+
+def student_abilities(n_students: int, seed: int = 1) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0.0, 1.0, n_students)
@@ -0,0 +1,420 @@
+"""
+End-to-end benchmark suite with JSON results and baseline comparison.
+
+Benchmarks:
+    bkt        BKT update + difficulty recommendation throughput
+    storage    storage writes and lookups with N attempt records already stored
+    analytics  /api/powerbi/analytics and /api/analytics/subject latency vs dataset size
+    quiz_flow  full quizzes through the API (start, next-question, submit-answer,
+               complete) with a fake question backend, and the same quizzes
+               stepping with answer-and-advance
+    memory     bytes of storage per completed 15-question session
+
+Metric names carry their direction: *_per_sec is better when higher;
+*_ms, *_seconds and *_bytes are better when lower. `compare` flags
+a metric as a regression when it is worse than the baseline by more than
+the tolerance and exits non-zero if any are found. Timings on a shared
+machine are noisy; `run --repeat 3` keeps the best value of each metric.
+
+Usage:
+    python -m benchmarks.suite run [--only bkt storage] [--sizes 10000 1000000] [--repeat 3] [--output results.json]
+    python -m benchmarks.suite compare results.json [--baseline benchmarks/baseline.json] [--tolerance 0.1]
+
+Sizes are attempt records; 10M records need roughly 10 GB of memory.
+benchmarks/baseline.json holds results for the default sizes; refresh it
+with `run --output benchmarks/baseline.json` when the benchmark machine
+changes or after an intended trade-off. Compare results from the same
+machine only.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.hedging import percentile
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+ATTEMPTS_PER_SESSION = 15
+SUBJECTS = ("Maths", "Science", "Python")
+FAKE_QUESTION = {
+    "question": "What is 2 + 2?",
+    "option_a": "3",
+    "option_b": "4",
+    "option_c": "5",
+    "option_d": "22",
+    "correct_answer": "B",
+    "explanation": "2 + 2 = 4",
+    "difficulty": "easy",
+    "topic": "Arithmetic"
+}
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds > 0 else 0.0
+
+
+def seed_storage(storage, records: int):
+    """Fill storage with completed sessions totalling `records` attempts"""
+    for i in range(max(1, records // ATTEMPTS_PER_SESSION)):
+        user_id = f"user_{i % 10_000}"
+        subject = SUBJECTS[i % 3]
+        session_id = storage.create_session(user_id, subject)
+        storage.add_attempts(session_id, [
+            {
+                "question": f"q{i}-{j}",
+                "selected_answer": "A",
+                "correct_answer": "A" if (i + j) % 3 else "B",
+                "is_correct": (i + j) % 3 != 0,
+                "time_spent": 10,
+                "topic": f"Topic {j % 5}",
+                "difficulty": ("easy", "medium", "hard")[j % 3]
+            }
+            for j in range(ATTEMPTS_PER_SESSION)
+        ])
+        storage.update_session(session_id, {"total_questions": ATTEMPTS_PER_SESSION, "mastery_level": 0.5})
+        storage.update_user_skill(user_id, subject, "Topic 0", 0.5)
+        storage.complete_session(session_id)
+
+
+def bench_bkt(sizes: List[int]) -> Dict[str, Any]:
+    from app.bkt_model import bkt_model
+
+    updates = 200_000
+    mastery = 0.0
+    started = time.perf_counter()
+    for i in range(updates):
+        mastery = bkt_model.update_mastery(mastery, i % 3 != 0)
+        bkt_model.recommend_difficulty(mastery)
+    return {"updates_per_sec": _rate(updates, time.perf_counter() - started)}
+
+
+def bench_storage(sizes: List[int]) -> Dict[str, Any]:
+    from app.services.storage import InMemoryStorage
+
+    results = {}
+    for size in sizes:
+        storage = InMemoryStorage()
+        started = time.perf_counter()
+        seed_storage(storage, size)
+        seed_seconds = time.perf_counter() - started
+        session_ids = list(storage.sessions)
+        operations = 50_000
+
+        started = time.perf_counter()
+        new_sessions = [storage.create_session(f"bench_{i}", "Maths") for i in range(operations // 10)]
+        create_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(operations):
+            storage.add_attempt(new_sessions[i % len(new_sessions)], {"question": "q", "is_correct": True})
+        add_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(operations):
+            session_id = session_ids[(i * 7919) % len(session_ids)]
+            storage.get_session(session_id)
+            storage.get_attempts(session_id)
+        lookup_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(operations):
+            storage.update_user_skill(f"user_{i % 10_000}", "Maths", f"Topic {i % 5}", 0.5)
+        skill_seconds = time.perf_counter() - started
+
+        results[f"{size}_records"] = {
+            "seed_records_per_sec": _rate(size, seed_seconds),
+            "create_session_per_sec": _rate(len(new_sessions), create_seconds),
+            "add_attempt_per_sec": _rate(operations, add_seconds),
+            "session_lookup_per_sec": _rate(operations, lookup_seconds),
+            "update_user_skill_per_sec": _rate(operations, skill_seconds)
+        }
+        del storage
+    return results
+
+
+def _client():
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+
+
+def _reset_app_storage():
+    from app.main import storage
+    from app.services.storage import InMemoryStorage
+
+    storage.load_state(InMemoryStorage().export_state(), notify=False)
+    return storage
+
+
+async def _timed_get(client, path: str, params: Dict[str, Any], repeats: int, invalidate: Callable[[], None]) -> float:
+    timings = []
+    for _ in range(repeats):
+        invalidate()
+        started = time.perf_counter()
+        response = await client.get(path, params=params)
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return round(min(timings) * 1000, 2)
+
+
+async def _bench_analytics(sizes: List[int]) -> Dict[str, Any]:
+    results = {}
+    async with _client() as client:
+        for size in sizes:
+            storage = _reset_app_storage()
+            seed_storage(storage, size)
+
+            def invalidate():
+                # Measure computation, not the analytics cache
+                storage.version += 1
+
+            results[f"{size}_records"] = {
+                "powerbi_ms": await _timed_get(
+                    client, "/api/powerbi/analytics", {"include_user_skills": "false"}, 3, invalidate
+                ),
+                "powerbi_with_skills_ms": await _timed_get(client, "/api/powerbi/analytics", {}, 3, invalidate),
+                "subject_ms": await _timed_get(
+                    client, "/api/analytics/subject/Maths", {"max_points": 500}, 3, invalidate
+                )
+            }
+    _reset_app_storage()
+    return results
+
+
+def bench_analytics(sizes: List[int]) -> Dict[str, Any]:
+    return asyncio.run(_bench_analytics(sizes))
+
+
+async def _bench_quiz_flow(students: int, concurrency: int, combined: bool = False) -> Dict[str, Any]:
+    from app.config import settings
+    from app.main import question_generator
+
+    async def fake_generate_question(subject, topic, difficulty, previous_questions=None, priority=None, tenant=None):
+        return {**FAKE_QUESTION, "question": f"{FAKE_QUESTION['question']} #{len(previous_questions or [])}",
+                "difficulty": difficulty, "subject": subject, "topic": topic}
+
+    question_generator.generate_question = fake_generate_question
+    settings.question_bank_enabled = False
+    # The fake model answers instantly, so there is no latency for prefetching
+    # to hide; bench_prefetch measures it against a slow model instead.
+    settings.question_prefetch_enabled = False
+    _reset_app_storage()
+    latencies: List[float] = []
+    steps: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(client, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, path, **kwargs)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+        return response.json()
+
+    async def quiz(client, index: int):
+        async with semaphore:
+            session = await call(client, "POST", "/api/assessment/start",
+                                 params={"subject": SUBJECTS[index % 3], "user_id": f"student_{index}"})
+            session_id = session["session_id"]
+            if combined:
+                await call(client, "POST", "/api/assessment/next-question", json={"session_id": session_id})
+            for i in range(session["total_questions"]):
+                # A step is answering one question and receiving the next
+                started = time.perf_counter()
+                submission = {"session_id": session_id, "selected_answer": "B" if i % 3 else "A"}
+                if combined:
+                    answer = await call(client, "POST", "/api/assessment/answer-and-advance", json=submission)
+                else:
+                    await call(client, "POST", "/api/assessment/next-question", json={"session_id": session_id})
+                    answer = await call(client, "POST", "/api/assessment/submit-answer", json=submission)
+                steps.append(time.perf_counter() - started)
+                if answer.get("assessment_complete"):
+                    break
+            await call(client, "POST", "/api/assessment/complete", params={"session_id": session_id})
+
+    async with _client() as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(quiz(client, i) for i in range(students)))
+        seconds = time.perf_counter() - started
+    _reset_app_storage()
+    return {
+        "quizzes_per_sec": _rate(students, seconds),
+        "requests_per_sec": _rate(len(latencies), seconds),
+        "request_p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "request_p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "step_p50_ms": round(percentile(steps, 0.5) * 1000, 2)
+    }
+
+
+def bench_quiz_flow(sizes: List[int]) -> Dict[str, Any]:
+    return {
+        **asyncio.run(_bench_quiz_flow(students=200, concurrency=50)),
+        "answer_and_advance": asyncio.run(_bench_quiz_flow(students=200, concurrency=50, combined=True))
+    }
+
+
+def bench_memory(sizes: List[int]) -> Dict[str, Any]:
+    from app.services.storage import InMemoryStorage
+
+    sessions = 5_000
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    storage = InMemoryStorage()
+    seed_storage(storage, sessions * ATTEMPTS_PER_SESSION)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del storage
+    return {
+        "per_session_bytes": round(used / sessions),
+        "per_attempt_bytes": round(used / (sessions * ATTEMPTS_PER_SESSION))
+    }
+
+
+BENCHMARKS: Dict[str, Callable[[List[int]], Dict[str, Any]]] = {
+    "bkt": bench_bkt,
+    "storage": bench_storage,
+    "analytics": bench_analytics,
+    "quiz_flow": bench_quiz_flow,
+    "memory": bench_memory
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def best_of(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge two runs of a benchmark, keeping the better value of each metric"""
+    merged = {}
+    for key, value in first.items():
+        other = second.get(key)
+        if isinstance(value, dict) and isinstance(other, dict):
+            merged[key] = best_of(value, other)
+        elif isinstance(other, (int, float)) and higher_is_better(key) is not None:
+            merged[key] = max(value, other) if higher_is_better(key) else min(value, other)
+        else:
+            merged[key] = value
+    return merged
+
+
+def run(names: List[str], sizes: List[int], repeat: int = 1) -> Dict[str, Any]:
+    results = {}
+    for name in names:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = BENCHMARKS[name](sizes)
+            results[name] = best_of(results[name], result) if name in results else result
+            print(f"{name}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": sizes,
+            "repeat": repeat
+        },
+        "results": results
+    }
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def higher_is_better(metric: str) -> Optional[bool]:
+    """Direction of a metric from its name, or None if it has no known unit"""
+    if metric.endswith("_per_sec"):
+        return True
+    if metric.endswith(("_ms", "_seconds", "_bytes")):
+        return False
+    return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare every metric present in both result sets.
+
+    Returns one row per metric with the relative change (positive means
+    better) and whether it regressed by more than `tolerance`.
+    """
+    before = flatten(baseline["results"])
+    after = flatten(current["results"])
+    rows = []
+    for metric in sorted(before.keys() & after.keys()):
+        direction = higher_is_better(metric)
+        if direction is None or before[metric] == 0:
+            continue
+        change = (after[metric] - before[metric]) / before[metric]
+        if not direction:
+            change = -change
+        rows.append({
+            "metric": metric,
+            "baseline": before[metric],
+            "current": after[metric],
+            "change": round(change, 4),
+            "regression": change < -tolerance
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run benchmarks and print or save JSON results")
+    run_parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    run_parser.add_argument("--repeat", type=int, default=1, help="Runs per benchmark; the best value of each metric is kept")
+    run_parser.add_argument("--output", help="Write results to this file instead of stdout")
+    compare_parser = commands.add_parser("compare", help="Flag regressions against a baseline result file")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    compare_parser.add_argument("--tolerance", type=float, default=0.1,
+                                help="Allowed relative slowdown before a metric counts as a regression")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args.only, args.sizes, args.repeat)
+        if args.output:
+            Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+        else:
+            print(json.dumps(results, indent=2))
+        return
+
+    rows = compare(
+        json.loads(Path(args.baseline).read_text()),
+        json.loads(Path(args.current).read_text()),
+        args.tolerance
+    )
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<60} {row['baseline']:>14.2f} {row['current']:>14.2f} {row['change']:>+8.1%} {flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{len(rows)} metrics compared, {regressions} regressions (tolerance {args.tolerance:.0%})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected, Priority, TenantQuotas, TokenBucket
+from app.services.question_pool import QuestionPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now = 1.0
+    assert bucket.wait_time(1) == 0.0
+
+
+def test_lower_priorities_leave_reserve_for_live_traffic():
+    clock = FakeClock()
+    controller = AdmissionController(10, 100_000, clock=clock)
+    
+    admitted = 0
+    while controller.try_acquire(Priority.RECOMMENDATION, 10) == 0.0:
+        admitted += 1
+    assert admitted == 6
+    assert controller.try_acquire(Priority.PREFETCH, 10) == 0.0
+    assert controller.try_acquire(Priority.LIVE, 10) == 0.0
+    assert controller.try_acquire(Priority.RECOMMENDATION, 10) > 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_rejects_instead_of_queueing_forever():
+    clock = FakeClock()
+    controller = AdmissionController(1, 100_000, max_wait={p: 0.5 for p in Priority}, clock=clock)
+    await controller.acquire(Priority.LIVE, 10)
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await controller.acquire(Priority.LIVE, 10)
+    assert excinfo.value.retry_after > 0.5
+    assert controller.stats()["rejected"]["LIVE"] == 1
+
+
+def test_rate_adapts_to_throttling():
+    clock = FakeClock()
+    controller = AdmissionController(100, 100_000, clock=clock)
+    controller.record_throttled()
+    controller.record_throttled()  # same cooldown window: counted once
+    assert controller.current_rpm == 50
+    clock.now = 10
+    controller.record_throttled()
+    assert controller.current_rpm == 25
+    for _ in range(100):
+        controller.record_success()
+    assert controller.current_rpm == 100
+
+
+def test_pool_skips_seen_questions_and_prefers_topic():
+    pool = QuestionPool(max_per_key=2)
+    for text, topic in (("q1", "Algebra"), ("q2", "Geometry"), ("q3", "Algebra")):
+        pool.add({"question": text, "subject": "Maths", "difficulty": "easy", "topic": topic})
+    
+    assert pool.take("Maths", "easy", exclude=["q3"])["question"] == "q2"
+    assert pool.take("Maths", "easy", topic="Algebra")["question"] == "q3"
+    assert pool.take("Maths", "easy", exclude=["q2", "q3"]) is None
+
+
+@pytest.mark.asyncio
+async def test_generator_falls_back_to_pool_when_rejected(monkeypatch):
+    from app.services.question_generator import QuestionGenerator
+    
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    generator = QuestionGenerator()
+    generator.admission = AdmissionController(1, 100_000, max_wait={p: 0.0 for p in Priority})
+    generator.admission.requests.tokens = 0
+    
+    with pytest.raises(AdmissionRejected):
+        await generator.generate_question("Maths", "Algebra", "easy")
+    
+    generator.question_pool.add({
+        "question": "Solve x + 1 = 2", "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "0",
+        "correct_answer": "A", "difficulty": "easy", "subject": "Maths", "topic": "Algebra", "explanation": ""
+    })
+    question = await generator.generate_question("Maths", "Algebra", "easy")
+    assert question["question"] == "Solve x + 1 = 2"
+
+
+def test_tenant_quotas_limit_each_tenant_separately():
+    clock = FakeClock()
+    quotas = TenantQuotas(default_rpm=2, quotas={"big_school": 60, "unlimited": 0}, clock=clock)
+    assert quotas.try_acquire("small_school") == 0.0
+    assert quotas.try_acquire("small_school") == 0.0
+    assert quotas.try_acquire("small_school") == pytest.approx(30.0)
+    assert quotas.try_acquire("other_school") == 0.0
+    assert all(quotas.try_acquire("unlimited") == 0.0 for _ in range(100))
+    assert quotas.try_acquire(None) == 0.0
+    stats = quotas.stats()
+    assert stats["small_school"]["admitted"] == 2 and stats["small_school"]["rejected"] == 1
+    assert "unlimited" not in stats
+
+
+@pytest.mark.asyncio
+async def test_generator_rejects_calls_over_tenant_quota(monkeypatch):
+    from app.services.question_generator import QuestionGenerator
+    
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    generator = QuestionGenerator()
+    generator.tenant_quotas = TenantQuotas(quotas={"school": 1})
+    generator.tenant_quotas.try_acquire("school")
+    
+    with pytest.raises(AdmissionRejected):
+        await generator.generate_question("Maths", "Algebra", "easy", tenant="school")
+    assert generator.admission.stats()["admitted"]["LIVE"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fill_pool_generates_every_subject_and_difficulty(monkeypatch):
+    from app.services.question_generator import QuestionGenerator
+    
+    generator = QuestionGenerator()
+    priorities = []
+    
+    async def fake_generate_once(subject, topic, difficulty, previous_questions, priority):
+        if subject == "Science":
+            raise AdmissionRejected(priority, 1.0)
+        priorities.append(priority)
+        return {
+            "question": f"{topic} {len(previous_questions)}?", "option_a": "1", "option_b": "2",
+            "option_c": "3", "option_d": "4", "correct_answer": "A", "explanation": "",
+            "subject": subject, "topic": topic, "difficulty": difficulty
+        }
+    
+    monkeypatch.setattr(generator, "_generate_once", fake_generate_once)
+    catalog = {"Maths": {"easy": ["Addition"], "hard": ["Calculus"]}, "Science": {"easy": ["Plants"]}}
+    
+    assert await generator.fill_pool(3, catalog) == 6
+    assert generator.question_pool.stats() == {"Maths/easy": 3, "Maths/hard": 3}
+    assert set(priorities) == {Priority.PREFETCH}
+    assert generator.question_pool.take("Maths", "easy", exclude=["Addition 0?", "Addition 1?"])["question"] == "Addition 2?"
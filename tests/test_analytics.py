@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.services.analytics import AnalyticsExecutor, performance_summary, subject_analytics
+from app.services.diagnostics import LoopLagMonitor
+from app.services.storage import InMemoryStorage
+
+
+def _quiz(storage, user, subject, results):
+    session_id = storage.create_session(user, subject)
+    for i, is_correct in enumerate(results):
+        storage.add_attempt(session_id, {"question": f"q{i}", "is_correct": is_correct, "topic": f"T{i % 2}"})
+    return session_id
+
+
+def test_snapshot_hides_later_attempts_and_sessions():
+    storage = InMemoryStorage()
+    session_id = _quiz(storage, "u1", "Maths", [True, False])
+    snapshot = storage.snapshot()
+    storage.add_attempt(session_id, {"question": "late", "is_correct": True})
+    _quiz(storage, "u2", "Maths", [True])
+
+    assert snapshot.version < storage.version
+    assert len(snapshot.get_attempts(session_id)) == 2
+    assert snapshot.get_analytics_data(include_user_skills=False)["overview"]["total_attempts"] == 2
+    assert subject_analytics(snapshot, "Maths")["total_questions"] == 2
+    assert storage.get_analytics_data(include_user_skills=False)["overview"]["total_attempts"] == 4
+
+
+def test_performance_summary_lists_weak_topics_weakest_first():
+    storage = InMemoryStorage()
+    _quiz(storage, "u1", "Maths", [False, True, False, True, False, False])
+    _quiz(storage, "u1", "Python", [True, False, False])
+    _quiz(storage, "u2", "Maths", [True, True])
+    summary = performance_summary(storage, "u1", None)
+    assert summary["total_quizzes"] == 2 and summary["total_questions"] == 9
+    assert [(a["subject"], a["topic"], a["accuracy"]) for a in summary["weak_areas"]] == [
+        ("Maths", "T0", 0.0), ("Python", "T1", 0.0), ("Python", "T0", 50.0)
+    ]
+    assert performance_summary(storage, "u1", "Science")["total_quizzes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_executor_caches_until_storage_changes():
+    storage = InMemoryStorage()
+    session_id = _quiz(storage, "u1", "Maths", [True, False])
+    executor = AnalyticsExecutor(storage)
+    try:
+        first = await executor.run(subject_analytics, "Maths")
+        assert await executor.run(subject_analytics, "Maths") is first
+        assert (executor.hits, executor.misses) == (1, 1)
+
+        storage.add_attempt(session_id, {"question": "q2", "is_correct": True})
+        updated = await executor.run(subject_analytics, "Maths")
+        assert updated["total_questions"] == 3
+        assert updated == subject_analytics(storage, "Maths")
+        assert executor.misses == 2 and executor.snapshots == 2
+    finally:
+        executor.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_computation():
+    storage = InMemoryStorage()
+    _quiz(storage, "u1", "Science", [True] * 5)
+    executor = AnalyticsExecutor(storage)
+    try:
+        results = await asyncio.gather(*(executor.run(performance_summary, None, None) for _ in range(5)))
+        assert all(result is results[0] for result in results)
+        assert executor.misses == 1
+    finally:
+        executor.close()
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_blocking_call():
+    monitor = LoopLagMonitor(interval=0.001)
+    monitor.start()
+    await asyncio.sleep(0.01)
+    sum(range(3_000_000))
+    await asyncio.sleep(0.01)
+    await monitor.stop()
+    stats = monitor.stats()
+    assert stats["samples"] > 0
+    assert stats["max_ms"] >= 10
@@ -0,0 +1,93 @@
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services.admission import AdmissionRejected, Priority
+from app.services.question_generator import question_generator
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    state = {"fail_live": False}
+    counter = itertools.count()
+
+    async def fake_generate_question(subject, topic, difficulty, previous_questions=None,
+                                     priority=Priority.LIVE, tenant=None):
+        if state["fail_live"] and priority == Priority.LIVE:
+            raise AdmissionRejected(priority, retry_after=2.0)
+        return {
+            "question": f"Question {next(counter)}?",
+            "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4",
+            "correct_answer": "A",
+            "explanation": "Because",
+            "topic": topic,
+            "difficulty": difficulty
+        }
+
+    monkeypatch.setattr(question_generator, "generate_question", fake_generate_question)
+    monkeypatch.setattr(settings, "question_bank_enabled", False)
+    monkeypatch.setattr(settings, "default_quiz_length", 3)
+    return state
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _start(client):
+    session_id = client.post("/api/assessment/start", params={"subject": "Maths"}).json()["session_id"]
+    first = client.post("/api/assessment/next-question", json={"session_id": session_id}).json()
+    return session_id, first
+
+
+def test_answer_and_advance_runs_a_quiz_in_one_request_per_step(client, generator):
+    session_id, question = _start(client)
+    assert question["question_number"] == 1
+
+    for number in (2, 3):
+        body = client.post("/api/assessment/answer-and-advance",
+                           json={"session_id": session_id, "selected_answer": "a"}).json()
+        assert body["is_correct"] is True and body["explanation"] == "Because"
+        assert body["questions_answered"] == number - 1
+        assert body["next_question"]["question_number"] == number
+        assert body["next_question"]["question"] != question["question"]
+        question = body["next_question"]
+
+    last = client.post("/api/assessment/answer-and-advance",
+                       json={"session_id": session_id, "selected_answer": "B"}).json()
+    assert last["assessment_complete"] and last["stop_reason"] == "max_questions"
+    assert last["next_question"] is None and last["next_question_error"] is None
+
+    response = client.post("/api/assessment/answer-and-advance",
+                           json={"session_id": session_id, "selected_answer": "A"})
+    assert response.status_code == 400
+    client.post("/api/assessment/complete", params={"session_id": session_id})
+    response = client.post("/api/assessment/answer-and-advance",
+                           json={"session_id": session_id, "selected_answer": "A"})
+    assert response.status_code == 400 and response.json()["detail"] == "Session is not active"
+
+
+def test_answer_is_kept_when_next_question_fails(client, generator, monkeypatch):
+    monkeypatch.setattr(settings, "question_prefetch_enabled", False)
+    session_id, _ = _start(client)
+    generator["fail_live"] = True
+
+    body = client.post("/api/assessment/answer-and-advance",
+                       json={"session_id": session_id, "selected_answer": "A"}).json()
+    assert body["questions_answered"] == 1
+    assert body["next_question"] is None
+    assert body["next_question_error"] == "Question generation is busy, please retry shortly"
+
+    generator["fail_live"] = False
+    retry = client.post("/api/assessment/next-question", json={"session_id": session_id}).json()
+    assert retry["question_number"] == 2
+
+
+def test_unknown_session_is_not_found(client, generator):
+    response = client.post("/api/assessment/answer-and-advance",
+                           json={"session_id": "missing", "selected_answer": "A"})
+    assert response.status_code == 404
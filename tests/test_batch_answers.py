@@ -0,0 +1,128 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from app.main import app
+from app.services import storage as storage_module
+from app.services.storage import storage
+
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+def _ask(session_id: str, correct_answer: str = "B", question: str = "What is Python?"):
+    storage.store_current_question(session_id, {
+        "question": question,
+        "option_a": "A snake",
+        "option_b": "A programming language",
+        "option_c": "A framework",
+        "option_d": "A database",
+        "correct_answer": correct_answer,
+        "difficulty": "easy",
+        "subject": "Python",
+        "topic": "Basics",
+        "explanation": ""
+    })
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_answers_across_sessions(client):
+    first = storage.create_session("batch_user", "Python")
+    second = storage.create_session("batch_user", "Maths")
+    _ask(first)
+    _ask(second, correct_answer="C")
+    
+    response = await client.post("/api/assessment/submit-answers", json={"answers": [
+        {"idempotency_key": "k1", "session_id": first, "selected_answer": "b"},
+        {"idempotency_key": "k2", "session_id": second, "selected_answer": "A",
+         "client_timestamp": "2025-01-01T10:00:00"},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["applied"] == 2
+    assert data["results"][0]["result"]["is_correct"] is True
+    assert data["results"][1]["result"]["is_correct"] is False
+    assert storage.get_attempts(second)[0]["client_timestamp"] == "2025-01-01T10:00:00"
+
+
+@pytest.mark.asyncio
+async def test_retried_batch_is_not_double_applied(client):
+    session_id = storage.create_session("batch_user", "Python")
+    _ask(session_id)
+    batch = {"answers": [{"idempotency_key": "retry-1", "session_id": session_id, "selected_answer": "B"}]}
+    
+    first = (await client.post("/api/assessment/submit-answers", json=batch)).json()
+    _ask(session_id)
+    second = (await client.post("/api/assessment/submit-answers", json=batch)).json()
+    
+    assert first["results"][0]["status"] == "applied"
+    assert second["results"][0]["status"] == "duplicate"
+    assert second["results"][0]["result"] == first["results"][0]["result"]
+    assert len(storage.get_attempts(session_id)) == 1
+    assert storage.get_session(session_id)["total_questions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_per_item_errors(client):
+    response = await client.post("/api/assessment/submit-answers", json={"answers": [
+        {"idempotency_key": "missing", "session_id": "does-not-exist", "selected_answer": "A"},
+    ]})
+    data = response.json()
+    assert data["errors"] == 1
+    assert data["results"][0]["error"] == "Session not found"
+
+
+@pytest.mark.asyncio
+async def test_buffered_answers_are_graded_against_their_own_questions(client):
+    session_id = storage.create_session("batch_user", "Python")
+    _ask(session_id, correct_answer="B", question="First?")
+    _ask(session_id, correct_answer="D", question="Second?")
+    
+    response = await client.post("/api/assessment/submit-answers", json={"answers": [
+        {"idempotency_key": "q1", "session_id": session_id, "selected_answer": "B", "question": "First?"},
+        {"idempotency_key": "q2", "session_id": session_id, "selected_answer": "D", "question": "Second?"},
+        {"idempotency_key": "q3", "session_id": session_id, "selected_answer": "D", "question": "Second?"},
+    ]})
+    data = response.json()
+    
+    assert [r["status"] for r in data["results"]] == ["applied", "applied", "error"]
+    assert all(r["result"]["is_correct"] for r in data["results"][:2])
+    assert [a["question"] for a in storage.get_attempts(session_id)] == ["First?", "Second?"]
+    assert storage.get_current_question(session_id) is None
+    
+    await client.post("/api/assessment/complete", params={"session_id": session_id})
+    assert session_id not in storage.issued_questions
+    
+    # A retry after completion is still a duplicate
+    retry = (await client.post("/api/assessment/submit-answers", json={"answers": [
+        {"idempotency_key": "q1", "session_id": session_id, "selected_answer": "B", "question": "First?"}
+    ]})).json()
+    assert retry["results"][0]["status"] == "duplicate"
+    assert retry["results"][0]["result"]["is_correct"] is True
+
+
+@pytest.mark.asyncio
+async def test_a_claimed_key_is_not_applied_twice(client):
+    session_id = storage.create_session("batch_user", "Python")
+    _ask(session_id)
+    # Another submission with the same key is being applied
+    assert storage.reserve_processed_answer(session_id, "claimed") == ("reserved", None)
+    
+    batch = {"answers": [{"idempotency_key": "claimed", "session_id": session_id, "selected_answer": "B"}]}
+    data = (await client.post("/api/assessment/submit-answers", json=batch)).json()
+    assert data["results"][0]["status"] == "error"
+    assert storage.get_attempts(session_id) == []
+    
+    storage.release_processed_answer(session_id, "claimed")
+    data = (await client.post("/api/assessment/submit-answers", json=batch)).json()
+    assert data["results"][0]["status"] == "applied"
+
+
+def test_completed_sessions_keys_expire(monkeypatch):
+    store = storage_module.InMemoryStorage()
+    session_id = store.create_session("batch_user", "Python")
+    store.record_processed_answer(session_id, "k", {"is_correct": True})
+    monkeypatch.setattr(storage_module, "PROCESSED_ANSWER_TTL_SECONDS", 0)
+    store.complete_session(session_id)
+    assert store.get_processed_answer(session_id, "k") is None
@@ -0,0 +1,36 @@
+from benchmarks.suite import bench_bkt, best_of, compare, flatten, higher_is_better
+
+
+def _results(**metrics):
+    return {"meta": {}, "results": {"storage": {"10000_records": metrics}}}
+
+
+def test_flatten_keeps_numeric_leaves():
+    flat = flatten({"a": {"b_ms": 1, "c": {"d_per_sec": 2.5}}, "label": "x", "flag": True})
+    assert flat == {"a.b_ms": 1.0, "a.c.d_per_sec": 2.5}
+
+
+def test_metric_direction_from_name():
+    assert higher_is_better("add_attempt_per_sec") is True
+    assert higher_is_better("powerbi_ms") is False
+    assert higher_is_better("per_session_bytes") is False
+    assert higher_is_better("sessions") is None
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = _results(add_attempt_per_sec=1000, lookup_ms=10.0, per_session_bytes=8000)
+    current = _results(add_attempt_per_sec=850, lookup_ms=10.5, per_session_bytes=6000)
+    rows = {row["metric"].rsplit(".", 1)[1]: row for row in compare(baseline, current, tolerance=0.1)}
+    assert rows["add_attempt_per_sec"]["regression"] and rows["add_attempt_per_sec"]["change"] == -0.15
+    assert not rows["lookup_ms"]["regression"]
+    assert not rows["per_session_bytes"]["regression"] and rows["per_session_bytes"]["change"] == 0.25
+
+
+def test_best_of_keeps_better_value_per_metric():
+    first = {"x": {"a_per_sec": 10, "b_ms": 5.0}, "sessions": 3}
+    second = {"x": {"a_per_sec": 12, "b_ms": 6.0}, "sessions": 4}
+    assert best_of(first, second) == {"x": {"a_per_sec": 12, "b_ms": 5.0}, "sessions": 3}
+
+
+def test_bkt_benchmark_reports_throughput():
+    assert bench_bkt([])["updates_per_sec"] > 0
@@ -0,0 +1,90 @@
+import asyncio
+import sys
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.main import app
+from app.services.diagnostics import (
+    LoopLagMonitor, SamplingProfiler, SlowRequestLog, StallDetector, collapse_stack
+)
+
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+def _block_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_collapse_stack_is_root_first():
+    def inner():
+        return collapse_stack(sys._getframe(), prefix="main")
+
+    stack = inner().split(";")
+    assert stack[0] == "main"
+    assert stack[-2:] == [f"{__name__}:test_collapse_stack_is_root_first", f"{__name__}:inner"]
+
+
+@pytest.mark.asyncio
+async def test_stall_is_captured_with_blocking_stack_and_linked_to_slow_request():
+    monitor = LoopLagMonitor(interval=0.005)
+    detector = StallDetector(monitor, threshold=0.05, sample_interval=0.002)
+    log = SlowRequestLog(threshold=0.1, detector=detector)
+    monitor.start()
+    detector.start()
+    try:
+        await asyncio.sleep(0.02)
+        started = time.monotonic()
+        _block_loop(0.2)
+        log.observe("GET", "/slow", started, time.monotonic())
+        await asyncio.sleep(0.05)
+    finally:
+        detector.stop()
+        await monitor.stop()
+
+    stalls = detector.recent()
+    assert len(stalls) == 1
+    assert 150 <= stalls[0]["duration_ms"] < 400
+    assert "_block_loop" in stalls[0]["top_stacks"][0]["stack"]
+    request = log.recent()[0]
+    assert request["path"] == "/slow"
+    assert request["loop_blocked_ms"] >= 100
+
+
+def test_sampling_profiler_reports_busy_thread():
+    profiler = SamplingProfiler()
+    profiler.start(interval=0.001)
+    _block_loop(0.1)
+    collapsed = profiler.stop()
+    lines = collapsed.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("MainThread;") and "_block_loop" in line for line in lines)
+    with pytest.raises(RuntimeError):
+        profiler.stop()
+
+
+@pytest.mark.asyncio
+async def test_profiler_endpoints_require_admin_key(client):
+    assert (await client.post("/api/admin/diagnostics/profiler/start")).status_code == 403
+
+    headers = {"X-API-Key": settings.admin_api_key}
+    response = await client.post("/api/admin/diagnostics/profiler/start", params={"interval_ms": 1}, headers=headers)
+    assert response.status_code == 200 and response.json()["running"]
+    assert (await client.post("/api/admin/diagnostics/profiler/start", headers=headers)).status_code == 409
+
+    await asyncio.sleep(0.05)
+    response = await client.post("/api/admin/diagnostics/profiler/stop", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text
+
+    diagnostics = (await client.get("/api/admin/diagnostics", headers=headers)).json()
+    assert set(diagnostics) == {"loop_lag", "stalls", "slow_requests", "profiler"}
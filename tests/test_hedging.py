@@ -0,0 +1,34 @@
+import pytest
+
+from app.services.hedging import HedgingPolicy, percentile
+from benchmarks.bench_hedging import run
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 11)]
+    assert percentile(values, 0.9) == 9.0
+    assert percentile(values, 0.99) == 10.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_hedge_delay_uses_observed_quantile():
+    policy = HedgingPolicy(enabled=True, min_samples=10, default_delay=4.0)
+    assert policy.hedge_delay(("Maths", "easy")) == 4.0
+    for i in range(1, 11):
+        policy.record_call(("Maths", "easy"), float(i))
+    assert policy.hedge_delay(("Maths", "easy")) == 9.0
+
+
+def test_hedge_budget_is_bounded():
+    policy = HedgingPolicy(enabled=True, max_ratio=0.1)
+    started = 0
+    for _ in range(100):
+        policy.start_request()
+        started += policy.try_start_hedge()
+    assert started == 10
+
+
+def test_hedging_cuts_simulated_tail_latency():
+    results = run(requests=600, concurrency=30)
+    assert results["hedged"]["p99_s"] < results["baseline"]["p99_s"]
+    assert results["hedged"]["hedges_started"] <= 0.1 * 600 + 1
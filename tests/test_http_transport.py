@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services import question_generator as qg_module
+from app.services.question_generator import QuestionGenerator
+
+QUESTION = {
+    "question": "What is 2 + 2?",
+    "option_a": "3",
+    "option_b": "4",
+    "option_c": "5",
+    "option_d": "22",
+    "correct_answer": "b",
+    "explanation": "Two plus two is four."
+}
+
+
+class MockGemini(BaseHTTPRequestHandler):
+    """Answers generateContent calls, failing the first N with a scripted status"""
+    
+    protocol_version = "HTTP/1.1"
+    failures = []
+    latency = 0.0
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        if self.failures:
+            code = self.failures.pop(0)
+            body = json.dumps({"error": {"code": code, "message": "simulated", "status": "UNAVAILABLE"}})
+        else:
+            code = 200
+            body = json.dumps({"candidates": [{
+                "content": {"role": "model", "parts": [{"text": json.dumps(QUESTION)}]},
+                "finishReason": "STOP"
+            }]})
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockGemini)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(qg_module.settings, "gemini_base_url", f"http://127.0.0.1:{server.server_port}/")
+    yield MockGemini
+    MockGemini.failures = []
+    MockGemini.latency = 0.0
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_over_pooled_connection(mock_server):
+    mock_server.failures = [429, 503]
+    generator = QuestionGenerator()
+    generator.base_delay = 0
+    
+    question = await generator.generate_question("Maths", "Arithmetic", "easy")
+    
+    assert question["correct_answer"] == "B"
+    stats = generator.transport_stats()
+    assert stats["requests"] == 3
+    assert stats["responses_by_status"] == {429: 1, 503: 1, 200: 1}
+    assert stats["connections_opened"] == 1
+
+
+@pytest.mark.asyncio
+async def test_generation_and_recommendations_share_connections(mock_server):
+    mock_server.latency = 0.01
+    generator = QuestionGenerator()
+    
+    await generator.generate_question("Maths", "Arithmetic", "easy")
+    await generator.generate_recommendations("Give me study tips")
+    await generator.generate_question("Maths", "Algebra", "medium")
+    
+    stats = generator.transport_stats()
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["idle_connections"] == 1
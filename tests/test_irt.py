@@ -0,0 +1,124 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import main
+from app.config import settings
+from app.services.irt import (
+    IRTEngine, InformationTable, ItemParameters, calibrate, estimate_ability, item_information
+)
+from app.services.question_bank import QuestionBank
+from app.services.topic_scheduler import TOPIC_CATALOG, topic_scheduler
+
+
+def _simulate(n_persons=800, n_items=40, per_person=15, seed=0):
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(0, 1, n_persons)
+    b = np.linspace(-2, 2, n_items)
+    persons = np.repeat(np.arange(n_persons), per_person)
+    items = np.concatenate([rng.choice(n_items, per_person, replace=False) for _ in range(n_persons)])
+    p = 1 / (1 + np.exp(-(theta[persons] - b[items])))
+    return persons, items, rng.random(len(p)) < p, b
+
+
+def test_calibration_recovers_item_difficulty():
+    persons, items, correct, true_b = _simulate()
+    a, b, c, theta = calibrate(persons, items, correct, 800, 40)
+    assert np.corrcoef(b, true_b)[0, 1] > 0.95
+    assert np.all((a >= 0.2) & (a <= 3.0))
+    assert np.all(c == 0)
+
+
+def test_ability_estimate_moves_with_responses():
+    params = ItemParameters([1, 2, 3], np.ones(3), np.array([-1.0, 0.0, 1.0]), np.zeros(3))
+    prior, prior_se = estimate_ability(params, [])
+    high, high_se = estimate_ability(params, [(1, True), (2, True), (3, True)])
+    low, _ = estimate_ability(params, [(1, False), (2, False), (3, False)])
+    assert abs(prior) < 1e-9
+    assert low < prior < high
+    assert high_se < prior_se
+    assert estimate_ability(params, [(99, True)])[0] == prior
+
+
+def test_information_table_selects_most_informative_unseen_item():
+    b = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+    params = ItemParameters([10, 11, 12, 13, 14], np.ones(5), b, np.zeros(5))
+    table = InformationTable(params, top_k=2)
+    assert table.select(0.9) == 13
+    assert table.select(0.9, exclude=[13]) == 12
+    # Past the ranked top_k the masked fallback is used
+    assert table.select(0.9, exclude=[13, 12]) == 14
+    assert table.select(0.0, exclude=[10, 11, 12, 13, 14]) is None
+    assert table.select(0.9, candidates=[10, 11]) == 11
+    # Candidates outside the ranked top_k go through the masked fallback
+    assert table.select(-2.0, exclude=[10], candidates=[10, 14]) == 14
+    assert table.select(0.0, exclude=[10], candidates=[10]) is None
+    assert item_information(0.0, 1.0, 0.0) > item_information(0.0, 1.0, 2.0)
+
+
+def test_engine_calibrates_from_attempts_and_updates_bank():
+    bank = QuestionBank()
+    ids = [
+        bank.add({
+            "question": f"Q{i}", "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4",
+            "correct_answer": "A", "difficulty": "medium", "subject": "Maths", "topic": "Algebra"
+        })
+        for i in range(40)
+    ]
+    persons, items, correct, _ = _simulate()
+    attempts = {}
+    for person, item, is_correct in zip(persons, items, correct):
+        attempts.setdefault(f"s{person}", []).append({"item_id": ids[item], "is_correct": bool(is_correct)})
+    attempts["no_items"] = [{"is_correct": True}]
+    
+    engine = IRTEngine(min_responses=5, min_items=20)
+    summary = engine.calibrate_subject("Maths", attempts, bank)
+    
+    assert summary["installed"] and summary["items"] == 40
+    assert bank.get(ids[0], mark_served=False)["item_difficulty"] < bank.get(ids[-1], mark_served=False)["item_difficulty"]
+    item_id, theta, se = engine.select_item("Maths", [(ids[20], True), (ids[25], True)], exclude=[ids[20], ids[25]])
+    assert item_id not in (ids[20], ids[25]) and theta > 0 and se > 0
+    assert engine.select_item("Science", []) is None
+    assert not IRTEngine(min_items=100).calibrate_subject("Maths", attempts)["installed"]
+
+
+def test_next_question_serves_unseen_items_on_the_scheduled_topic(monkeypatch):
+    bank = QuestionBank()
+    items, ids = {}, []
+    for difficulty, topics in TOPIC_CATALOG["Maths"].items():
+        for topic in topics:
+            for n in range(3):
+                ids.append(bank.add({
+                    "question": f"{topic} {n}?", "option_a": "1", "option_b": "2", "option_c": "3",
+                    "option_d": "4", "correct_answer": "A", "difficulty": difficulty,
+                    "subject": "Maths", "topic": topic
+                }))
+                items[f"{topic} {n}?"] = (difficulty, topic)
+    persons, positions, correct, _ = _simulate(n_items=len(ids))
+    attempts = {}
+    for person, position, is_correct in zip(persons, positions, correct):
+        attempts.setdefault(f"s{person}", []).append({"item_id": ids[position], "is_correct": bool(is_correct)})
+    engine = IRTEngine(min_responses=5, min_items=20)
+    assert engine.calibrate_subject("Maths", attempts, bank)["installed"]
+
+    async def no_generation(**kwargs):
+        raise AssertionError("the bank has unseen items on the scheduled topic")
+
+    monkeypatch.setattr(main, "question_bank", bank)
+    monkeypatch.setattr(main, "irt_engine", engine)
+    monkeypatch.setattr(main.question_generator, "generate_question", no_generation)
+    monkeypatch.setattr(settings, "question_bank_enabled", True)
+    monkeypatch.setattr(settings, "question_bank_fresh_ratio", 0.0)
+    monkeypatch.setattr(settings, "question_prefetch_enabled", False)
+    monkeypatch.setattr(topic_scheduler, "next_topic",
+                        lambda session_id, subject, difficulty, **kwargs: TOPIC_CATALOG[subject][difficulty][1])
+
+    client = TestClient(main.app)
+    session_id = client.post("/api/assessment/start", params={"subject": "Maths"}).json()["session_id"]
+    served = []
+    # Unanswered next-question calls must not serve the same item again
+    for _ in range(3):
+        body = client.post("/api/assessment/next-question", json={"session_id": session_id}).json()
+        difficulty = body["current_difficulty"]
+        assert items[body["question"]] == (difficulty, TOPIC_CATALOG["Maths"][difficulty][1])
+        served.append(body["question"])
+    assert len(set(served)) == 3
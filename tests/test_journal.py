@@ -0,0 +1,97 @@
+from app.services.journal import EventJournal
+from app.services.storage import InMemoryStorage
+
+
+def _open(path):
+    journal = EventJournal(str(path), fsync_interval=0.001)
+    storage = InMemoryStorage()
+    recovery = journal.recover(storage)
+    storage.attach_journal(journal)
+    return journal, storage, recovery
+
+
+def _quiz(storage, user="u1", answers=3):
+    session_id = storage.create_session(user, "Maths")
+    for i in range(answers):
+        question = {"question": f"{session_id}-{i}", "correct_answer": "A"}
+        storage.add_question_to_history(session_id, question["question"])
+        storage.store_current_question(session_id, question)
+        storage.add_attempt(session_id, {"question": question["question"], "is_correct": i % 2 == 0, "topic": "Algebra"})
+        storage.update_session(session_id, {"total_questions": i + 1, "mastery_level": 0.1 * i})
+        storage.update_user_skill(user, "Maths", "Algebra", 0.1 * i)
+        storage.clear_current_question(session_id)
+    storage.record_processed_answer(session_id, "key-1", {"is_correct": True})
+    storage.complete_session(session_id)
+    return session_id
+
+
+def test_recovery_replays_every_change(tmp_path):
+    journal, storage, recovery = _open(tmp_path)
+    assert recovery["replayed_events"] == 0
+    _quiz(storage)
+    _quiz(storage, user="u2")
+    storage.store_current_question(storage.create_session("u3", "Python"), {"question": "pending"})
+    journal.close()
+    
+    journal2, recovered, recovery = _open(tmp_path)
+    assert recovery["replayed_events"] == journal.next_lsn - 1
+    assert recovered.export_state() == storage.export_state()
+    assert recovered.get_subject_session_ids("Maths") == storage.get_subject_session_ids("Maths")
+    journal2.close()
+
+
+def test_snapshot_limits_replay_to_tail(tmp_path):
+    journal, storage, _ = _open(tmp_path)
+    for i in range(5):
+        _quiz(storage, user=f"u{i}")
+    result = journal.compact()
+    assert result["snapshot_lsn"] == journal.next_lsn - 1
+    assert len(journal.snapshots()) == 1
+    _quiz(storage, user="late")
+    journal.close()
+    
+    listener_calls = []
+    journal2 = EventJournal(str(tmp_path))
+    recovered = InMemoryStorage()
+    recovered.add_attempt_listener(lambda session, attempt: listener_calls.append(attempt["attempt_id"]))
+    recovery = journal2.recover(recovered)
+    
+    assert recovery["snapshot_lsn"] == result["snapshot_lsn"]
+    assert 0 < recovery["replayed_events"] < result["snapshot_lsn"]
+    assert recovered.export_state() == storage.export_state()
+    # Derived state sees snapshot and tail attempts alike
+    assert len(listener_calls) == 18
+    journal2.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    journal, storage, _ = _open(tmp_path)
+    _quiz(storage)
+    journal.close()
+    with open(journal.segments()[-1], "ab") as f:
+        f.write(b"\x07\x00partial-record")
+    
+    journal2, recovered, recovery = _open(tmp_path)
+    assert recovered.export_state() == storage.export_state()
+    _quiz(recovered, user="after")
+    journal2.close()
+    
+    journal3, again, _ = _open(tmp_path)
+    assert again.export_state() == recovered.export_state()
+    journal3.close()
+
+
+def test_events_stream_and_group_commit(tmp_path):
+    journal, storage, _ = _open(tmp_path)
+    session_id = storage.create_session("u1", "Maths")
+    storage.add_attempts(session_id, [{"is_correct": True} for _ in range(10)])
+    for i in range(500):
+        storage.update_session(session_id, {"total_questions": i})
+    assert journal.flush(timeout=5)
+    
+    events = list(journal.read_events(from_lsn=2))
+    assert events[0][0] == 2 and events[0][1] == "attempts"
+    assert len(events[0][2]["attempts"]) == 10
+    assert events[-1][2]["updates"] == {"total_questions": 499}
+    assert journal.stats()["batches"] < journal.stats()["records_written"]
+    journal.close()
@@ -0,0 +1,77 @@
+import json
+import pytest
+from httpx import ASGITransport, AsyncClient
+from app.main import app
+from app.services.storage import storage
+from app.services.pagination import (
+    encode_cursor, decode_cursor, lttb, bucket_downsample, stream_json_array
+)
+
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+def _curve(n):
+    return [{"question_number": i, "accuracy": float(i % 7)} for i in range(1, n + 1)]
+
+
+def test_cursor_round_trip():
+    state = {"s": 3, "a": 7, "n": 120, "c": 80}
+    assert decode_cursor(encode_cursor(state)) == state
+    assert decode_cursor(None) == {}
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor!")
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor({"s": -1, "a": 0}))
+
+
+def test_lttb_keeps_endpoints_and_size():
+    points = _curve(1000)
+    sampled = lttb(points, 50)
+    assert len(sampled) == 50
+    assert sampled[0] is points[0]
+    assert sampled[-1] is points[-1]
+    assert lttb(points[:10], 50) == points[:10]
+
+
+def test_bucket_downsample_averages():
+    sampled = bucket_downsample(_curve(100), 10)
+    assert len(sampled) == 10
+    assert sampled[-1]["question_number"] == 100
+
+
+def test_stream_json_array_is_valid_json():
+    items = [{"i": i} for i in range(2503)]
+    assert json.loads(b"".join(stream_json_array(items, chunk_size=1000))) == items
+    assert json.loads(b"".join(stream_json_array([]))) == []
+
+
+@pytest.mark.asyncio
+async def test_growth_pages_continue_cumulative_accuracy(client):
+    for _ in range(3):
+        session_id = storage.create_session("page_user", "Science")
+        for i in range(4):
+            storage.add_attempt(session_id, {"is_correct": i % 2 == 0, "topic": "Energy"})
+    
+    points, cursor = [], None
+    while True:
+        params = {"limit": 5}
+        if cursor:
+            params["cursor"] = cursor
+        data = (await client.get("/api/analytics/subject/Science/growth", params=params)).json()
+        points.extend(data["growth_data"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    
+    full = (await client.get("/api/analytics/subject/Science")).json()["growth_data"]
+    assert points == full
+    
+    negative = encode_cursor({"s": -1, "a": 0, "n": 0, "c": 0})
+    response = await client.get("/api/analytics/subject/Science/growth", params={"cursor": negative})
+    assert response.status_code == 400
+    response = await client.get("/api/analytics/subject/Science", params={"max_points": 2})
+    assert response.status_code == 422
@@ -0,0 +1,64 @@
+from app.services.question_bank import QuestionBank
+
+
+def _question(text, difficulty="medium", topic="Algebra", subject="Maths"):
+    return {
+        "question": text,
+        "option_a": "1",
+        "option_b": "2",
+        "option_c": "3",
+        "option_d": "4",
+        "correct_answer": "A",
+        "explanation": "",
+        "difficulty": difficulty,
+        "subject": subject,
+        "topic": topic
+    }
+
+
+def test_pick_nearest_unseen_item():
+    bank = QuestionBank()
+    for i, item_difficulty in enumerate([-0.5, -0.1, 0.2, 0.6]):
+        bank.add(_question(f"Q{i}"), item_difficulty=item_difficulty)
+    
+    assert bank.pick("Maths", "medium", target_difficulty=0.1)["question"] == "Q2"
+    assert bank.pick("Maths", "medium", exclude=["Q2"], target_difficulty=0.1)["question"] == "Q1"
+    assert bank.pick("Maths", "medium", exclude=["Q0", "Q1", "Q2", "Q3"]) is None
+    assert bank.pick("Maths", "hard") is None
+    assert bank.stats()["hits"] == 2
+
+
+def test_pick_prefers_topic_then_falls_back():
+    bank = QuestionBank()
+    bank.add(_question("Geometry item", topic="Geometry"))
+    bank.add(_question("Algebra item", topic="Algebra"))
+    
+    assert bank.pick("Maths", "medium", topic="Geometry")["question"] == "Geometry item"
+    assert bank.pick("Maths", "medium", exclude=["Geometry item"], topic="Geometry")["topic"] == "Algebra"
+
+
+def test_duplicates_are_ignored_and_bank_persists(tmp_path):
+    path = str(tmp_path / "bank.db")
+    bank = QuestionBank(path)
+    assert bank.add(_question("Q")) is not None
+    assert bank.add(_question("Q")) is None
+    assert bank.add_many([_question("Q"), _question("R", difficulty="easy")]) == 1
+    bank.close()
+    
+    reopened = QuestionBank(path)
+    assert reopened.count("Maths") == 2
+    assert reopened.pick("Maths", "easy")["question"] == "R"
+
+
+def test_serve_counts_are_written_on_flush():
+    bank = QuestionBank()
+    item_id = bank.add(_question("Q"))
+    bank.pick("Maths", "medium")
+    bank.get(item_id)
+    
+    def served():
+        return bank.conn.execute("SELECT served_count FROM questions WHERE id = ?", (item_id,)).fetchone()[0]
+    
+    assert served() == 0 and bank.stats()["unflushed_serves"] == 2
+    assert bank.flush_served() == 1
+    assert served() == 2 and bank.flush_served() == 0
@@ -0,0 +1,109 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.question_generator import QuestionGenerator
+from app.services.question_validation import extract_json, validate_question
+
+VALID = {
+    "question": "What is 2 + 2?",
+    "option_a": "3",
+    "option_b": "4",
+    "option_c": "5",
+    "option_d": "22",
+    "correct_answer": "B",
+    "explanation": "Two plus two is four."
+}
+
+
+def test_extract_json_is_lenient():
+    fenced = "```json\n" + json.dumps(VALID) + "\n```"
+    chatty = "Sure! Here is your question:\n" + json.dumps(VALID) + "\nGood luck!"
+    trailing = '{"question": "Q?", "option_a": "x",}'
+    assert extract_json(fenced) == VALID
+    assert extract_json(chatty) == VALID
+    assert extract_json(trailing) == {"question": "Q?", "option_a": "x"}
+    assert extract_json("no json here") is None
+
+
+@pytest.mark.parametrize("raw_answer", ["b", "B)", "Option B", "(B)", "B.", "Answer: B", "4"])
+def test_correct_answer_is_repaired(raw_answer):
+    result = validate_question({**VALID, "correct_answer": raw_answer})
+    assert result.ok
+    assert result.data["correct_answer"] == "B"
+
+
+def test_option_text_starting_with_a_letter_is_matched_exactly():
+    question = {
+        **VALID,
+        "question": "What is a list?",
+        "option_a": "An immutable sequence",
+        "option_b": "A key-value mapping",
+        "option_c": "A mutable ordered sequence",
+        "option_d": "An unordered set",
+        "correct_answer": "A mutable ordered sequence"
+    }
+    result = validate_question(question)
+    assert result.ok and result.data["correct_answer"] == "C"
+    assert not validate_question({**question, "correct_answer": "A mutable sequence"}).ok
+
+
+def test_option_prefixes_are_stripped():
+    result = validate_question({**VALID, "option_a": "A) 3", "option_c": "  5 "})
+    assert result.ok
+    assert result.data["option_a"] == "3"
+    assert result.data["option_c"] == "5"
+
+
+def test_bad_fields_are_reported():
+    result = validate_question({**VALID, "option_c": "4", "option_d": "", "correct_answer": "E"})
+    assert set(result.invalid_fields) == {"option_c", "option_d", "correct_answer"}
+
+
+def test_replacing_keyed_option_invalidates_key():
+    result = validate_question({**VALID, "option_b": "3"})
+    assert set(result.invalid_fields) == {"option_b", "correct_answer"}
+
+
+def _response(payload):
+    text = payload if isinstance(payload, str) else json.dumps(payload)
+    return SimpleNamespace(text=text, candidates=None)
+
+
+@pytest.mark.asyncio
+async def test_only_invalid_fields_are_regenerated(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    generator = QuestionGenerator()
+    responses = [
+        _response({**VALID, "option_d": "4"}),
+        _response({"option_d": "8"}),
+    ]
+    prompts = []
+    
+    async def fake_call(func, *args, **kwargs):
+        prompts.append(kwargs["contents"][0].parts[0].text)
+        return responses.pop(0)
+    
+    monkeypatch.setattr(generator, "_call_with_retry", fake_call)
+    question = await generator.generate_question("Maths", "Arithmetic", "easy")
+    
+    assert question["option_d"] == "8"
+    assert question["correct_answer"] == "B"
+    assert "Generate ONLY these fields: option_d" in prompts[1]
+    assert generator.metrics()["validation"]["partial_regenerations"] == 1
+    assert generator.metrics()["validation"]["wasted_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unusable_output_counts_as_wasted(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    generator = QuestionGenerator()
+    
+    async def fake_call(func, *args, **kwargs):
+        return _response("I cannot help with that.")
+    
+    monkeypatch.setattr(generator, "_call_with_retry", fake_call)
+    with pytest.raises(Exception):
+        await generator.generate_question("Maths", "Arithmetic", "easy")
+    assert generator.metrics()["validation"]["wasted_calls"] == 1
@@ -0,0 +1,125 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.config import settings
+from app.main import app, tenants
+from app.services.admission import Priority
+from app.services.question_generator import question_generator
+from app.services.resource_catalog import ResourceCatalog, tokenize
+from app.services.tenancy import Tenant
+from app.services.vector_index import VectorIndex
+
+
+def _resource(title, topic, subject="Python", kind="article", explanation=""):
+    return {
+        "subject": subject,
+        "topic": topic,
+        "kind": kind,
+        "title": title,
+        "url": f"https://example.com/{title.lower().replace(' ', '-')}",
+        "explanation": explanation
+    }
+
+
+def test_tokenize_stems_and_drops_stopwords():
+    assert tokenize("What are the React Hooks?") == ["react", "hook"]
+    assert tokenize("Classes and Properties") == ["class", "property"]
+
+
+def test_search_is_ranked_fuzzy_and_filtered_by_subject():
+    catalog = ResourceCatalog()
+    assert catalog.load_curated() == catalog.count() > 0
+
+    assert catalog.topic_resources("React Hooks")["topic"] == "React Hooks"
+    misspelled = catalog.topic_resources("react hoks")
+    assert misspelled["topic"] == "React Hooks"
+    assert misspelled["videos"] and misspelled["articles"] and misspelled["explanation"]
+    assert catalog.topic_resources("Javascript varables")["topic"] == "JavaScript Variables"
+
+    results = catalog.search("Data Structures", subject="python")
+    assert results[0]["subject"] == "Python" and results[0]["topic"] == "Data Structures"
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    assert catalog.search("Data Structures", subject="Maths") == []
+    assert catalog.topic_resources("photosynthesis") is None
+    assert catalog.stats()["misses"] == 2
+
+
+def test_incremental_adds_and_persistence(tmp_path):
+    path = str(tmp_path / "catalog.db")
+    catalog = ResourceCatalog(path)
+    assert catalog.add(_resource("Loops in Python", "Loops")) is not None
+    assert catalog.search("generators")[:1] == []
+
+    catalog.add_many([
+        _resource("Generators and yield", "Generators", explanation="Lazy iteration with yield"),
+        _resource("Loops in Python", "Loops")
+    ])
+    assert catalog.search("generator")[0]["title"] == "Generators and yield"
+    with pytest.raises(ValueError):
+        catalog.add({**_resource("Bad", "Loops"), "kind": "podcast"})
+    catalog.close()
+
+    reopened = ResourceCatalog(path)
+    assert reopened.load() == 2
+    assert reopened.search("generatr")[0]["topic"] == "Generators"
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    catalog = ResourceCatalog()
+    catalog.load_curated()
+    monkeypatch.setattr(main, "resource_catalog", catalog)
+    monkeypatch.setattr(main, "rag_index", VectorIndex())
+    monkeypatch.setattr(settings, "resource_catalog_enabled", True)
+    return catalog
+
+
+def test_resource_endpoints(catalog):
+    client = TestClient(app)
+    body = client.get("/api/learning-path/resources", params={"q": "flexbox layout"}).json()
+    assert body["results"][0]["topic"] == "CSS Flexbox"
+
+    response = client.post(
+        "/api/admin/resources",
+        json=[_resource("Comprehensions", "Loops"), {"title": "No url"}],
+        headers={"X-API-Key": settings.admin_api_key}
+    )
+    assert response.json() == {
+        "added": 1, "duplicates": 0, "rejected": [{"index": 1, "error": "Missing subject"}]
+    }
+    assert catalog.search("comprehension")[0]["title"] == "Comprehensions"
+
+
+def test_recommendations_link_catalogued_resources(catalog, monkeypatch):
+    async def fake_generate_question(subject, topic, difficulty, previous_questions=None,
+                                     priority=Priority.LIVE, tenant=None):
+        return {
+            "question": f"{topic} question {len(previous_questions or [])}?",
+            "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4",
+            "correct_answer": "A", "explanation": "", "topic": topic, "difficulty": difficulty
+        }
+
+    async def fake_generate_recommendations(prompt, tenant=None):
+        return "Study more"
+
+    monkeypatch.setattr(question_generator, "generate_question", fake_generate_question)
+    monkeypatch.setattr(question_generator, "generate_recommendations", fake_generate_recommendations)
+    monkeypatch.setattr(settings, "question_bank_enabled", False)
+    monkeypatch.setattr(settings, "question_prefetch_enabled", False)
+    monkeypatch.setitem(tenants._tenants, "catalog_school", Tenant.create("catalog_school"))
+    client = TestClient(app, headers={"X-Tenant-ID": "catalog_school"})
+
+    session_id = client.post("/api/assessment/start", params={"subject": "Python"}).json()["session_id"]
+    for _ in range(5):
+        client.post("/api/assessment/next-question", json={"session_id": session_id})
+        client.post("/api/assessment/submit-answer", json={"session_id": session_id, "selected_answer": "B"})
+    client.post("/api/assessment/complete", params={"session_id": session_id})
+
+    body = client.get("/api/learning-path/recommendations", params={"subject": "Python"}).json()
+    assert body["learning_resources"]
+    for area in body["learning_resources"]:
+        # Every easy Python topic is catalogued
+        assert area["search_url"].startswith("https://www.google.com/search")
+        assert area["resources"][0]["topic"] == area["topic"]
+        assert area["explanation"]
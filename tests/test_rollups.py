@@ -0,0 +1,51 @@
+from app.services.rollups import RollupStore, parse_timestamp
+
+HOUR = 3600
+DAY = 86400
+
+
+def _fill(store, base, count, spacing):
+    for i in range(count):
+        store.record(base + i * spacing, "Maths", "Algebra", "easy", "u1", i % 2 == 0)
+
+
+def test_query_aggregates_to_requested_resolution():
+    store = RollupStore(minute_retention_seconds=10 ** 10, hour_retention_seconds=10 ** 10)
+    base = (parse_timestamp("2025-01-01T10:00:00") // DAY) * DAY
+    _fill(store, base, 120, 60)
+    
+    hourly = store.query(base, base + DAY, resolution="hour")
+    assert [b["attempts"] for b in hourly] == [60, 60]
+    assert hourly[0]["accuracy"] == 50.0
+    assert store.query(base, base + DAY, resolution="hour", user_id="other") == []
+
+
+def test_compaction_preserves_totals():
+    store = RollupStore(minute_retention_seconds=10 ** 10, hour_retention_seconds=10 ** 10)
+    now = parse_timestamp("2025-03-01T00:00:00")
+    _fill(store, now - 3 * DAY, 500, 600)
+    before = store.query(now - 4 * DAY, now + DAY, resolution="day")
+    
+    store.retention = {"minute": HOUR, "hour": DAY}
+    assert store.compact(now=now) > 0
+    counts = store.bucket_counts()
+    after = store.query(now - 4 * DAY, now + DAY, resolution="day")
+    
+    assert counts["day"] > 0
+    assert sum(b["attempts"] for b in after) == sum(b["attempts"] for b in before) == 500
+    assert [b["attempts"] for b in after] == [b["attempts"] for b in before]
+
+
+def test_old_records_land_in_coarse_buckets():
+    store = RollupStore(minute_retention_seconds=HOUR, hour_retention_seconds=DAY)
+    store.record(parse_timestamp("2020-01-01T12:30:00"), "Maths", "Algebra", "easy", "u1", True)
+    assert store.bucket_counts() == {"minute": 0, "hour": 0, "day": 1}
+
+
+def test_unparseable_timestamps_are_skipped_not_raised():
+    store = RollupStore()
+    session = {"subject": "Maths", "user_id": "u1"}
+    store.record_attempt(session, {"timestamp": "yesterday", "is_correct": True})
+    store.record_attempt(session, {"timestamp": "2025-01-01T10:00:00", "is_correct": True})
+    assert store.skipped_attempts == 1
+    assert sum(store.bucket_counts().values()) == 1
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime
+
+from app.models import AssessmentComplete, DifficultyLevel
+from app.services import serialization
+from app.services.serialization import FastJSONResponse
+
+
+def _payload():
+    return {
+        "when": datetime(2025, 1, 2, 3, 4, 5),
+        "difficulty": DifficultyLevel.HARD,
+        "rows": [{"topic": "Algebra", "mastery_level": 0.5}]
+    }
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    fast = json.loads(serialization.dumps(_payload()))
+    monkeypatch.setattr(serialization, "HAS_ORJSON", False)
+    fallback = json.loads(serialization.dumps(_payload()))
+    assert fast == fallback
+    assert fallback["when"] == "2025-01-02T03:04:05"
+    assert fallback["difficulty"] == "hard"
+
+
+def test_fast_response_encodes_models(monkeypatch):
+    monkeypatch.setattr(serialization.settings, "fast_json_responses", True)
+    model = serialization.build_model(
+        AssessmentComplete,
+        session_id="s1", total_questions=2, correct_answers=1, accuracy=50.0,
+        final_mastery_level=0.4, time_taken=0, weak_topics=[], strong_topics=[],
+        recommended_resources=[]
+    )
+    response = serialization.respond(model)
+    assert isinstance(response, FastJSONResponse)
+    assert json.loads(response.body)["accuracy"] == 50.0
+
+
+def test_respond_is_passthrough_when_disabled(monkeypatch):
+    monkeypatch.setattr(serialization.settings, "fast_json_responses", False)
+    payload = {"a": 1}
+    assert serialization.respond(payload) is payload
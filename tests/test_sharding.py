@@ -0,0 +1,95 @@
+import pytest
+
+from app.services.sharding import LocalStorage, ShardedStorage, shard_for
+from app.services.storage import InMemoryStorage, analytics_from_partials
+
+
+async def _quiz(store, user, subject, answers):
+    session_id = await store.create_session(user, subject)
+    for i in range(answers):
+        await store.batch(session_id, [
+            ("add_question_to_history", (session_id, f"{session_id}-{i}")),
+            ("store_current_question", (session_id, {"question": f"{session_id}-{i}", "correct_answer": "A"}))
+        ])
+        await store.add_attempt(session_id, {"question": f"{session_id}-{i}", "is_correct": i % 3 != 0, "topic": "T"})
+        await store.update_session(session_id, {"total_questions": i + 1})
+        await store.update_user_skill(user, subject, "T", 0.1 * i)
+    if answers % 2:
+        await store.complete_session(session_id)
+    return session_id
+
+
+def _without_volatile(analytics):
+    return {
+        **analytics,
+        "subject_performance": sorted(analytics["subject_performance"], key=lambda s: s["subject"]),
+        "user_skills": sorted(
+            (s["user_id"], s["subject"], s["topic"], s["mastery_level"]) for s in analytics["user_skills"]
+        )
+    }
+
+
+def test_shard_for_is_stable_and_in_range():
+    assert shard_for("session-1", 4) == shard_for("session-1", 4)
+    assert {shard_for(f"s{i}", 4) for i in range(200)} == {0, 1, 2, 3}
+
+
+def test_merged_partials_equal_single_storage_analytics():
+    shards = [InMemoryStorage() for _ in range(3)]
+    combined = InMemoryStorage()
+    for i in range(30):
+        subject = ["Maths", "Science", "Python"][i % 3]
+        session_id = combined.create_session(f"u{i}", subject)
+        shard = shards[shard_for(session_id, 3)]
+        shard.create_session(f"u{i}", subject, session_id=session_id)
+        for target in (combined, shard):
+            for j in range(i % 4):
+                target.add_attempt(session_id, {"is_correct": j % 2 == 0})
+            if i % 5 == 0:
+                target.complete_session(session_id)
+    partials = [s.analytics_partials(include_user_skills=False) for s in shards]
+    merged = analytics_from_partials(partials, include_user_skills=False)
+    expected = combined.get_analytics_data(include_user_skills=False)
+    assert merged["overview"] == expected["overview"]
+    key = lambda s: s["subject"]
+    assert sorted(merged["subject_performance"], key=key) == sorted(expected["subject_performance"], key=key)
+
+
+@pytest.mark.asyncio
+async def test_local_storage_batches_in_order_and_notifies_listeners():
+    storage = InMemoryStorage()
+    store = LocalStorage(storage)
+    seen = []
+    store.add_attempt_listener(lambda session, attempt: seen.append((session["user_id"], attempt["question"])))
+    session_id = await _quiz(store, "u1", "Maths", 2)
+    assert storage.get_session(session_id)["total_questions"] == 2
+    assert seen == [("u1", f"{session_id}-0"), ("u1", f"{session_id}-1")]
+
+
+@pytest.mark.asyncio
+async def test_sharded_storage_matches_local_storage():
+    local = LocalStorage(InMemoryStorage())
+    sharded = ShardedStorage(2)
+    seen = []
+    sharded.add_attempt_listener(lambda session, attempt: seen.append(session["session_id"]))
+    try:
+        await sharded.start()
+        sessions = []
+        for i in range(6):
+            subject = ["Maths", "Python"][i % 2]
+            await _quiz(local, f"u{i}", subject, i)
+            sessions.append(await _quiz(sharded, f"u{i}", subject, i))
+
+        session = await sharded.get_session(sessions[3])
+        assert session["total_questions"] == 3 and session["status"] == "completed"
+        assert len(await sharded.get_attempts(sessions[3])) == 3
+        assert await sharded.get_question_history(sessions[3]) == [f"{sessions[3]}-{i}" for i in range(3)]
+        assert (await sharded.get_user_skill("u3", "Python", "T"))["mastery_level"] == pytest.approx(0.2)
+        assert await sharded.get_topic_masteries("u3", "Python", ["T", "Other"]) == {"T": pytest.approx(0.2)}
+        assert seen.count(sessions[5]) == 5
+
+        assert _without_volatile(await sharded.get_analytics_data()) == _without_volatile(
+            await local.get_analytics_data()
+        )
+    finally:
+        sharded.close()
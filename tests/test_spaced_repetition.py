@@ -0,0 +1,58 @@
+from app.services.spaced_repetition import DAY, ReviewScheduler
+
+T0 = 1_700_000_000.0
+
+
+def test_sm2_intervals_grow_and_reset():
+    scheduler = ReviewScheduler()
+    for day, expected in ((0, 1.0), (1, 6.0), (7, 15.0)):
+        scheduler.review("u1", "Maths", "Algebra", True, T0 + day * DAY)
+        assert scheduler.cards[("u1", "Maths", "Algebra")].interval_days == expected
+    scheduler.review("u1", "Maths", "Algebra", False, T0 + 30 * DAY)
+    card = scheduler.cards[("u1", "Maths", "Algebra")]
+    assert card.interval_days == 1.0 and card.repetitions == 0 and card.ease < 2.5
+
+
+def test_repeat_correct_answers_in_one_quiz_do_not_extend_interval():
+    scheduler = ReviewScheduler(min_review_gap_seconds=3600)
+    scheduler.review("u1", "Maths", "Algebra", True, T0)
+    scheduler.review("u1", "Maths", "Algebra", True, T0 + 60)
+    assert scheduler.cards[("u1", "Maths", "Algebra")].repetitions == 1
+
+
+def test_next_due_topic_is_most_overdue():
+    scheduler = ReviewScheduler()
+    scheduler.review("u1", "Maths", "Algebra", False, T0)
+    scheduler.review("u1", "Maths", "Geometry", False, T0 + 3600 * 2)
+    scheduler.review("u1", "Maths", "Calculus", True, T0)
+    scheduler.review("u1", "Maths", "Calculus", True, T0 + DAY)
+    
+    assert scheduler.next_due_topic("u1", "Maths", now=T0) is None
+    assert scheduler.next_due_topic("u1", "Maths", now=T0 + 2 * DAY) == "Algebra"
+    due = scheduler.due_cards("u1", now=T0 + 2 * DAY)
+    assert [card["topic"] for card in due] == ["Algebra", "Geometry"]
+    # Peeking must not consume the queue
+    assert len(scheduler.due_cards("u1", now=T0 + 2 * DAY)) == 2
+    
+    scheduler.review("u1", "Maths", "Algebra", True, T0 + 2 * DAY)
+    assert scheduler.next_due_topic("u1", "Maths", now=T0 + 2 * DAY) == "Geometry"
+
+
+def test_due_counts_for_all_users():
+    scheduler = ReviewScheduler()
+    scheduler.review("u1", "Maths", "Algebra", False, T0)
+    scheduler.review("u1", "Science", "Energy", False, T0)
+    scheduler.review("u2", "Maths", "Algebra", True, T0)
+    
+    assert scheduler.due_counts(now=T0) == {}
+    assert scheduler.due_counts(now=T0 + 1.5 * DAY) == {"u1": 2, "u2": 1}
+    scheduler.review("u1", "Science", "Energy", True, T0 + 1.5 * DAY)
+    assert scheduler.due_counts(now=T0 + 1.5 * DAY) == {"u1": 1, "u2": 1}
+
+
+def test_attempt_listener_uses_session_user():
+    scheduler = ReviewScheduler()
+    session = {"user_id": "u1", "subject": "Maths"}
+    scheduler.record_attempt(session, {"topic": "Algebra", "is_correct": False, "timestamp": "2025-01-01T00:00:00"})
+    scheduler.record_attempt(None, {"topic": "Algebra", "is_correct": False})
+    assert list(scheduler.cards) == [("u1", "Maths", "Algebra")]
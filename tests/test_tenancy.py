@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app, tenants
+from app.services.question_generator import question_generator
+from app.services.tenancy import Tenant
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_generate_question(subject, topic, difficulty, previous_questions=None,
+                                     priority=None, tenant=None):
+        return {
+            "question": f"{tenant} {topic} {len(previous_questions or [])}?",
+            "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4",
+            "correct_answer": "A", "explanation": "", "topic": topic, "difficulty": difficulty
+        }
+
+    monkeypatch.setattr(question_generator, "generate_question", fake_generate_question)
+    monkeypatch.setattr(settings, "question_bank_enabled", False)
+    monkeypatch.setitem(tenants._tenants, "school_b", Tenant.create("school_b"))
+    return TestClient(app)
+
+
+def _quiz(client, headers, user_id):
+    session_id = client.post("/api/assessment/start", params={"subject": "Python", "user_id": user_id},
+                             headers=headers).json()["session_id"]
+    client.post("/api/assessment/next-question", json={"session_id": session_id}, headers=headers)
+    client.post("/api/assessment/submit-answer", json={"session_id": session_id, "selected_answer": "A"},
+                headers=headers)
+    return session_id
+
+
+def test_tenants_only_see_their_own_data(client):
+    school_b = {"X-Tenant-ID": "school_b"}
+    session_id = _quiz(client, school_b, "b_student")
+
+    analytics = client.get("/api/powerbi/analytics", headers=school_b).json()
+    assert analytics["overview"]["total_sessions"] == 1
+    assert [skill["user_id"] for skill in analytics["user_skills"]] == ["b_student"]
+    default = client.get("/api/powerbi/analytics").json()
+    assert "b_student" not in {skill["user_id"] for skill in default["user_skills"]}
+
+    assert client.get("/api/user/b_student/skills", headers=school_b).json()["skills"]
+    assert client.get("/api/user/b_student/skills").json()["skills"] == []
+
+    response = client.post("/api/assessment/next-question", json={"session_id": session_id})
+    assert response.status_code == 404
+    response = client.post("/api/assessment/complete", params={"session_id": session_id}, headers=school_b)
+    assert response.status_code == 200
+
+
+def test_unknown_tenant_is_rejected(client):
+    response = client.post("/api/assessment/start", params={"subject": "Maths"},
+                           headers={"X-Tenant-ID": "nobody"})
+    assert response.status_code == 404 and response.json()["detail"] == "Unknown tenant"
+
+
+def test_tenant_ids_are_validated():
+    with pytest.raises(ValueError):
+        Tenant.create("../escape")
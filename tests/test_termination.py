@@ -0,0 +1,44 @@
+import pytest
+
+from app.services import termination
+from app.services.irt import estimate_ability_from_buckets
+from app.services.termination import TerminationPolicy, policy_for
+
+
+def test_fixed_policy_only_stops_at_max():
+    policy = TerminationPolicy("fixed", max_questions=10)
+    assert policy.stop_reason(9, ability_se=0.01) is None
+    assert policy.stop_reason(10) == "max_questions"
+
+
+def test_confidence_policy_stops_on_convergence():
+    policy = TerminationPolicy("confidence", max_questions=20, min_questions=5, max_ability_se=0.5)
+    assert policy.stop_reason(4, ability_se=0.1) is None
+    assert policy.stop_reason(6) is None
+    assert policy.stop_reason(6, ability_se=0.45) == "ability_converged"
+    assert policy.stop_reason(6, ability_se=0.7) is None
+    assert policy.stop_reason(20) == "max_questions"
+
+
+def test_policy_round_trips_and_rejects_unknown_strategy():
+    policy = TerminationPolicy("confidence", max_questions=12, max_ability_se=0.55)
+    assert TerminationPolicy.from_dict(policy.to_dict()).to_dict() == policy.to_dict()
+    with pytest.raises(ValueError):
+        TerminationPolicy("sometimes")
+
+
+def test_policy_for_reads_per_subject_settings(monkeypatch):
+    monkeypatch.setattr(termination.settings, "termination_policies", {
+        "Maths": {"strategy": "confidence", "max_questions": 25}
+    })
+    monkeypatch.setattr(termination.settings, "default_quiz_length", 12)
+    assert policy_for("Maths").max_questions == 25
+    assert policy_for("Maths").strategy == "confidence"
+    assert policy_for("Python").to_dict()["max_questions"] == 12
+
+
+def test_bucket_ability_error_shrinks_with_answers():
+    _, se_few = estimate_ability_from_buckets([("medium", True)] * 3)
+    theta, se_many = estimate_ability_from_buckets([("medium", True), ("hard", False)] * 8)
+    assert se_many < se_few
+    assert -1 < theta < 1
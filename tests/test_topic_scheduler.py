@@ -0,0 +1,47 @@
+from app.services.topic_scheduler import TopicScheduler
+
+CATALOG = {"Maths": {"easy": ["Addition", "Subtraction", "Division"], "hard": ["Calculus"]}}
+
+
+def test_weakest_topic_is_scheduled_first():
+    scheduler = TopicScheduler(CATALOG)
+    mastery = {"Addition": 0.9, "Subtraction": 0.2, "Division": 0.5}
+    assert scheduler.next_topic("s1", "Maths", "easy", mastery_lookup=mastery.get) == "Subtraction"
+    assert scheduler.next_topic("s1", "Maths", "hard") == "Calculus"
+    assert scheduler.next_topic("s2", "Science", "easy") == "Science General"
+
+
+def test_answered_topics_rotate_out():
+    scheduler = TopicScheduler(CATALOG)
+    asked = []
+    for _ in range(6):
+        topic = scheduler.next_topic("s1", "Maths", "easy")
+        asked.append(topic)
+        scheduler.record_answer("s1", topic, "easy", False)
+    # Every topic is covered before any is asked a third time
+    assert set(asked[:3]) == {"Addition", "Subtraction", "Division"}
+    assert all(asked.count(t) == 2 for t in set(asked))
+
+
+def test_mastered_topic_is_deprioritized():
+    scheduler = TopicScheduler(CATALOG, recency_weight=0.0, coverage_weight=0.0)
+    scheduler.next_topic("s1", "Maths", "easy")
+    for _ in range(3):
+        scheduler.record_answer("s1", "Addition", "easy", True)
+    assert scheduler.topic_mastery("s1")["Addition"] > 0.5
+    assert scheduler.next_topic("s1", "Maths", "easy") != "Addition"
+    
+    scheduler.record_answer("s1", "Fractions", "easy", True)
+    assert "Fractions" in scheduler.topic_mastery("s1")
+    scheduler.end_session("s1")
+    assert scheduler.topic_mastery("s1") == {}
+
+
+def test_least_recently_used_schedules_are_dropped():
+    scheduler = TopicScheduler(CATALOG, max_sessions=2)
+    scheduler.next_topic("s1", "Maths", "easy")
+    scheduler.next_topic("s2", "Maths", "easy")
+    scheduler.record_answer("s1", "Addition", "easy", True)
+    scheduler.next_topic("s3", "Maths", "easy")
+    assert scheduler.has_schedule("s1") and scheduler.has_schedule("s3")
+    assert not scheduler.has_schedule("s2")
@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.config import settings
+from app.main import app, tenants
+from app.services.admission import Priority
+from app.services.question_generator import question_generator
+from app.services.resource_catalog import ResourceCatalog
+from app.services.tenancy import Tenant
+from app.services.vector_index import HashedEmbedder, VectorIndex, catalog_documents, chunk_text
+
+
+def _documents(count, start=0):
+    return [
+        {"id": f"doc-{i}", "text": f"topic{i} shared words about item {i}", "subject": "Python" if i % 2 else "Maths"}
+        for i in range(start, start + count)
+    ]
+
+
+def test_chunks_overlap_and_cover_the_text():
+    words = [f"w{i}" for i in range(100)]
+    chunks = chunk_text(" ".join(words), max_words=40, overlap=10)
+    assert [chunk.split()[0] for chunk in chunks] == ["w0", "w30", "w60"]
+    assert chunks[-1].split()[-1] == "w99"
+    assert chunk_text("  ") == []
+
+    vectors = HashedEmbedder(64).embed(["react hooks", "react hooks", ""])
+    assert np.allclose(vectors[0], vectors[1]) and np.isclose(np.linalg.norm(vectors[0]), 1)
+    assert not vectors[2].any()
+
+
+def test_incremental_adds_persist_and_ignore_uncommitted_rows(tmp_path):
+    index = VectorIndex(str(tmp_path), dim=128)
+    assert index.add_documents(_documents(3)) == 3
+    assert index.add_documents(_documents(5)) == 2
+    assert index.search("topic4 item")[0]["doc_id"] == "doc-4"
+    assert index.search("topic4 item", subject="python")[0]["doc_id"] != "doc-4"
+    index.close()
+
+    # An add interrupted before the count was committed
+    with open(tmp_path / "chunks.jsonl", "a") as f:
+        f.write(json.dumps({"doc_id": "lost", "chunk": 0, "text": "lost"}) + "\n")
+
+    reopened = VectorIndex(str(tmp_path), dim=128)
+    assert reopened.stats()["chunks"] == 0
+    assert [r["doc_id"] for r in reopened.search("topic2", k=1)] == ["doc-2"]
+    assert reopened.stats()["chunks"] == 5
+    assert reopened.add_documents(_documents(1, start=5)) == 1
+    assert reopened.search("topic5")[0]["doc_id"] == "doc-5"
+
+    # A different embedder cannot reuse the stored vectors
+    assert VectorIndex(str(tmp_path), dim=64).search("topic5") == []
+
+
+def test_ivf_probing_matches_exact_search():
+    index = VectorIndex(dim=256)
+    index.add_documents(_documents(400))
+    queries = [f"topic{i} item {i}" for i in range(0, 400, 37)]
+    exact = [[(r["score"], r["doc_id"]) for r in results] for results in index.search_many(queries, k=3)]
+
+    lists = index.train_ivf(lists=8)
+    assert index.stats()["ivf_lists"] == lists == 8
+    # Probing every list is exact search, up to the order of tied scores
+    probed = index.search_many(queries, k=3, probes=8)
+    assert [[r["score"] for r in results] for results in probed] == [[s for s, _ in row] for row in exact]
+    assert [results[0]["doc_id"] for results in probed] == [row[0][1] for row in exact]
+    assert index.search_many(queries, k=1, probes=2)[0][0]["doc_id"] == "doc-0"
+
+    index.add_documents([{"id": "late", "text": "generators yield lazily"}])
+    assert index.search("generators yield", probes=8)[0]["doc_id"] == "late"
+
+
+def test_recommendation_prompt_is_grounded_in_retrieved_chunks(monkeypatch):
+    catalog = ResourceCatalog()
+    catalog.load_curated()
+    index = VectorIndex()
+    index.add_documents(catalog_documents(catalog.resources()))
+    monkeypatch.setattr(main, "resource_catalog", catalog)
+    monkeypatch.setattr(main, "rag_index", index)
+    monkeypatch.setattr(settings, "resource_catalog_enabled", True)
+    monkeypatch.setattr(settings, "rag_enabled", True)
+    monkeypatch.setattr(settings, "question_bank_enabled", False)
+    monkeypatch.setattr(settings, "question_prefetch_enabled", False)
+    prompts = []
+
+    async def fake_generate_question(subject, topic, difficulty, previous_questions=None,
+                                     priority=Priority.LIVE, tenant=None):
+        return {
+            "question": f"{topic} question {len(previous_questions or [])}?",
+            "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4",
+            "correct_answer": "A", "explanation": "", "topic": topic, "difficulty": difficulty
+        }
+
+    async def fake_generate_recommendations(prompt, tenant=None):
+        prompts.append(prompt)
+        return "Study more"
+
+    monkeypatch.setattr(question_generator, "generate_question", fake_generate_question)
+    monkeypatch.setattr(question_generator, "generate_recommendations", fake_generate_recommendations)
+    monkeypatch.setitem(tenants._tenants, "rag_school", Tenant.create("rag_school"))
+    client = TestClient(app, headers={"X-Tenant-ID": "rag_school"})
+
+    session_id = client.post("/api/assessment/start", params={"subject": "Python"}).json()["session_id"]
+    for _ in range(3):
+        client.post("/api/assessment/next-question", json={"session_id": session_id})
+        client.post("/api/assessment/submit-answer", json={"session_id": session_id, "selected_answer": "B"})
+    client.post("/api/assessment/complete", params={"session_id": session_id})
+
+    body = client.get("/api/learning-path/recommendations", params={"subject": "Python"}).json()
+    assert body["sources"] and {source["subject"] for source in body["sources"]} == {"Python"}
+    assert "Reference material" in prompts[0]
+    assert any(source["url"] and source["url"] in prompts[0] for source in body["sources"])
@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.config import settings
+from app.main import app
+from app.services.admission import Priority
+from app.services.prefetch import QuestionPrefetcher, question_prefetcher
+from app.services.question_generator import question_generator
+from app.services.topic_scheduler import TOPIC_CATALOG, TopicScheduler
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    calls = []
+    counter = itertools.count()
+
+    async def fake_generate_question(subject, topic, difficulty, previous_questions=None,
+                                     priority=Priority.LIVE, tenant=None):
+        calls.append((topic, difficulty, priority))
+        return {
+            "question": f"Question {next(counter)} on {topic}?",
+            "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4",
+            "correct_answer": "A",
+            "explanation": "",
+            "topic": topic,
+            "difficulty": difficulty
+        }
+
+    monkeypatch.setattr(question_generator, "generate_question", fake_generate_question)
+    monkeypatch.setattr(settings, "question_bank_enabled", False)
+    monkeypatch.setattr(settings, "default_quiz_length", 4)
+    return calls
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _receive(ws):
+    return json.loads(ws.receive_bytes())
+
+
+def test_predicted_topic_matches_schedule_after_answer():
+    for is_correct in (True, False):
+        scheduler = TopicScheduler(TOPIC_CATALOG)
+        for step in range(12):
+            topic = scheduler.next_topic("s", "Maths", "easy")
+            predicted = scheduler.predict_topic("s", "Maths", topic, "easy", is_correct, "easy")
+            assert scheduler.predict_topic("s", "Maths", topic, "easy", is_correct, "hard") == \
+                scheduler.next_topic("s", "Maths", "hard")
+            scheduler.record_answer("s", topic, "easy", is_correct)
+            assert predicted == scheduler.next_topic("s", "Maths", "easy")
+
+
+@pytest.mark.asyncio
+async def test_prefetcher_only_serves_matching_plans():
+    async def question():
+        return {"question": "q"}
+
+    prefetcher = QuestionPrefetcher(max_sessions=1)
+    prefetcher.plan("a", "easy", "Arithmetic", True, question())
+    planned = prefetcher.pop("a")
+    assert await prefetcher.take(planned, "medium", "Arithmetic") is None
+    assert await prefetcher.take(planned, "easy", "Arithmetic") == {"question": "q"}
+
+    prefetcher.plan("a", "easy", "Arithmetic", False)
+    prefetcher.plan("b", "easy", "Arithmetic", False)
+    assert prefetcher.pop("a") is None
+    await asyncio.sleep(0)
+    assert prefetcher.stats() == {
+        "pending": 1, "planned": 3, "hits": 1, "mispredicted": 1, "failed": 0, "dropped": 1, "wasted": 1
+    }
+
+
+def test_channel_pushes_prefetched_questions_and_completes(client, generated):
+    session_id = client.post("/api/assessment/start", params={"subject": "Maths"}).json()["session_id"]
+    hits = question_prefetcher.hits
+
+    with client.websocket_connect(f"/api/assessment/{session_id}/ws") as ws:
+        session = _receive(ws)
+        assert session["type"] == "session" and session["total_questions"] == 4
+        question = _receive(ws)
+        assert question["type"] == "question" and question["question_number"] == 1
+
+        for number in range(2, 5):
+            # Low mastery predicts a wrong answer, so answering wrong uses the prefetched question
+            ws.send_bytes(json.dumps({"type": "answer", "selected_answer": "B"}).encode())
+            result = _receive(ws)
+            assert result["type"] == "result" and result["is_correct"] is False
+            assert result["topic_mastery"]
+            question = _receive(ws)
+            assert question["type"] == "question" and question["question_number"] == number
+
+        ws.send_text(json.dumps({"type": "answer", "selected_answer": "a"}))
+        assert _receive(ws)["assessment_complete"] is True
+        complete = _receive(ws)
+        assert complete["type"] == "complete" and complete["total_questions"] == 4
+        with pytest.raises(WebSocketDisconnect):
+            ws.receive_bytes()
+
+    live = [call for call in generated if call[2] == Priority.LIVE]
+    assert len(live) == 1
+    assert question_prefetcher.hits - hits == 3
+
+
+
+def test_http_questions_are_not_prefetched(client, generated):
+    session_id = client.post("/api/assessment/start", params={"subject": "Maths"}).json()["session_id"]
+    planned = question_prefetcher.planned
+
+    client.post("/api/assessment/next-question", json={"session_id": session_id})
+    client.post("/api/assessment/answer-and-advance", json={"session_id": session_id, "selected_answer": "B"})
+
+    assert question_prefetcher.planned == planned
+    assert [call[2] for call in generated] == [Priority.LIVE, Priority.LIVE]
+
+def test_reconnect_resumes_without_reapplying_answers(client, generated):
+    session_id = client.post("/api/assessment/start", params={"subject": "Python"}).json()["session_id"]
+    answer = {"type": "answer", "selected_answer": "A", "idempotency_key": "k1"}
+
+    with client.websocket_connect(f"/api/assessment/{session_id}/ws") as ws:
+        _receive(ws)
+        _receive(ws)
+        ws.send_bytes(json.dumps(answer).encode())
+        assert _receive(ws)["duplicate"] is False
+        pending = _receive(ws)
+
+    with client.websocket_connect(f"/api/assessment/{session_id}/ws?binary=false") as ws:
+        session = json.loads(ws.receive_text())
+        assert session["questions_answered"] == 1
+        assert json.loads(ws.receive_text())["question"] == pending["question"]
+        ws.send_text(json.dumps(answer))
+        duplicate = json.loads(ws.receive_text())
+        assert duplicate["duplicate"] is True and duplicate["questions_answered"] == 1
+        ws.send_text(json.dumps({"type": "ping"}))
+        assert json.loads(ws.receive_text()) == {"type": "pong"}
+
+
+def test_channel_rejects_unknown_sessions_and_oversized_messages(client, generated):
+    with client.websocket_connect("/api/assessment/missing/ws") as ws:
+        assert _receive(ws)["status"] == 404
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_bytes()
+        assert closed.value.code == 4404
+
+    session_id = client.post("/api/assessment/start", params={"subject": "Science"}).json()["session_id"]
+    with client.websocket_connect(f"/api/assessment/{session_id}/ws") as ws:
+        _receive(ws)
+        _receive(ws)
+        ws.send_text("not json")
+        assert _receive(ws)["status"] == 400
+        ws.send_bytes(b"x" * (settings.websocket_max_message_bytes + 1))
+        assert _receive(ws)["status"] == 413
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_bytes()
+        assert closed.value.code == 1009